@@ -0,0 +1,161 @@
+"""
+DRX weather alert archive
+
+Keeps one row per weather alert ever seen, keyed by its NWS id, so past
+alerts can be looked up after wx_alerts has been overwritten:
+
+    first_seen    when drx_main first had the alert
+    announced     when it was first read out on air (NULL if never)
+    expired       when it left the active set: its expiry time, or the
+                  moment it disappeared if it was cancelled earlier
+
+drx_main records alerts as they come and go and marks announcements, and
+checks `announced` before reading an alert out, so an alert announced before
+a restart is not announced again. drx_web opens the same database to answer
+queries. Timestamps are local 'YYYY-MM-DD HH:MM:SS' text, as in the logs.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id TEXT PRIMARY KEY,
+    code TEXT NOT NULL,
+    description TEXT,
+    headline TEXT,
+    zones TEXT,
+    effective TEXT,
+    expires TEXT,
+    first_seen TEXT NOT NULL,
+    announced TEXT,
+    expired TEXT
+);
+CREATE INDEX IF NOT EXISTS alerts_first_seen ON alerts (first_seen);
+CREATE INDEX IF NOT EXISTS alerts_expired ON alerts (expired);
+CREATE INDEX IF NOT EXISTS alerts_code_first_seen ON alerts (code, first_seen);
+"""
+
+COLUMNS = ("id", "code", "description", "headline", "zones", "effective", "expires",
+           "first_seen", "announced", "expired")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _ts(value):
+    if isinstance(value, datetime):
+        return value.strftime(TIME_FORMAT)
+    return value
+
+
+def _seconds_between(start, end):
+    try:
+        return int((datetime.strptime(end, TIME_FORMAT) - datetime.strptime(start, TIME_FORMAT)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AlertArchive:
+    def __init__(self, db_path, readonly=False):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        if readonly:
+            self.db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(SCHEMA)
+
+    def observe(self, alerts, now=None):
+        """
+        Record the currently active alerts (drx_main's alert dicts, each with an id).
+        New ones are inserted with first_seen = now; an alert whose expiry moved
+        is updated; archived alerts missing from `alerts` are marked expired.
+        Returns the ids that were new.
+        """
+        now = _ts(now or datetime.now())
+        rows = [
+            (a["id"], a.get("code", ""), a.get("description"), a.get("nws_headline"),
+             ",".join(a.get("zones") or []), _ts(a.get("effective_time")), _ts(a.get("expires_time")), now)
+            for a in alerts if a.get("id")
+        ]
+        ids = [row[0] for row in rows]
+        with self.lock, self.db:
+            known = self._existing(ids)
+            self.db.executemany(
+                "INSERT OR IGNORE INTO alerts (id, code, description, headline, zones, effective, expires, first_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.db.executemany(
+                "UPDATE alerts SET expires = ?, expired = NULL WHERE id = ? AND (expires IS NOT ? OR expired IS NOT NULL)",
+                [(row[6], row[0], row[6]) for row in rows if row[0] in known])
+            self.db.execute(
+                f"UPDATE alerts SET expired = MIN(COALESCE(expires, ?), ?)"
+                f" WHERE expired IS NULL AND id NOT IN ({','.join('?' * len(ids))})",
+                [now, now] + ids)
+        return [i for i in ids if i not in known]
+
+    def _existing(self, ids):
+        if not ids:
+            return set()
+        rows = self.db.execute(f"SELECT id FROM alerts WHERE id IN ({','.join('?' * len(ids))})", ids)
+        return {row[0] for row in rows}
+
+    def mark_announced(self, alert_id, when=None):
+        """Note that an alert was read out; only the first announcement is kept."""
+        with self.lock, self.db:
+            self.db.execute("UPDATE alerts SET announced = ? WHERE id = ? AND announced IS NULL",
+                            (_ts(when or datetime.now()), alert_id))
+
+    def announced_ids(self, ids):
+        """Which of these alert ids were already announced, in this run or an earlier one."""
+        ids = list(ids)
+        if not ids:
+            return set()
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT id FROM alerts WHERE announced IS NOT NULL AND id IN ({','.join('?' * len(ids))})", ids)
+            return {row[0] for row in rows}
+
+    def query(self, start=None, end=None, code=None, zone=None, announced=None, cursor=None, limit=50):
+        """
+        Alerts active at any time between start and end (timestamps or prefixes
+        such as '2025-07-22'), newest first. announced=True/False keeps only
+        alerts that were / were not read out. Each alert carries
+        announce_delay_seconds, from its effective time to the announcement.
+        Returns (alerts, next_cursor) as drx_history's query does.
+        """
+        where, args = [], []
+        if start:
+            where.append("(expired IS NULL OR expired >= ?)")
+            args.append(start)
+        if end:
+            where.append("COALESCE(effective, first_seen) < ?")
+            args.append(end + "\uffff")  # Any timestamp that starts with `end` still counts
+        if code:
+            where.append("code = ?")
+            args.append(code.upper())
+        if zone:
+            where.append("(',' || zones || ',') LIKE ?")
+            args.append(f"%,{zone.upper()},%")
+        if announced is not None:
+            where.append("announced IS NOT NULL" if announced else "announced IS NULL")
+        if cursor:
+            cursor_ts, _, cursor_id = cursor.partition("|")
+            where.append("(first_seen < ? OR (first_seen = ? AND id < ?))")
+            args.extend([cursor_ts, cursor_ts, cursor_id])
+        sql = f"SELECT {', '.join(COLUMNS)} FROM alerts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY first_seen DESC, id DESC LIMIT ?"
+        args.append(limit + 1)
+        with self.lock:
+            rows = self.db.execute(sql, args).fetchall()
+        alerts = []
+        for row in rows[:limit]:
+            alert = dict(zip(COLUMNS, row))
+            alert["zones"] = [z for z in (alert["zones"] or "").split(",") if z]
+            alert["announce_delay_seconds"] = _seconds_between(alert["effective"], alert["announced"])
+            alerts.append(alert)
+        next_cursor = f"{alerts[-1]['first_seen']}|{alerts[-1]['id']}" if len(rows) > limit else None
+        return alerts, next_cursor
@@ -0,0 +1,237 @@
+"""
+DRX alert audio cache
+
+Gets broadcast audio for a weather alert, as NOAA Weather Radio aired it,
+so W3 can play the real thing instead of a clip-and-Piper rendition. Each
+alert's audio is fetched once and transcoded once to the repeater's format
+(16-bit, 22050 Hz, mono WAV, as create_combined_wav writes), then kept in
+
+    sounds/alert_audio/nwr-<hash of alert id>.wav
+    sounds/alert_audio/index.json   alert id -> file, alert expiry, source
+
+and dropped once the alert has expired. A source that had nothing for an
+alert is not asked again for RETRY_AFTER seconds.
+
+The source is a template filled in per alert with {id}, {code} (SAME
+code), {zone} (first UGC zone) and {station} (the configured NWR station):
+
+    https://nwr.example.net/alerts/{id}.mp3    any HTTP(S) server
+    file:///home/drx/nwr/{code}.wav            a file an NWR receiver wrote
+    /home/drx/nwr/{zone}-{code}.mp3            same, as a plain path
+
+So it can be tried with a local file, or `python3 -m http.server` serving
+a directory of clips:
+
+    python3 drx_alert_audio.py /tmp/clips/{code}.mp3 --code TOR --id test-1
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+from urllib.parse import quote, urlparse
+from urllib.request import url2pathname
+
+import requests
+
+RATE = 22050
+RETRY_AFTER = 300  # Seconds before asking the source again for an alert it had no audio for
+EXPIRY_GRACE = 600  # Seconds audio is kept after its alert expired
+MAX_BYTES = 50 * 1024 * 1024
+INDEX_NAME = "index.json"
+
+
+def _safe(value):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", value)
+
+
+def transcode(src, dest):
+    """Convert any audio sox (or, failing that, ffmpeg) can read to 16-bit 22050 Hz mono WAV."""
+    commands = [["sox", "-V1", src, "-r", str(RATE), "-c", "1", "-b", "16", "-e", "signed-integer", dest]]
+    if shutil.which("ffmpeg"):
+        commands.append(["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", src,
+                         "-ar", str(RATE), "-ac", "1", "-sample_fmt", "s16", "-f", "wav", dest])
+    errors = []
+    for cmd in commands:
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=120)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            errors.append(f"{cmd[0]}: {e}")
+            continue
+        if result.returncode == 0 and os.path.exists(dest) and os.path.getsize(dest) > 44:
+            return
+        errors.append(f"{cmd[0]}: {result.stderr.decode('utf-8', errors='replace').strip() or result.returncode}")
+    raise RuntimeError("could not transcode alert audio (" + "; ".join(errors) + ")")
+
+
+class AlertAudioCache:
+    def __init__(self, directory, source, station="", timeout=15, user_agent="DRX"):
+        self.directory = directory
+        self.source = source
+        self.station = station
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()  # One sync at a time, so an alert is never fetched twice
+        self.failed = {}  # alert id -> time the source last had nothing
+        self.errors = {}  # alert id -> last fetch or transcode error
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        try:
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def _save_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self.index_path)
+
+    def location(self, alert):
+        """The source filled in for this alert."""
+        is_url = self.source.startswith(("http://", "https://"))
+        fields = {
+            "id": alert.get("id") or "",
+            "code": alert.get("code") or "",
+            "zone": (alert.get("zones") or [""])[0],
+            "station": self.station,
+        }
+        return self.source.format(**{k: quote(v, safe="") if is_url else _safe(v) for k, v in fields.items()})
+
+    def get(self, alert):
+        """Path of the cached audio for an alert, or None; never fetches."""
+        with self.lock:
+            entry = self.index.get(alert.get("id") or "")
+        if entry and os.path.exists(entry["path"]):
+            return entry["path"]
+        return None
+
+    def fetch(self, alert):
+        """
+        The alert's audio, fetched and transcoded if it is not cached yet.
+        Returns the cached path, or None if the source has nothing for it.
+        Raises on a source or transcode error.
+        """
+        alert_id = alert.get("id")
+        if not alert_id:
+            return None
+        cached = self.get(alert)
+        if cached:
+            return cached
+        if time.time() - self.failed.get(alert_id, 0) < RETRY_AFTER:
+            return None
+        location = self.location(alert)
+        path = os.path.join(self.directory, f"nwr-{hashlib.sha1(alert_id.encode('utf-8')).hexdigest()[:16]}.wav")
+        # sox goes by the extension, so the downloaded copy keeps the source's
+        fd, raw = tempfile.mkstemp(dir=self.directory, suffix=os.path.splitext(urlparse(location).path)[1] or ".wav")
+        os.close(fd)
+        tmp = f"{path}.tmp.wav"
+        try:
+            if not self._download(location, raw):
+                self.failed[alert_id] = time.time()
+                return None
+            transcode(raw, tmp)
+            os.replace(tmp, path)
+        except Exception:
+            self.failed[alert_id] = time.time()
+            raise
+        finally:
+            for leftover in (raw, tmp):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        expires = alert.get("expires_time")
+        with self.lock:
+            self.index[alert_id] = {
+                "path": path,
+                "expires": expires.timestamp() if hasattr(expires, "timestamp") else expires,
+                "source": location,
+                "fetched": time.time(),
+            }
+            self._save_index()
+        self.failed.pop(alert_id, None)
+        self.errors.pop(alert_id, None)
+        return path
+
+    def _download(self, location, dest):
+        """Copy the source audio to dest; False if it does not exist (yet)."""
+        if location.startswith(("http://", "https://")):
+            with self.session.get(location, timeout=self.timeout, stream=True) as resp:
+                if resp.status_code == 404:
+                    return False
+                resp.raise_for_status()
+                size = 0
+                with open(dest, "wb") as f:
+                    for chunk in resp.iter_content(chunk_size=65536):
+                        size += len(chunk)
+                        if size > MAX_BYTES:
+                            raise ValueError(f"{location} is larger than {MAX_BYTES} bytes")
+                        f.write(chunk)
+            return size > 0
+        if location.startswith("file://"):
+            location = url2pathname(urlparse(location).path)
+        if not os.path.isfile(location) or os.path.getsize(location) == 0:
+            return False
+        shutil.copyfile(location, dest)
+        return True
+
+    def evict(self, now=None):
+        """Drop audio for alerts that expired more than EXPIRY_GRACE ago; returns how many went."""
+        now = time.time() if now is None else now
+        with self.lock:
+            gone = [alert_id for alert_id, entry in self.index.items()
+                    if entry.get("expires") and entry["expires"] + EXPIRY_GRACE < now]
+            for alert_id in gone:
+                entry = self.index.pop(alert_id)
+                if os.path.exists(entry["path"]):
+                    os.remove(entry["path"])
+            if gone:
+                self._save_index()
+        return len(gone)
+
+    def sync(self, alerts):
+        """
+        Fetch audio for any of these alerts that has none yet and evict expired
+        audio. Returns {id: path or None}; why a fetch failed is in self.errors.
+        """
+        results = {}
+        with self.sync_lock:
+            self.evict()
+            for alert in alerts:
+                if not alert.get("id"):
+                    continue
+                try:
+                    results[alert["id"]] = self.fetch(alert)
+                except Exception as e:
+                    self.errors[alert["id"]] = str(e)
+                    results[alert["id"]] = None
+        return results
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import datetime, timedelta
+
+    parser = argparse.ArgumentParser(description="Fetch and cache the broadcast audio for one alert.")
+    parser.add_argument("source", help="source template, e.g. /tmp/clips/{code}.mp3 or http://127.0.0.1:8000/{code}.mp3")
+    parser.add_argument("--id", default="test-alert", help="alert id")
+    parser.add_argument("--code", default="TOR", help="SAME code")
+    parser.add_argument("--zone", default="", help="UGC zone")
+    parser.add_argument("--station", default="", help="NWR station")
+    parser.add_argument("--directory", default=os.path.join(tempfile.gettempdir(), "drx_alert_audio"))
+    args = parser.parse_args()
+
+    cache = AlertAudioCache(args.directory, args.source, station=args.station)
+    alert = {"id": args.id, "code": args.code, "zones": [args.zone] if args.zone else [],
+             "expires_time": datetime.now() + timedelta(hours=1)}
+    print(f"Source: {cache.location(alert)}")
+    start = time.time()
+    path = cache.fetch(alert)
+    print(f"Cached: {path} ({time.time() - start:.2f}s)" if path else "The source has no audio for this alert.")
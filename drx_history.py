@@ -0,0 +1,307 @@
+"""
+DRX event history store
+
+Indexes the DRX logs into SQLite so past activity can be searched without
+grepping rotated files over SSH:
+
+    logs/drx.log, drx.log-YYYY-MM-DD   plays, CT overrides, WX alerts/reports, web commands
+    logs/dtmf.log                      DTMF digits per port
+    dtmf-YYYY-MM.log                   monthly DTMF archives, wherever drx_main
+                                       moves them (archive_dirs)
+
+Ingestion is incremental. Appended logs are read from the offset reached last
+time, and the newest-first DTMF log only down to the bytes it had last time
+(everything since was prepended). A file whose size and mtime have not
+changed is skipped with one stat(). Rotation just shows up as a new file name.
+
+The same line can legitimately appear twice (the same digits keyed twice in
+one second), so each line is numbered by how many identical lines come
+before it in its file, counting from the oldest end, and (ts, kind, text,
+occurrence) is unique. Reading a rotated copy numbers its lines the same
+way, so lines already indexed are ignored and repeats are kept.
+
+Queries filter on the indexed columns, plus full-text search through FTS5,
+and page newest first with an opaque cursor.
+"""
+
+import os
+import re
+import glob
+import sqlite3
+import threading
+
+from collections import Counter
+
+from drx_logtail import head_lines, tail_lines
+
+SCHEMA_VERSION = 2  # Stores from an older version are dropped and rebuilt from the logs
+RESET = """
+DROP TRIGGER IF EXISTS events_fts_insert;
+DROP TABLE IF EXISTS events_fts;
+DROP TABLE IF EXISTS events;
+DROP TABLE IF EXISTS sources;
+"""
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    track TEXT,
+    port INTEGER,
+    digits TEXT,
+    text TEXT NOT NULL,
+    occurrence INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (ts, kind, text, occurrence)
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_kind_ts ON events (kind, ts);
+CREATE INDEX IF NOT EXISTS events_track_ts ON events (track, ts);
+CREATE INDEX IF NOT EXISTS events_digits_ts ON events (digits, ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5 (text, content='events', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    inode INTEGER,
+    size INTEGER,
+    mtime_ns INTEGER,
+    offset INTEGER,
+    top TEXT
+);
+"""
+
+# Event kinds, in the order they are tried against a drx.log message
+DRX_PATTERNS = (
+    ("play", re.compile(r"^Play: (\d+)")),
+    ("ct_override", re.compile(r"^CT Override (\d+)")),
+    ("wx_alert", re.compile(r"^WX Alert: ()")),
+    ("wx_report", re.compile(r"^(?:WX|Temperature) Report: ()")),
+    ("command", re.compile(r"^(?:Play requested|Echo Test|Script)\b\D*(\d{4,})?")),
+)
+EVENT_KINDS = tuple(kind for kind, _ in DRX_PATTERNS) + ("dtmf", "other")
+
+DRX_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?): (.*)$")
+DTMF_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) Port (\d+): (\S+)$")
+
+
+def parse_drx_line(line):
+    """Return (ts, kind, track, port, digits, text) for a drx.log line, or None if it has no timestamp."""
+    match = DRX_LINE.match(line)
+    if not match:
+        return None
+    ts, text = match.groups()
+    for kind, pattern in DRX_PATTERNS:
+        found = pattern.match(text)
+        if found:
+            return (ts, kind, found.group(1) or None, None, None, text)
+    return (ts, "other", None, None, None, text)
+
+
+def parse_dtmf_line(line):
+    """Return (ts, kind, track, port, digits, text) for a dtmf.log line, or None if it does not parse."""
+    match = DTMF_LINE.match(line.strip())
+    if not match:
+        return None
+    ts, port, digits = match.groups()
+    return (ts, "dtmf", None, int(port), digits, f"Port {port}: {digits}")
+
+
+def number_events(parser, context, lines):
+    """
+    Parse lines (oldest first) into events with their occurrence number.
+    context holds the lines already read just before them in the file, so
+    a line repeated across two ingests keeps counting up.
+    """
+    seen = Counter((e[0], e[1], e[5]) for e in map(parser, context) if e)
+    events = []
+    for event in map(parser, lines):
+        if event:
+            key = (event[0], event[1], event[5])
+            events.append(event + (seen[key],))
+            seen[key] += 1
+    return events
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, a trailing * makes it a prefix."""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class HistoryStore:
+    def __init__(self, db_path, log_dir, archive_dirs=()):
+        self.db_path = db_path
+        self.log_dir = log_dir
+        self.archive_dirs = list(archive_dirs)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.db.executescript(RESET)
+        self.db.executescript(SCHEMA)
+        self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def log_files(self):
+        """Every log the store knows how to read, with the parser and whether it is newest-first."""
+        files = []
+        for path in sorted(glob.glob(os.path.join(self.log_dir, "drx.log*"))):
+            if not path.endswith((".gz", ".tmp")):
+                files.append((path, parse_drx_line, False))
+        dtmf_logs = set(glob.glob(os.path.join(self.log_dir, "dtmf*.log")))
+        for directory in self.archive_dirs:
+            dtmf_logs.update(glob.glob(os.path.join(directory, "dtmf-*.log")))
+        for path in sorted(dtmf_logs, key=os.path.abspath):
+            files.append((path, parse_dtmf_line, True))
+        return files
+
+    def ingest(self):
+        """Index whatever was written since the last call; returns the number of new events."""
+        added = 0
+        with self.lock:
+            for path, parser, newest_first in self.log_files():
+                try:
+                    st = os.stat(path)
+                    row = self.db.execute(
+                        "SELECT inode, size, mtime_ns, offset, top FROM sources WHERE path = ?", (path,)
+                    ).fetchone()
+                    if row and row[:3] == (st.st_ino, st.st_size, st.st_mtime_ns):
+                        continue
+                    if newest_first:
+                        lines, context, offset, top = self._read_new_head(path, row, st, parser)
+                        lines.reverse()
+                    else:
+                        lines, context, offset, top = self._read_appended(path, row, st, parser)
+                    events = number_events(parser, context, lines)
+                    with self.db:
+                        # rowcount, not total_changes, which also counts the FTS index's own writes
+                        added += self.db.executemany(
+                            "INSERT OR IGNORE INTO events (ts, kind, track, port, digits, text, occurrence)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            events,
+                        ).rowcount
+                        self.db.execute(
+                            "INSERT OR REPLACE INTO sources (path, inode, size, mtime_ns, offset, top) VALUES (?, ?, ?, ?, ?, ?)",
+                            (path, st.st_ino, st.st_size, st.st_mtime_ns, offset, top),
+                        )
+                except (OSError, sqlite3.Error):
+                    continue
+        return added
+
+    def _read_appended(self, path, row, st, parser):
+        """
+        (lines, context, offset, top): complete lines written after the stored
+        offset, from the top after rotation or truncation, and the lines before
+        them from the same second as the first.
+        """
+        offset = row[3] if row and row[0] == st.st_ino and row[3] <= st.st_size else 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(st.st_size - offset)
+        complete = data[:data.rfind(b"\n") + 1]
+        lines = complete.decode("utf-8", errors="replace").splitlines()
+        first = next((e for e in map(parser, lines) if e), None)
+        context = self._earlier_lines(path, offset, parser, first[0]) if first and offset else []
+        return lines, context, offset + len(complete), None
+
+    def _earlier_lines(self, path, before, parser, ts, page=50):
+        """Lines ending at offset `before`, read back until one from before second `ts`."""
+        context = []
+        while before:
+            lines, before = tail_lines(path, page, before=before)
+            context[:0] = lines
+            if any(e and e[0] != ts for e in map(parser, lines)):
+                break
+        return context
+
+    def _read_new_head(self, path, row, st, parser, page=200):
+        """
+        (lines, context, offset, top) for a newest-first file. Lines are only
+        ever prepended, so the new ones are the first (size - old size) bytes,
+        provided the line after them is the one that was on top last time;
+        otherwise (a new file, or it was rewritten) the whole file is read.
+        context is the older lines below the new ones from the same second as
+        the oldest of them.
+        """
+        old_top = row[4] if row else None
+        if row and row[0] == st.st_ino and old_top is not None and st.st_size >= row[1]:
+            with open(path, "rb") as f:
+                new = f.read(st.st_size - row[1])
+            below, cursor = head_lines(path, page, after=row[1])
+            if below and below[0] == old_top:
+                lines = [line.rstrip("\r") for line in new.decode("utf-8", errors="replace").split("\n") if line.strip()]
+                oldest = next((e for e in map(parser, reversed(lines)) if e), None)
+                context = []
+                while oldest and below:
+                    context.extend(below)
+                    if any(e and e[0] != oldest[0] for e in map(parser, below)) or cursor is None:
+                        break
+                    below, cursor = head_lines(path, page, after=cursor)
+                return lines, context, None, lines[0] if lines else old_top
+        lines = []
+        cursor = None
+        while True:
+            page_lines, cursor = head_lines(path, page, after=cursor)
+            lines.extend(page_lines)
+            if cursor is None:
+                break
+        return lines, [], None, lines[0] if lines else None
+
+    def query(self, start=None, end=None, kinds=None, track=None, port=None, digits=None,
+              text=None, cursor=None, limit=50):
+        """
+        Events matching every given filter, newest first.
+        start/end are timestamps or their prefixes ('2025-07', '2025-07-26 17:22'), end inclusive.
+        Returns (events, next_cursor); pass next_cursor back for the following page, None when done.
+        Raises ValueError for a cursor this did not hand out, or full-text search FTS5 rejects.
+        """
+        where, args = [], []
+        if start:
+            where.append("e.ts >= ?")
+            args.append(start)
+        if end:
+            where.append("e.ts < ?")
+            args.append(end + "\uffff")  # Any timestamp that starts with `end` still matches
+        if kinds:
+            where.append(f"e.kind IN ({','.join('?' * len(kinds))})")
+            args.extend(kinds)
+        if track:
+            where.append("e.track = ?")
+            args.append(str(track))
+        if port is not None:
+            where.append("e.port = ?")
+            args.append(int(port))
+        if digits:
+            where.append("e.digits = ?")
+            args.append(digits)
+        if text and fts_query(text):
+            where.append("e.id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)")
+            args.append(fts_query(text))
+        if cursor:
+            cursor_ts, _, cursor_id = cursor.rpartition("|")
+            if not cursor_ts or not cursor_id.isdigit():
+                raise ValueError(f"bad cursor {cursor!r}; pass back the next value of a previous page")
+            where.append("(e.ts < ? OR (e.ts = ? AND e.id < ?))")
+            args.extend([cursor_ts, cursor_ts, int(cursor_id)])
+        sql = "SELECT e.id, e.ts, e.kind, e.track, e.port, e.digits, e.text FROM events e"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.ts DESC, e.id DESC LIMIT ?"
+        args.append(limit + 1)
+        with self.lock:
+            try:
+                rows = self.db.execute(sql, args).fetchall()
+            except sqlite3.OperationalError as e:
+                if text and "fts5" in str(e).lower():
+                    raise ValueError(f"bad search {text!r}: {e}") from e
+                raise
+        columns = ("id", "ts", "kind", "track", "port", "digits", "text")
+        events = [dict(zip(columns, r)) for r in rows[:limit]]
+        next_cursor = f"{events[-1]['ts']}|{events[-1]['id']}" if len(rows) > limit else None
+        return events, next_cursor
@@ -0,0 +1,156 @@
+"""
+DRX log tail reader
+
+Reads the newest lines of the DRX log files without reading the whole file,
+so the cost of a request depends on how many lines it returns rather than on
+how big the log has grown since the last rotation.
+
+    logs/drx.log   appended to, newest line last   -> tail_lines / LogTail
+    logs/dtmf.log  prepended to, newest line first  -> head_lines
+
+Both readers return a cursor for scrolling back through older lines. For an
+appended file the cursor is the byte offset where the returned page starts.
+For a prepended file it is the distance from the end of the file, which does
+not move when new lines are written at the top.
+"""
+
+import os
+import threading
+from collections import deque
+
+BLOCK_SIZE = 8192
+
+
+def _decode(raw):
+    return raw.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def tail_lines(path, n, before=None, block_size=BLOCK_SIZE):
+    """
+    Return (lines, cursor): up to n non-blank lines ending at byte offset
+    `before` (end of file when None), oldest first. `cursor` is the offset of
+    the first returned line, to pass as `before` for the previous page, or
+    None once the start of the file is reached. A `before` outside the file
+    is clamped to it.
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size if before is None else min(max(before, 0), size)
+        pos = end
+        data = b""
+        while True:
+            # The first segment may start mid-line unless we are at the top of the file
+            complete = data.split(b"\n")[1 if pos > 0 else 0:]
+            if pos == 0 or sum(1 for raw in complete if raw.strip()) > n:
+                break
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    picked = []
+    offset = pos
+    for index, raw in enumerate(data.split(b"\n")):
+        if raw.strip() and (index > 0 or pos == 0):
+            picked.append((offset, raw))
+        offset += len(raw) + 1
+    picked = picked[-n:] if n > 0 else []
+    if not picked:
+        return [], None
+    cursor = picked[0][0]
+    if pos == 0 and not any(raw.strip() for raw in data[:cursor].split(b"\n")):
+        cursor = None
+    return [_decode(raw) for _, raw in picked], cursor
+
+
+def head_lines(path, n, after=None, block_size=BLOCK_SIZE):
+    """
+    Return (lines, cursor) for a newest-first file: up to n non-blank lines
+    starting `after` bytes before the end of the file (the top when None).
+    `cursor` is the distance from the end to pass as `after` for the next,
+    older page, or None once the end of the file is reached. An `after`
+    outside the file is clamped to it.
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        pos = 0 if after is None else size - min(max(after, 0), size)
+        f.seek(pos)
+        lines = []
+        pending = b""
+        while len(lines) < n:
+            chunk = f.read(block_size)
+            if not chunk:
+                if pending.strip():
+                    lines.append(_decode(pending))
+                return lines, None
+            pending += chunk
+            *complete, pending = pending.split(b"\n")
+            for raw in complete:
+                pos += len(raw) + 1
+                if raw.strip():
+                    lines.append(_decode(raw))
+                    if len(lines) == n:
+                        break
+    return lines, (size - pos) if pos < size else None
+
+
+class LogTail:
+    """
+    Keeps the last `keep` lines of an appended log in memory and, on each
+    refresh, reads only the bytes written since the previous one. Rotation or
+    truncation (new inode, or the file shrank) starts it over from the tail.
+    A final line still being written is left for the next refresh.
+    """
+
+    def __init__(self, path, keep=200):
+        self.path = path
+        self.keep = keep
+        self.lines = deque(maxlen=keep)
+        self.end = 0  # Offset just past the last complete line read
+        self.inode = None
+        self.lock = threading.Lock()
+
+    def _complete_end(self, size):
+        """Offset just past the last newline in the file."""
+        with open(self.path, "rb") as f:
+            pos = size
+            while pos > 0:
+                step = min(BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    return pos + newline + 1
+        return 0
+
+    def refresh(self):
+        st = os.stat(self.path)
+        if st.st_ino != self.inode or st.st_size < self.end:
+            self.inode = st.st_ino
+            self.end = self._complete_end(st.st_size)
+            self.lines = deque(tail_lines(self.path, self.keep, before=self.end)[0], maxlen=self.keep)
+            return
+        if st.st_size == self.end:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.end)
+            data = f.read(st.st_size - self.end)
+        complete = data[:data.rfind(b"\n") + 1]
+        self.end += len(complete)
+        self.lines.extend(_decode(raw) for raw in complete.split(b"\n") if raw.strip())
+
+    def recent(self, n):
+        """The last n non-blank lines, oldest first."""
+        with self.lock:
+            self.refresh()
+            if n <= len(self.lines):
+                return list(self.lines)[-n:]
+            end = self.end
+        return tail_lines(self.path, n, before=end)[0]
+
+    def page(self, before=None, n=50):
+        """A page of lines ending at cursor `before` (newest page when None); see tail_lines."""
+        if before is None:
+            with self.lock:
+                self.refresh()
+                before = self.end
+        return tail_lines(self.path, n, before=before)
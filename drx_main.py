@@ -21,12 +21,17 @@ import string
 import inspect
 import queue
 import uuid
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 from datetime import datetime, timedelta
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from typing import Optional, Callable, Dict, Any
 import pytz
 import tempfile
 import getpass
+from drx_observations import ObservationStore
+from drx_alert_archive import AlertArchive
+from drx_alert_audio import AlertAudioCache
 
 
 class PlaybackStatusManager:
@@ -36,18 +41,29 @@ class PlaybackStatusManager:
     Handles all status updates through a single interface, maintaining
     thread-safety and providing callbacks to keep legacy global variables
     synchronized.
+    
+    Updates change the status immediately but are published (callbacks and
+    write_state) from a background thread, at most once per frame interval.
+    A burst of updates, such as a repeat-mode restart every 50 ms, goes out
+    as one snapshot of the latest status, and the playback thread never waits
+    on publication.
     """
     
-    def __init__(self, write_state_callback: Optional[Callable] = None):
+    def __init__(self, write_state_callback: Optional[Callable] = None,
+                 frame_interval: float = 0.05):
         """
         Initialize the PlaybackStatusManager.
         
         Args:
             write_state_callback: Optional callback function to call after status updates
+            frame_interval: Minimum seconds between two publications
         """
         self._lock = threading.Lock()
         self._write_state_callback = write_state_callback
         self._status_callbacks: list[Callable] = []
+        self._frame_interval = frame_interval
+        self._publish_pending = threading.Condition(self._lock)
+        self._dirty = False
         
         # Internal status state
         self._playback_status = "Idle"
@@ -55,6 +71,9 @@ class PlaybackStatusManager:
         self._currently_playing_info = ""
         self._currently_playing_info_timestamp = 0
         
+        self._publisher = threading.Thread(target=self._publish_loop, name="status_publisher", daemon=True)
+        self._publisher.start()
+        
     def register_status_callback(self, callback: Callable[[str, str, str, float], None]):
         """
         Register a callback to be called when status changes.
@@ -101,9 +120,7 @@ class PlaybackStatusManager:
                 if section_context and self._currently_playing_info:
                     self._currently_playing_info = f"{self._currently_playing_info} {section_context}"
                     self._currently_playing_info_timestamp = time.time()
-        
-        self._notify_callbacks()
-        self._call_write_state()
+            self._schedule_publish()
     
     def set_idle(self):
         """
@@ -114,9 +131,7 @@ class PlaybackStatusManager:
             self._currently_playing = ""
             self._currently_playing_info = ""
             self._currently_playing_info_timestamp = 0
-        
-        self._notify_callbacks()
-        self._call_write_state()
+            self._schedule_publish()
     
     def update_info(self, info: str, section_context: Optional[str] = None):
         """
@@ -132,9 +147,7 @@ class PlaybackStatusManager:
             else:
                 self._currently_playing_info = info
             self._currently_playing_info_timestamp = time.time()
-        
-        self._notify_callbacks()
-        self._call_write_state()
+            self._schedule_publish()
     
     def get_status_info(self) -> Dict[str, Any]:
         """
@@ -167,20 +180,38 @@ class PlaybackStatusManager:
                 self._currently_playing_info = ""
                 self._currently_playing_info_timestamp = 0
                 
-                self._notify_callbacks()
+                self._schedule_publish()
                 return True
         return False
     
-    def _notify_callbacks(self):
-        """Notify all registered status callbacks of the current state."""
-        for callback in self._status_callbacks:
-            try:
-                callback(
+    def _schedule_publish(self):
+        """Mark the status as changed and wake the publisher. Call with self._lock held."""
+        self._dirty = True
+        self._publish_pending.notify()
+    
+    def _publish_loop(self):
+        """Publish the latest status whenever it changed, then hold off for one frame interval."""
+        while True:
+            with self._lock:
+                while not self._dirty:
+                    self._publish_pending.wait()
+                self._dirty = False
+                snapshot = (
                     self._playback_status,
-                    self._currently_playing, 
+                    self._currently_playing,
                     self._currently_playing_info,
                     self._currently_playing_info_timestamp
                 )
+                callbacks = list(self._status_callbacks)
+            self._notify_callbacks(snapshot, callbacks)
+            self._call_write_state()
+            time.sleep(self._frame_interval)
+    
+    def _notify_callbacks(self, snapshot: tuple, callbacks: list):
+        """Notify the given status callbacks of a status snapshot."""
+        for callback in callbacks:
+            try:
+                callback(*snapshot)
             except Exception as e:
                 # Don't let callback errors break status updates
                 print(f"Status callback error: {e}")
@@ -259,7 +290,6 @@ SCRIPT_NAME = "DRX"
 VERSION = "2.01.00"
 
 serial_buffer = ""
-serial_history = []
 currently_playing = ""
 currently_playing_info = ""
 currently_playing_info_timestamp = 0
@@ -295,7 +325,6 @@ DTMF_LOG_ARCHIVE_FMT = os.path.join(DRX_DIRECTORY, "dtmf-%Y-%m.log")
 dtmf_buffer = {}
 dtmf_lock = threading.Lock()
 STATE_FILE = os.path.join(DRX_DIRECTORY, "drx_state.json")  # NOTE: No longer used for writes - only for backward compatibility
-WEBCMD_FILE = '/tmp/drx_webcmd.json'
 LOG_WEB_FILE = os.path.join(DRX_DIRECTORY, "logs", "drx.log")
 tot_active = False
 tot_start_time = None
@@ -316,6 +345,7 @@ in_join_series = False
 # --- In-Memory State for REST API ---
 current_state_memory = {}
 state_lock = threading.Lock()
+state_changed = threading.Condition(state_lock)  # notified whenever state_version moves
 prev_currently_playing = ""
 last_played_memory = ""
 
@@ -456,6 +486,7 @@ def debug_log(*args):
         msg = " ".join(str(a) for a in args)
         formatted_msg = f"[{timestamp}] {msg}"
 
+        write_start = time.perf_counter()
         if os.path.exists(DEBUG_LOG_PATH):
             try:
                 with open(DEBUG_LOG_PATH, 'r') as f:
@@ -467,6 +498,7 @@ def debug_log(*args):
 
         with open(DEBUG_LOG_PATH, 'w') as f:
             f.write(formatted_msg + '\n' + existing_content)
+        metric_observe("drx_log_write_seconds", time.perf_counter() - write_start, log="debug")
 
         os.chmod(DEBUG_LOG_PATH, 0o777)
     except Exception as e:
@@ -519,7 +551,9 @@ def get_current_state():
     """
     global current_state_memory
     with state_lock:
-        return current_state_memory.copy()
+        state = current_state_memory.copy()
+    state.update(state_live_fields())
+    return state
 
 def parse_int_list(s, fallback=10, label="", section=""):
     vals = []
@@ -643,11 +677,260 @@ def log_exception(context: str):
 def log_recent(entry):
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
     try:
-        with open(LOG_WEB_FILE, "a", encoding='utf-8') as f:
-            f.write(f"{ts}: {entry}\n")
+        with metric_timer("drx_log_write_seconds", log="web"):
+            with open(LOG_WEB_FILE, "a", encoding='utf-8') as f:
+                f.write(f"{ts}: {entry}\n")
     except Exception as e:
         log_error(f"log_recent failed: {e}")
 
+# --- Command Tracing ---
+# Each command carries a trace from arrival to completion. Marks use
+# time.monotonic_ns() so ordering and sub-millisecond gaps survive, and
+# finished traces are kept in a fixed-size ring buffer for /api/traces.
+TRACE_BUFFER_SIZE = 200
+command_traces = [None] * TRACE_BUFFER_SIZE
+command_trace_index = 0
+trace_lock = threading.Lock()
+trace_context = threading.local()
+
+def trace_start(command, source, arrival_ns=None):
+    return {
+        "id": uuid.uuid4().hex[:12],
+        "cmd": command,
+        "src": source,
+        "wall": time.time(),
+        "marks": [("arrival", arrival_ns or time.monotonic_ns())],
+    }
+
+def trace_mark(stage, trace=None):
+    """
+    Record a stage on the given trace, or on the trace of the command this thread is running.
+    Only the first time: a command that plays several clips (W1, W3, play_sequence) passes
+    the play path's marks once per clip, and the trace is about the way to the first audio.
+    """
+    trace = trace if trace is not None else getattr(trace_context, "trace", None)
+    if trace is not None and all(name != stage for name, _ in trace["marks"]):
+        trace["marks"].append((stage, time.monotonic_ns()))
+
+def trace_finish(trace):
+    global command_trace_index
+    trace_mark("complete", trace)
+    with trace_lock:
+        command_traces[command_trace_index] = trace
+        command_trace_index = (command_trace_index + 1) % TRACE_BUFFER_SIZE
+
+def queue_command(command, source="Serial", arrival_ns=None):
+    trace = trace_start(command, source, arrival_ns)
+    trace_mark("queued", trace)
+    command_queue.put((command, trace))
+    return trace
+
+def summarize_trace(trace):
+    """Break a trace into per-stage durations (ms); each stage runs from the previous mark to its own."""
+    marks = trace["marks"]
+    stages = []
+    for (_, prev_ns), (stage, ns) in zip(marks, marks[1:]):
+        stages.append({"stage": stage, "ms": round((ns - prev_ns) / 1e6, 3)})
+    return {
+        "id": trace["id"],
+        "cmd": trace["cmd"],
+        "src": trace["src"],
+        "ts": datetime.fromtimestamp(trace["wall"]).strftime('%Y-%m-%d %H:%M:%S'),
+        "total_ms": round((marks[-1][1] - marks[0][1]) / 1e6, 3),
+        "stages": stages,
+    }
+
+def get_recent_traces():
+    with trace_lock:
+        ordered = command_traces[command_trace_index:] + command_traces[:command_trace_index]
+    return [summarize_trace(t) for t in reversed(ordered) if t is not None]
+
+# --- Event Journal ---
+class EventJournal:
+    """
+    Fixed-capacity ring buffer of command events shared by every thread.
+
+    Each event is a record with a global sequence number, so readers keep a
+    cursor and ask only for what arrived after it instead of copying a list.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self._slots: list = [None] * capacity
+        self._seq = 0
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the newest event (0 before the first one)."""
+        return self._seq
+
+    def record(self, cmd: str, src: str, outcome: str = "") -> int:
+        """
+        Append an event and return its sequence number.
+
+        Args:
+            cmd: The command or line as it should be shown
+            src: Where it came from (Serial, Web, Command)
+            outcome: What happened to it (queued, started, failed, ...)
+        """
+        with self._lock:
+            self._seq += 1
+            self._slots[self._seq % self._capacity] = {
+                "seq": self._seq,
+                "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "src": src,
+                "cmd": cmd,
+                "outcome": outcome,
+            }
+            return self._seq
+
+    def since(self, cursor: int = 0, limit: Optional[int] = None) -> tuple:
+        """
+        Events after `cursor`, oldest first, and the cursor to pass next time.
+        Events that already fell out of the buffer are skipped.
+        """
+        with self._lock:
+            newest = self._seq
+            first = max(cursor + 1, newest - self._capacity + 1, 1)
+            if limit is not None:
+                first = max(first, newest - limit + 1)
+            events = [self._slots[s % self._capacity] for s in range(first, newest + 1)]
+        return events, newest
+
+    def latest(self, n: int) -> list:
+        """The newest n events, newest first."""
+        return self.since(0, n)[0][::-1]
+
+JOURNAL_CAPACITY = 256
+event_journal = EventJournal(JOURNAL_CAPACITY)
+
+# --- Metrics ---
+# Counters and histograms are plain dict entries behind one lock that is only
+# held for the update itself; gauges are read from live state when /metrics is
+# scraped. Exposed in the Prometheus text format.
+METRIC_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS = {
+    "drx_commands_total": ("counter", "Commands processed, by command type and source."),
+    "drx_command_seconds": ("histogram", "Time from command arrival to completion."),
+    "drx_playback_starts_total": ("counter", "Playbacks started (aplay or sox spawned), by mode."),
+    "drx_playback_total": ("counter", "Playbacks finished, by mode and outcome."),
+    "drx_cos_keyups_total": ("counter", "COS inactive-to-active transitions."),
+    "drx_cos_active_seconds_total": ("counter", "Seconds COS has been active."),
+    "drx_interrupt_latency_seconds": ("histogram", "Time from COS keyup or stop request to interrupted audio stopping."),
+    "drx_spawn_seconds": ("histogram", "Time to spawn audio and speech processes, by program."),
+    "drx_serial_connects_total": ("counter", "Serial port connection attempts, by result."),
+    "drx_serial_errors_total": ("counter", "Serial device errors that dropped the connection."),
+    "drx_wx_parse_seconds": ("histogram", "Time to read and parse wx/wx_data, by report."),
+    "drx_log_write_seconds": ("histogram", "Time to write one log entry, by log."),
+    "drx_prerender_seconds": ("histogram", "Time to pre-render an announcement to WAV, by kind."),
+    "drx_alert_announcements_total": ("counter", "Alert announcements played, by source: broadcast audio, rendered or live."),
+    "drx_wx_pushes_total": ("counter", "Weather updates pushed by drx_wx, by kind and whether they changed anything."),
+    "drx_command_queue_depth": ("gauge", "Commands waiting in the command queue."),
+    "drx_cos_active": ("gauge", "1 while COS is active."),
+    "drx_playing": ("gauge", "1 while a sound is playing."),
+    "drx_thread_alive": ("gauge", "1 while a background thread is running, by thread."),
+    "drx_state_version": ("gauge", "Current /api/state version."),
+    "drx_uptime_seconds": ("gauge", "Seconds since drx_main started."),
+    "drx_wx_fetch_failures": ("gauge", "Consecutive failed fetches of a weather source, as last pushed by drx_wx."),
+    "drx_wx_fetch_breaker_open": ("gauge", "1 while a weather source's circuit breaker is open or half-open."),
+    "drx_wx_fetch_latency_seconds": ("gauge", "Duration of the last fetch of a weather source."),
+    "drx_wx_data_age_seconds": ("gauge", "Age of the weather data in use from a source, when drx_wx last reported."),
+}
+metric_values = {}  # (name, labels) -> number, or histogram [bucket counts..., sum, count]
+metrics_lock = threading.Lock()
+monitored_threads = {}  # name -> Thread started through start_thread()
+interrupt_requested_ns = 0  # monotonic time of the latest COS keyup or stop request
+
+def metric_inc(name, amount=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with metrics_lock:
+        metric_values[key] = metric_values.get(key, 0) + amount
+
+def metric_observe(name, seconds, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with metrics_lock:
+        hist = metric_values.get(key)
+        if hist is None:
+            hist = metric_values[key] = [0] * len(METRIC_BUCKETS) + [0.0, 0]
+        for i, bound in enumerate(METRIC_BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+                break
+        hist[-2] += seconds
+        hist[-1] += 1
+
+@contextlib.contextmanager
+def metric_timer(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric_observe(name, time.perf_counter() - start, **labels)
+
+def command_metric_type(command):
+    """Bounded label for a command: TOT/TOP/RE or its leading letter, else 'other'."""
+    m = re.match(r'(TOT|TOP|RE|[A-Z])', command.strip().upper())
+    return m.group(1) if m else "other"
+
+def start_thread(target):
+    """Start a daemon thread and keep it in monitored_threads for the liveness gauge."""
+    thread = threading.Thread(target=target, name=target.__name__, daemon=True)
+    monitored_threads[target.__name__] = thread
+    thread.start()
+    return thread
+
+def metric_gauges():
+    gauges = [
+        ("drx_command_queue_depth", (), command_queue.qsize()),
+        ("drx_cos_active", (), int(bool(cos_active))),
+        ("drx_playing", (), int(bool(currently_playing) and currently_playing.lower() != "idle")),
+        ("drx_state_version", (), state_version),
+        ("drx_uptime_seconds", (), round(time.time() - DRX_START_TIME, 1)),
+    ]
+    for name, thread in monitored_threads.items():
+        gauges.append(("drx_thread_alive", (("thread", name),), int(thread.is_alive())))
+    sources = (wx_fetch_status or {}).get("sources") or {}
+    for source, status in sources.items():
+        labels = (("source", source),)
+        gauges.append(("drx_wx_fetch_failures", labels, status.get("failures") or 0))
+        gauges.append(("drx_wx_fetch_breaker_open", labels, int(status.get("state") != "closed")))
+        if status.get("latency") is not None:
+            gauges.append(("drx_wx_fetch_latency_seconds", labels, status["latency"]))
+        if status.get("value_age") is not None:
+            gauges.append(("drx_wx_data_age_seconds", labels, status["value_age"]))
+    return gauges
+
+def format_metric_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def render_metrics():
+    with metrics_lock:
+        values = {key: (list(v) if isinstance(v, list) else v) for key, v in metric_values.items()}
+    for name, labels, value in metric_gauges():
+        values[(name, labels)] = value
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        series = sorted((labels, v) for (n, labels), v in values.items() if n == name)
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in series:
+            if kind != "histogram":
+                lines.append(f"{name}{format_metric_labels(labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(METRIC_BUCKETS, value):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_metric_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{format_metric_labels(labels, [('le', '+Inf')])} {value[-1]}")
+            lines.append(f"{name}_sum{format_metric_labels(labels)} {round(value[-2], 6)}")
+            lines.append(f"{name}_count{format_metric_labels(labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
 def check_sox_installed():
     if shutil.which("sox") is None:
         log_error("sox is not installed! 'P' mode will not work.")
@@ -676,10 +959,22 @@ def command_processor_loop():
     worker_id = str(uuid.uuid4())[:8]
     debug_log(f"Worker {worker_id}: starting")
     while True:
-        cmd = command_queue.get()
+        item = command_queue.get()
+        if isinstance(item, tuple):
+            cmd, trace = item
+        else:
+            cmd, trace = item, trace_start(item, "Internal")
+        trace_mark("dequeued", trace)
+        trace_context.trace = trace
         debug_log(f"Worker {worker_id}: Processing command: {cmd}")
-        process_command(cmd)
-        command_queue.task_done()
+        try:
+            process_command(cmd)
+        finally:
+            trace_context.trace = None
+            trace_finish(trace)
+            metric_inc("drx_commands_total", type=command_metric_type(cmd), src=trace["src"])
+            metric_observe("drx_command_seconds", (trace["marks"][-1][1] - trace["marks"][0][1]) / 1e9)
+            command_queue.task_done()
 
 def is_cos_active():
     override_enabled = config.getboolean('Debug', 'enable_cos_override', fallback=False) if config.has_section('Debug') else False
@@ -976,11 +1271,7 @@ def process_command(command, defer_message_timer_update=False, suppress_remote_b
                 track_num = int(command[2:].strip())
                 debug_log(f"Echo Test command detected with track number: {track_num}")
                 echo_test(track_num)
-                serial_history.insert(0, {
-                    "cmd": f"Echo Test: {track_num:04d}",
-                    "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    "src": "Command"
-                })
+                event_journal.record(f"Echo Test: {track_num:04d}", "Command", "started")
                 log_recent(f"Echo Test started for track {track_num}")
                 return
             except ValueError:
@@ -993,11 +1284,7 @@ def process_command(command, defer_message_timer_update=False, suppress_remote_b
                 script_num = command[1:].strip()
                 debug_log(f"Script command detected: {script_num}")
                 run_script(script_num)
-                serial_history.insert(0, {
-                    "cmd": f"Script: {script_num}",
-                    "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    "src": "Command"
-                })
+                event_journal.record(f"Script: {script_num}", "Command", "started")
                 log_recent(f"Script execution started: {script_num}")
                 return
             except Exception as e:
@@ -1029,6 +1316,7 @@ def process_command(command, defer_message_timer_update=False, suppress_remote_b
 
         # --- Serial (direct) and section logic ---
         code_str, suffix, alt_code = parse_serial_command(command.strip())
+        trace_mark("parsed")
         if code_str is None:
             cancel_rate_limited_timer()
             status_manager.set_idle()
@@ -1109,7 +1397,6 @@ def process_command(command, defer_message_timer_update=False, suppress_remote_b
                     b, e, t * 60,
                     sudo_random_last_interval,
                     sudo_random_interval_track,
-                    sudo_random_played_in_cycle,
                     interruptible, pausing, repeat, wait_for_cos=wait_for_cos,
                     suppress_remote_busy_clear=suppress_remote_busy_clear
                 )
@@ -1181,6 +1468,7 @@ def play_sound(
     global currently_playing, currently_playing_info, currently_playing_info_timestamp, playing_end_time
     global playback_interrupt, playback_status, sound_card_missing, current_playback_token, MAX_COS_INTERRUPTIONS
     global h
+    trace_mark("resolved")
 
     # --- DEBUG: Show what file is about to play and if it exists ---
     debug_log(f"play_sound: absolute filename to play: {os.path.abspath(filename)}")
@@ -1191,11 +1479,14 @@ def play_sound(
     debug_log(f"play_sound: filename={filename} interruptible={interruptible} pausing={pausing} repeating={repeating} wait_for_cos={wait_for_cos}")
 
     section_context = detect_section_context(filename)
+    if section_context:
+        note_prefetch_result(filename)
     playing_name = display_name if display_name else os.path.splitext(os.path.basename(filename))[0]
     status_manager.set_status("Playing", playing_name, None, section_context)
 
     success = False
     interrupted = False
+    play_started_ns = time.monotonic_ns()
 
     try:
         if wait_for_cos:
@@ -1231,6 +1522,7 @@ def play_sound(
                 if time.time() - debounce_start >= COS_DEBOUNCE_TIME:
                     debug_log(f"WaitForCOS: Successfully waited through full debounce period of {COS_DEBOUNCE_TIME} seconds")
                     break
+            trace_mark("cos_wait")
 
             debug_log(f"Setting REMOTE_BUSY to {REMOTE_BUSY_ACTIVE_LEVEL} (wait_for_cos mode - play)")
             set_remote_busy(True)
@@ -1238,11 +1530,10 @@ def play_sound(
 
             proc = None
             try:
-                proc = subprocess.Popen(
-                    ['aplay', '-D', SOUND_DEVICE, filename],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.PIPE
-                )
+                trace_mark("spawn")
+                metric_inc("drx_playback_starts_total", mode="wait_for_cos")
+                proc = start_aplay(filename, stderr=subprocess.PIPE)
+                trace_mark("first_audio")
                 while proc.poll() is None:
                     if playback_token is not None and playback_token != current_playback_token:
                         proc.terminate()
@@ -1304,11 +1595,10 @@ def play_sound(
                 debug_log(f"Setting REMOTE_BUSY to {REMOTE_BUSY_ACTIVE_LEVEL} (repeat - play)")
                 set_remote_busy(True)
                 try:
-                    proc = subprocess.Popen(
-                        ['aplay', '-D', SOUND_DEVICE, filename],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.PIPE
-                    )
+                    trace_mark("spawn")
+                    metric_inc("drx_playback_starts_total", mode="repeat")
+                    proc = start_aplay(filename, stderr=subprocess.PIPE)
+                    trace_mark("first_audio")
                 except Exception as e:
                     debug_log("Exception in REPEAT mode (Popen):", e)
                     traceback.print_exc()
@@ -1406,8 +1696,13 @@ def play_sound(
                 ]
                 debug_log(f"PAUSE MODE: sox_cmd={' '.join(str(x) for x in sox_cmd)} (played_duration={played_duration:.2f}/{total_duration:.2f})")
                 try:
-                    proc1 = subprocess.Popen(sox_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
-                    proc2 = subprocess.Popen(['aplay', '-D', SOUND_DEVICE], stdin=proc1.stdout, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    trace_mark("spawn")
+                    metric_inc("drx_playback_starts_total", mode="pause")
+                    with metric_timer("drx_spawn_seconds", program="sox"):
+                        proc1 = subprocess.Popen(sox_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                    with metric_timer("drx_spawn_seconds", program="aplay"):
+                        proc2 = subprocess.Popen(['aplay', '-D', SOUND_DEVICE], stdin=proc1.stdout, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    trace_mark("first_audio")
                     proc1.stdout.close()
                 except FileNotFoundError:
                     sound_card_missing = True
@@ -1483,11 +1778,10 @@ def play_sound(
             debug_log(f"Setting REMOTE_BUSY to {REMOTE_BUSY_ACTIVE_LEVEL} (interruptible - play)")
             set_remote_busy(True)
             try:
-                proc = subprocess.Popen(
-                    ['aplay', '-D', SOUND_DEVICE, filename],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.PIPE
-                )
+                trace_mark("spawn")
+                metric_inc("drx_playback_starts_total", mode="interruptible")
+                proc = start_aplay(filename, stderr=subprocess.PIPE)
+                trace_mark("first_audio")
                 while proc.poll() is None:
                     if playback_token is not None and playback_token != current_playback_token:
                         proc.terminate()
@@ -1534,11 +1828,10 @@ def play_sound(
             debug_log(f"Setting REMOTE_BUSY to {REMOTE_BUSY_ACTIVE_LEVEL} (normal - play)")
             set_remote_busy(True)
             try:
-                proc = subprocess.Popen(
-                    ['aplay', '-D', SOUND_DEVICE, filename],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.PIPE
-                )
+                trace_mark("spawn")
+                metric_inc("drx_playback_starts_total", mode="normal")
+                proc = start_aplay(filename, stderr=subprocess.PIPE)
+                trace_mark("first_audio")
                 while proc.poll() is None:
                     if playback_token is not None and playback_token != current_playback_token:
                         proc.terminate()
@@ -1596,6 +1889,10 @@ def play_sound(
             'normal'
         )
         log_name = display_name or playing_name or os.path.basename(filename)
+        outcome = "successful" if success else "interrupted" if interrupted else "error"
+        metric_inc("drx_playback_total", mode=play_mode, outcome=outcome)
+        if interrupted and interrupt_requested_ns > play_started_ns:
+            metric_observe("drx_interrupt_latency_seconds", (time.monotonic_ns() - interrupt_requested_ns) / 1e9)
         if success:
             log_recent(f"Play: {log_name} [{play_mode}] - successful")
         elif interrupted:
@@ -1642,6 +1939,7 @@ def play_single_wav(
                 status_manager.set_idle()
             return False
         filename = os.path.join(SOUND_DIRECTORY, matches[0])
+    trace_mark("resolved")
 
     debug_log(
         f"play_single_wav: filename={filename}, interrupt_on_cos={interrupt_on_cos}, block_interrupt={block_interrupt}, wait_for_cos={wait_for_cos}"
@@ -1685,16 +1983,16 @@ def play_single_wav(
                 return False
             time.sleep(0.1)
         debug_log("wait_for_cos: Debounce successful, proceeding to play")
+        trace_mark("cos_wait")
 
     try:
         playing_name = os.path.splitext(os.path.basename(filename))[0]
         if set_status_on_play and reset_status_on_end:
             status_manager.set_status("Playing", playing_name)
-        proc = subprocess.Popen(
-            ['aplay', '-D', SOUND_DEVICE, filename],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
+        trace_mark("spawn")
+        metric_inc("drx_playback_starts_total", mode="single")
+        proc = start_aplay(filename, stderr=subprocess.DEVNULL)
+        trace_mark("first_audio")
     except Exception as e:
         debug_log("Exception starting aplay:", e)
         if reset_status_on_end:
@@ -1785,18 +2083,9 @@ def get_next_base_file(base_code):
         matching_files = find_matching_files(base_code, end)
         if not matching_files:
             return None
-        played_in_cycle = sudo_random_played_in_cycle.get(base_code, set())
-        if not isinstance(played_in_cycle, set):
-            played_in_cycle = set(played_in_cycle)
-        unused_tracks = [t for t in matching_files if t not in played_in_cycle]
-        if not unused_tracks:
-            played_in_cycle = set()
-            unused_tracks = matching_files[:]
-        chosen = random.choice(unused_tracks)
+        chosen = draw_sudo_random_track(base_code, end, matching_files)
         sudo_random_interval_track[base_code] = chosen
         sudo_random_last_interval[base_code] = time.time()
-        played_in_cycle.add(chosen)
-        sudo_random_played_in_cycle[base_code] = played_in_cycle
         return chosen
     else:
         #Match dash-suffixed files for direct (non-section) case
@@ -1812,7 +2101,7 @@ def play_any_section_by_type(base, end, interval, typ, interruptible, repeat, pa
     elif typ == "Rotation":
         play_rotating_section(base, end, interval, rotation_last_played, rotation_current_track, interruptible, wait_for_cos=wait_for_cos)
     elif typ == "SudoRandom":
-        play_sudo_random_section(base, end, interval, sudo_random_last_interval, sudo_random_interval_track, sudo_random_played_in_cycle, interruptible, repeat, pausing, wait_for_cos=wait_for_cos)
+        play_sudo_random_section(base, end, interval, sudo_random_last_interval, sudo_random_interval_track, interruptible, repeat, pausing, wait_for_cos=wait_for_cos)
     else:
         play_direct_track(f"{base:04d}", interruptible, repeat, pausing, wait_for_cos=wait_for_cos)
 
@@ -1839,12 +2128,7 @@ def play_rotating_section(
         current_time = time.time()
         last_played = last_played_dict.get(base, 0)
 
-        available_tracks = []
-        for track_num in range(base + 1, end + 1):
-            for f in os.listdir(SOUND_DIRECTORY):
-                if match_code_file(f, f"{track_num:04d}", SOUND_FILE_EXTENSION):
-                    available_tracks.append((track_num, f))
-                    break
+        available_tracks = rotation_tracks(base, end)
 
         if not available_tracks:
             status_manager.set_idle()
@@ -1997,7 +2281,6 @@ def play_sudo_random_section(
     interval,
     last_interval_dict,
     interval_track_dict,
-    played_in_cycle_dict,
     interruptible=False,
     pausing=False,
     repeat=False,
@@ -2012,22 +2295,12 @@ def play_sudo_random_section(
         return
     last_interval = last_interval_dict.get(base, 0)
     current_track = interval_track_dict.get(base)
-    played_in_cycle = played_in_cycle_dict.get(base)
-    if played_in_cycle is None:
-        played_in_cycle = set()
     if current_track is not None and (current_time - last_interval < interval) and current_track in matching_files:
         file_to_play = current_track
     else:
-        unused_tracks = [t for t in matching_files if t not in played_in_cycle]
-        if not unused_tracks:
-            played_in_cycle = set()
-            unused_tracks = matching_files[:]
-        new_track = random.choice(unused_tracks)
-        file_to_play = new_track
+        file_to_play = draw_sudo_random_track(base, end, matching_files)
         interval_track_dict[base] = file_to_play
         last_interval_dict[base] = current_time
-        played_in_cycle.add(file_to_play)
-    played_in_cycle_dict[base] = played_in_cycle
     sudo_random_last_file[base] = file_to_play
 
     filebase = os.path.splitext(os.path.basename(file_to_play))[0]
@@ -2160,16 +2433,401 @@ def play_interrupt_to_another(base_filename, code2, playback_token=None):
         set_remote_busy(False)
         status_manager.set_idle()
 
-def find_matching_files(base, end):
-    files = []
+def matching_files_by_track(base, end):
+    """
+    [(track number, [files])] for the tracks base..end that have files, each
+    track's files in directory listing order. The result is cached per range and
+    only rebuilt when the sound directory's mtime changes (a file was added,
+    removed or renamed).
+    """
     try:
+        mtime = os.stat(SOUND_DIRECTORY).st_mtime_ns
+        key = (SOUND_DIRECTORY, base, end)
+        cached = matching_files_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        listing = os.listdir(SOUND_DIRECTORY)
+        tracks = []
         for track_num in range(base, end + 1):
-            matching = [f for f in os.listdir(SOUND_DIRECTORY)
+            matching = [os.path.join(SOUND_DIRECTORY, f) for f in listing
                         if match_code_file(f, f"{track_num:04d}", SOUND_FILE_EXTENSION)]
-            files.extend([os.path.join(SOUND_DIRECTORY, f) for f in matching])
+            if matching:
+                tracks.append((track_num, matching))
+        matching_files_cache[key] = (mtime, tracks)
+        return tracks
     except Exception:
-        log_exception("find_matching_files")
-    return files
+        log_exception("matching_files_by_track")
+    return []
+
+def find_matching_files(base, end):
+    """Files for tracks base..end, every variant of each track."""
+    return [f for _, files in matching_files_by_track(base, end) for f in files]
+
+def rotation_tracks(base, end):
+    """[(track number, file name)] a Rotating section cycles through: the first file of each track after base."""
+    return [(track_num, os.path.basename(files[0])) for track_num, files in matching_files_by_track(base + 1, end)]
+
+# --- SudoRandom Decks ---
+# Each SudoRandom base plays through a shuffled deck; the cursor marks how many
+# tracks of the current cycle have been played. Decks survive restarts via
+# SUDO_DECK_FILE and are patched in place when tracks are added or removed.
+SUDO_DECK_FILE = os.path.join(DRX_DIRECTORY, "sudo_decks.json")
+sudo_decks = {}  # base -> {"deck": [paths], "cursor": int, "files": set of paths, "mtime": listing mtime}
+sudo_deck_lock = threading.Lock()
+matching_files_cache = {}
+
+def load_sudo_decks():
+    try:
+        with open(SUDO_DECK_FILE, "r") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return
+    except Exception:
+        log_exception("load_sudo_decks")
+        return
+    with sudo_deck_lock:
+        for base, entry in saved.items():
+            deck = [os.path.join(SOUND_DIRECTORY, name) for name in entry.get("deck", [])]
+            cursor = min(int(entry.get("cursor", 0)), len(deck))
+            sudo_decks[int(base)] = {"deck": deck, "cursor": cursor, "files": None, "mtime": None}
+    debug_log(f"Loaded SudoRandom decks for bases {sorted(sudo_decks)}")
+
+def save_sudo_decks():
+    with sudo_deck_lock:
+        data = {
+            str(base): {"cursor": d["cursor"], "deck": [os.path.basename(p) for p in d["deck"]]}
+            for base, d in sudo_decks.items()
+        }
+    tmp_path = SUDO_DECK_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, SUDO_DECK_FILE)
+    except Exception as e:
+        debug_log(f"save_sudo_decks failed: {e}")
+
+def reconcile_sudo_deck(d, matching_files):
+    """Drop tracks that are gone and shuffle new ones into the unplayed part of the deck."""
+    current = set(matching_files)
+    known = d["files"] if d["files"] is not None else set(d["deck"])
+    removed = known - current
+    added = current - known
+    if removed:
+        played_removed = sum(1 for p in d["deck"][:d["cursor"]] if p in removed)
+        d["deck"] = [p for p in d["deck"] if p not in removed]
+        d["cursor"] -= played_removed
+    for p in added:
+        d["deck"].insert(random.randint(d["cursor"], len(d["deck"])), p)
+    d["files"] = current
+    if removed or added:
+        debug_log(f"SudoRandom deck reconciled: {len(added)} added, {len(removed)} removed")
+
+def draw_sudo_random_track(base, end, matching_files):
+    """Next track for a SudoRandom base; starts a freshly shuffled cycle when the deck runs out."""
+    cached = matching_files_cache.get((SOUND_DIRECTORY, base, end))
+    listing_mtime = cached[0] if cached else None
+    with sudo_deck_lock:
+        d = sudo_decks.get(base)
+        if d is None:
+            d = {"deck": [], "cursor": 0, "files": set(), "mtime": None}
+            sudo_decks[base] = d
+        if listing_mtime is None or d.get("mtime") != listing_mtime:
+            reconcile_sudo_deck(d, matching_files)
+            d["mtime"] = listing_mtime
+        if d["cursor"] >= len(d["deck"]):
+            last = d["deck"][-1] if d["deck"] else None
+            random.shuffle(d["deck"])
+            # Don't let the new cycle open with the track that closed the last one
+            if len(d["deck"]) > 1 and d["deck"][0] == last:
+                swap = random.randint(1, len(d["deck"]) - 1)
+                d["deck"][0], d["deck"][swap] = d["deck"][swap], d["deck"][0]
+            d["cursor"] = 0
+        chosen = d["deck"][d["cursor"]]
+        d["cursor"] += 1
+    save_sudo_decks()
+    return chosen
+
+def sudo_deck_played(base):
+    """Tracks already played in the current cycle for a SudoRandom base."""
+    with sudo_deck_lock:
+        d = sudo_decks.get(base)
+        return d["deck"][:d["cursor"]] if d else []
+
+def peek_sudo_random_track(base):
+    """The track the next draw will return, or None if a reshuffle is due."""
+    with sudo_deck_lock:
+        d = sudo_decks.get(base)
+        if d and d["cursor"] < len(d["deck"]):
+            return d["deck"][d["cursor"]]
+    return None
+
+# --- Next-Track Prefetch ---
+# The section selectors are deterministic until their interval runs out, so the
+# file each base will play next is usually known. sound_prefetch_loop asks the
+# kernel to pull those files into the page cache (posix_fadvise WILLNEED) so a
+# play after a long idle does not stall on a cold SD card read.
+prefetch_warm = {}  # path -> size in bytes
+prefetch_last = {}  # base -> (path, mtime) last warmed for it
+prefetch_stats = {"hits": 0, "misses": 0, "warmed": 0}
+prefetch_lock = threading.Lock()
+prefetch_wakeup = threading.Event()
+
+def predict_next_files():
+    """The (base, path) each rotating, random and sudo base is expected to play next."""
+    now = time.time()
+    predicted = []
+    for b, e, t in zip(rotation_bases, rotation_ends, rotation_times):
+        # The same file play_rotating_section will pick: one per track, found by track number
+        tracks = rotation_tracks(b, e)
+        if not tracks:
+            continue
+        current = rotation_current_track.get(b)
+        current_num = next((num for num, name in tracks if name == current), None)
+        idx = next((i for i, (num, _) in enumerate(tracks) if num == current_num), 0)
+        last = rotation_last_played.get(b, 0)
+        if last and now - last >= t * 60:
+            idx = (idx + 1) % len(tracks)
+        predicted.append((b, os.path.join(SOUND_DIRECTORY, tracks[idx][1])))
+    for b, e, t in zip(random_bases, random_ends, random_intervals):
+        current = random_current_track.get(b)
+        if current and now - random_last_played.get(b, 0) < t * 60:
+            predicted.append((b, current))
+    for b, e, t in zip(sudo_bases, sudo_ends, sudo_intervals):
+        current = sudo_random_interval_track.get(b)
+        if current and now - sudo_random_last_interval.get(b, 0) < t * 60:
+            predicted.append((b, current))
+        else:
+            upcoming = peek_sudo_random_track(b)
+            if upcoming:
+                predicted.append((b, upcoming))
+    return predicted
+
+def warm_file(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            while os.read(fd, 1 << 16):
+                pass
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+
+def sound_prefetch_loop():
+    while True:
+        prefetch_wakeup.wait(timeout=5)
+        prefetch_wakeup.clear()
+        try:
+            budget = config.getfloat('Sound', 'prefetch_budget_mb', fallback=16) * 1024 * 1024
+            warm = {}
+            last = {}
+            used = 0
+            for base, path in predict_next_files():
+                if path in warm:
+                    continue
+                try:
+                    st = os.stat(path)
+                    if used + st.st_size > budget:
+                        continue
+                    # Only fadvise again when this base's prediction (or the file) has changed
+                    if prefetch_last.get(base) != (path, st.st_mtime):
+                        warm_file(path)
+                except OSError:
+                    continue
+                last[base] = (path, st.st_mtime)
+                warm[path] = st.st_size
+                used += st.st_size
+            prefetch_last.clear()
+            prefetch_last.update(last)
+            with prefetch_lock:
+                new_files = len(set(warm) - set(prefetch_warm))
+                prefetch_warm.clear()
+                prefetch_warm.update(warm)
+                prefetch_stats["warmed"] += new_files
+        except Exception:
+            log_exception("sound_prefetch_loop")
+
+def note_prefetch_result(filename):
+    """Count a section play as a prefetch hit or miss, then let the prefetcher look ahead again."""
+    with prefetch_lock:
+        if filename in prefetch_warm:
+            prefetch_stats["hits"] += 1
+        else:
+            prefetch_stats["misses"] += 1
+    prefetch_wakeup.set()
+
+def get_prefetch_stats():
+    with prefetch_lock:
+        total = prefetch_stats["hits"] + prefetch_stats["misses"]
+        return {
+            "hits": prefetch_stats["hits"],
+            "misses": prefetch_stats["misses"],
+            "hit_rate": round(prefetch_stats["hits"] / total, 3) if total else None,
+            "warmed": prefetch_stats["warmed"],
+            "warm_files": len(prefetch_warm),
+            "warm_bytes": sum(prefetch_warm.values()),
+        }
+
+# --- Sound Warm Set ---
+# Every aplay start of a file in the sound directories is counted per file
+# (renders, caches and temp files are not). warm_set_rebalance_loop periodically
+# loads the most played WAVs into memory as raw PCM (within a memory budget),
+# and start_aplay streams those to aplay's stdin instead of reading the SD card.
+PLAY_COUNTS_FILE = os.path.join(DRX_DIRECTORY, "play_counts.json")
+APLAY_FORMATS = {1: "U8", 2: "S16_LE", 3: "S24_3LE", 4: "S32_LE"}
+play_counts = {}  # path -> number of plays
+warm_set = {}  # path -> {"channels", "width", "rate", "frames", "mtime"}
+warm_set_stats = {"memory_plays": 0, "disk_plays": 0}
+warm_set_lock = threading.Lock()
+
+def is_warmable_sound(path):
+    """True for files directly in the sound directories; renders, caches and temp files are not counted."""
+    if path.endswith(".tmp.wav"):
+        return False
+    directory = os.path.dirname(os.path.abspath(path))
+    return directory in (os.path.abspath(SOUND_DIRECTORY), os.path.abspath(EXTRA_SOUND_DIR))
+
+def start_aplay(filename, stderr=subprocess.DEVNULL):
+    """Start aplay for filename, fed from the warm set when the file is resident."""
+    warmable = is_warmable_sound(filename)
+    try:
+        mtime = os.stat(filename).st_mtime_ns
+    except OSError:
+        mtime = None
+    with warm_set_lock:
+        if warmable:
+            play_counts[filename] = play_counts.get(filename, 0) + 1
+        entry = warm_set.get(filename)
+        if entry is not None and entry["mtime"] != mtime:
+            # Rewritten in place (e.g. 9995-WX Alert.wav) since it was loaded; play the new file from disk
+            del warm_set[filename]
+            entry = None
+        warm_set_stats["memory_plays" if entry else "disk_plays"] += 1
+    if entry is None:
+        with metric_timer("drx_spawn_seconds", program="aplay"):
+            return subprocess.Popen(
+                ['aplay', '-D', SOUND_DEVICE, filename],
+                stdout=subprocess.DEVNULL,
+                stderr=stderr
+            )
+    with metric_timer("drx_spawn_seconds", program="aplay"):
+        proc = subprocess.Popen(
+            ['aplay', '-D', SOUND_DEVICE, '-q', '-t', 'raw', '-f', APLAY_FORMATS[entry["width"]],
+             '-r', str(entry["rate"]), '-c', str(entry["channels"]), '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr
+        )
+    threading.Thread(target=feed_aplay, args=(proc, entry["frames"]), daemon=True).start()
+    return proc
+
+def feed_aplay(proc, frames):
+    try:
+        proc.stdin.write(frames)
+    except Exception:
+        pass  # aplay was stopped (COS interrupt, stop command) before it took everything
+    finally:
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+
+def load_pcm(path):
+    with contextlib.closing(wave.open(path, 'rb')) as w:
+        if w.getcomptype() != 'NONE' or w.getsampwidth() not in APLAY_FORMATS:
+            return None
+        return {
+            "channels": w.getnchannels(),
+            "width": w.getsampwidth(),
+            "rate": w.getframerate(),
+            "frames": w.readframes(w.getnframes()),
+        }
+
+def rebalance_warm_set():
+    budget = config.getfloat('Sound', 'warm_set_budget_mb', fallback=32) * 1024 * 1024
+    top_n = config.getint('Sound', 'warm_set_size', fallback=50)
+    with warm_set_lock:
+        counted = list(play_counts)
+    # Forget files that were deleted or renamed, so play_counts stays the size of the sound directories
+    gone = [path for path in counted if not is_warmable_sound(path) or not os.path.exists(path)]
+    with warm_set_lock:
+        for path in gone:
+            play_counts.pop(path, None)
+        ranked = sorted(play_counts.items(), key=lambda kv: kv[1], reverse=True)[:top_n]
+        current = dict(warm_set)
+    new_set = {}
+    used = 0
+    for path, _ in ranked:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            entry = current.get(path)
+            if entry is None or entry["mtime"] != mtime:
+                if not path.lower().endswith('.wav'):
+                    continue
+                entry = load_pcm(path)
+                if entry is None:
+                    continue
+                entry["mtime"] = mtime
+        except Exception:
+            continue
+        if used + len(entry["frames"]) > budget:
+            continue
+        new_set[path] = entry
+        used += len(entry["frames"])
+    with warm_set_lock:
+        warm_set.clear()
+        warm_set.update(new_set)
+    debug_log(f"Warm set rebalanced: {len(new_set)} files, {used // 1024} KB")
+
+def load_play_counts():
+    try:
+        with open(PLAY_COUNTS_FILE, "r") as f:
+            saved = json.load(f)
+        with warm_set_lock:
+            for path, count in saved.items():
+                if is_warmable_sound(path):
+                    play_counts[path] = play_counts.get(path, 0) + int(count)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        log_exception("load_play_counts")
+
+def save_play_counts():
+    with warm_set_lock:
+        data = dict(play_counts)
+    tmp_path = PLAY_COUNTS_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, PLAY_COUNTS_FILE)
+    except Exception as e:
+        debug_log(f"save_play_counts failed: {e}")
+
+def warm_set_rebalance_loop():
+    load_play_counts()
+    while True:
+        try:
+            rebalance_warm_set()
+            save_play_counts()
+        except Exception:
+            log_exception("warm_set_rebalance_loop")
+        time.sleep(config.getfloat('Sound', 'warm_set_interval', fallback=300))
+
+def get_warm_set_stats():
+    with warm_set_lock:
+        total = warm_set_stats["memory_plays"] + warm_set_stats["disk_plays"]
+        return {
+            "files": len(warm_set),
+            "bytes": sum(len(e["frames"]) for e in warm_set.values()),
+            "memory_plays": warm_set_stats["memory_plays"],
+            "disk_plays": warm_set_stats["disk_plays"],
+            "memory_rate": round(warm_set_stats["memory_plays"] / total, 3) if total else None,
+            "top": [
+                {"file": os.path.basename(p), "plays": c}
+                for p, c in sorted(play_counts.items(), key=lambda kv: kv[1], reverse=True)[:10]
+            ],
+        }
 
 def parse_echo_command(command):
     """
@@ -2403,7 +3061,7 @@ def echo_test(track_num, playback_token=None):
         log_exception("echo_test_outer")
 
 def serial_read_loop():
-    global serial_history, dtmf_buffer, dtmf_lock
+    global dtmf_buffer, dtmf_lock
     dtmf_pattern = re.compile(r"([123])D([0-9A-D\*#])", re.IGNORECASE)
 
     serial_port = None
@@ -2412,6 +3070,7 @@ def serial_read_loop():
 
     line_buffer = ""
     last_data_time = time.time()
+    arrival_ns = None
 
     while True:
         current_time = time.time()
@@ -2427,9 +3086,11 @@ def serial_read_loop():
                 )
                 serial_port.reset_input_buffer()
                 debug_log("Serial connection established successfully")
+                metric_inc("drx_serial_connects_total", result="connected")
                 reconnect_delay = 5
             except Exception as e:
                 debug_log(f"Serial connection failed: {e}")
+                metric_inc("drx_serial_connects_total", result="failed")
                 serial_port = None
                 debug_log(f"Will attempt reconnection in {reconnect_delay} seconds...")
                 reconnect_delay = min(reconnect_delay * 1.5, 60)
@@ -2440,6 +3101,7 @@ def serial_read_loop():
             if serial_port and serial_port.is_open:
                 while serial_port.in_waiting > 0:
                     data = serial_port.read(serial_port.in_waiting)
+                    arrival_ns = time.monotonic_ns()
                     debug_log(f"Raw serial bytes: {data!r}")
                     decoded = data.decode('ascii', errors='ignore')
                     line_buffer += decoded
@@ -2466,14 +3128,8 @@ def serial_read_loop():
                             with dtmf_lock:
                                 dtmf_buffer.setdefault(port, []).append(str(digit))
                             debug_log(f"DTMF buffered: {dtmf_buffer}")
-                        serial_history.insert(0, {
-                            "cmd": cleaned_line,
-                            "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            "src": "Serial"
-                        })
-                        if len(serial_history) > 10:
-                            serial_history.pop()
-                        command_queue.put(cleaned_line)
+                        event_journal.record(cleaned_line, "Serial", "queued")
+                        queue_command(cleaned_line, "Serial", arrival_ns)
                         debug_log(f"[SERIAL LOOP] Queued command: {cleaned_line!r}")
                     last_data_time = current_time
 
@@ -2486,6 +3142,7 @@ def serial_read_loop():
         except serial.SerialException as e:
             debug_log(f"Serial device error: {e}")
             debug_log("Serial device disconnected, will attempt to reconnect")
+            metric_inc("drx_serial_errors_total")
             try:
                 if serial_port is not None and serial_port.is_open:
                     serial_port.close()
@@ -2579,14 +3236,10 @@ def process_serial_commands():
 
                         # Queue the echo test command as a string ("RE1234")
                         debug_log("QUEUEING ECHO TEST COMMAND")
-                        command_queue.put(f"RE{track_num:04d}")
+                        queue_command(f"RE{track_num:04d}", "Serial")
 
                         # Update history
-                        serial_history.insert(0, {
-                            "cmd": f"Echo Test: {track_num:04d}",
-                            "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            "src": "Serial"
-                        })
+                        event_journal.record(f"Echo Test: {track_num:04d}", "Serial", "queued")
                         log_recent(f"Echo Test initiated for track {track_num:04d}")
 
                         # Remove the command from the buffer
@@ -2603,7 +3256,7 @@ def process_serial_commands():
             match_a1 = re.search(r'\bA1\b', serial_buffer.upper())
             if match_a1:
                 debug_log(f"Processing A1 command")
-                command_queue.put("A1")
+                queue_command("A1", "Serial")
                 # Remove A1 from buffer
                 index = serial_buffer.upper().find("A1")
                 if index != -1:
@@ -2615,7 +3268,7 @@ def process_serial_commands():
             match_w1 = re.search(r'\bW1\b', serial_buffer.upper())
             if match_w1:
                 debug_log(f"Processing W1 command")
-                command_queue.put("W1")
+                queue_command("W1", "Serial")
                 # Remove W1 from buffer
                 index = serial_buffer.upper().find("W1")
                 if index != -1:
@@ -2627,7 +3280,7 @@ def process_serial_commands():
             match_w2 = re.search(r'\bW2\b', serial_buffer.upper())
             if match_w2:
                 debug_log(f"Processing W2 command")
-                command_queue.put("W2")
+                queue_command("W2", "Serial")
                 # Remove W2 from buffer
                 index = serial_buffer.upper().find("W2")
                 if index != -1:
@@ -2639,7 +3292,7 @@ def process_serial_commands():
             match_w3 = re.search(r'\bW3\b', serial_buffer.upper())
             if match_w3:
                 debug_log(f"Processing W3 command")
-                command_queue.put("W3")
+                queue_command("W3", "Serial")
                 # Remove W3 from buffer
                 index = serial_buffer.upper().find("W3")
                 if index != -1:
@@ -2658,7 +3311,7 @@ def process_serial_commands():
             if match_join:
                 command = match_join.group(0)
                 debug_log(f"Processing join-series command: '{command}'")
-                command_queue.put(command)
+                queue_command(command, "Serial")
                 index = serial_buffer.find(command)
                 if index != -1:
                     serial_buffer = serial_buffer[:index] + serial_buffer[index+len(command):]
@@ -2669,7 +3322,7 @@ def process_serial_commands():
             if match_alt:
                 command = match_alt.group(0)
                 debug_log(f"Processing alternate-series command: '{command}'")
-                command_queue.put(command)
+                queue_command(command, "Serial")
                 index = serial_buffer.find(command)
                 if index != -1:
                     serial_buffer = serial_buffer[:index] + serial_buffer[index+len(command):]
@@ -2682,7 +3335,7 @@ def process_serial_commands():
             if match:
                 command = match.group(0)
                 debug_log(f"Processing command: '{command}'")
-                command_queue.put(command)
+                queue_command(command, "Serial")
                 index = serial_buffer.upper().find(command)
                 if index != -1:
                     serial_buffer = serial_buffer[:index] + serial_buffer[index+len(command):]
@@ -2700,20 +3353,22 @@ def process_serial_commands():
             log_exception("process_serial_commands")
             time.sleep(0.5)  # Longer sleep on error
 
-def bg_write_state_and_webcmd_loop():
+def bg_write_state_loop():
     while True:
-        maybe_run_webcmd()
         write_state()
         time.sleep(0.25)
 
 def bg_cos_state_update_loop():
-    global cos_active, last_cos
+    global cos_active, last_cos, interrupt_requested_ns
     last_cos = None
     last_update = time.time()
     while True:
         try:
             cos_now = is_cos_active()
             if cos_now != last_cos:
+                if cos_now and last_cos is not None:
+                    interrupt_requested_ns = time.monotonic_ns()
+                    metric_inc("drx_cos_keyups_total")
                 cos_active = cos_now
                 last_cos = cos_now
             # Only update if COS is active
@@ -2722,6 +3377,7 @@ def bg_cos_state_update_loop():
                 # Only increment once per second
                 if now - last_update >= 1:
                     debug_log("Increment block running")
+                    metric_inc("drx_cos_active_seconds_total")
                     update_cos_minutes()
                     last_update = now
         except Exception as e:
@@ -2916,36 +3572,70 @@ def dtmf_cos_edge_monitor():
         last_cos = now_cos
         time.sleep(0.02)
 
-def write_state():
-    """
-    Store state in memory instead of writing to file.
-    State is now accessible via /api/state endpoint.
-    """
-    global current_state_memory, cos_today_date
-    now = time.time()
+# --- Versioned State ---
+# The state served at /api/state is assembled from components. Each component
+# has a cheap key built from its inputs; the component is only rebuilt when its
+# key changes, and the global state_version only moves when a rebuilt component
+# actually differs. Readers can ask for the fields changed since a version.
+state_version = 0
+state_components = {}  # name -> {"key": ..., "version": int, "data": dict}
+state_last_write = 0
+
+def state_key_playback(now):
+    return (currently_playing, currently_playing_info, currently_playing_info_timestamp, playing_end_time,
+            playback_status, serial_port_missing, sound_card_missing, last_played_memory)
+
+def build_playback_state(now):
+    return {
+        "currently_playing": currently_playing,
+        "currently_playing_info": currently_playing_info,
+        "currently_playing_info_timestamp": currently_playing_info_timestamp,
+        "playing_end_time": playing_end_time,
+        "playback_status": playback_status,
+        "serial_port_missing": serial_port_missing,
+        "sound_card_missing": sound_card_missing,
+        "last_played": last_played_memory,
+    }
 
-    # Keep track of last_played in memory only (no disk reads)
-    # Use global variables to maintain state across calls
-    global prev_currently_playing, last_played_memory
-    if 'prev_currently_playing' not in globals():
-        prev_currently_playing = ""
-    if 'last_played_memory' not in globals():
-        last_played_memory = ""
+def state_key_io(now):
+    return (is_cos_active(), is_remote_busy_active())
+
+def build_io_state(now):
+    cos, remote = state_key_io(now)
+    return {"cos_active": cos, "remote_device_active": remote}
+
+def state_key_history(now):
+    return event_journal.seq
+
+def build_history_state(now):
+    return {"serial_history": event_journal.latest(10), "journal_seq": event_journal.seq}
+
+def state_key_bases(now):
+    # Last-played times rather than countdowns; the Remaining= lines are live fields
+    return (
+        tuple(random_last_played.get(b, 0) for b in random_bases),
+        tuple(rotation_last_played.get(b, 0) for b in rotation_bases),
+        tuple(sudo_random_last_interval.get(b, 0) for b in sudo_bases),
+        tuple(random_current_track.get(b) for b in random_bases),
+        tuple(rotation_current_track.get(b) for b in rotation_bases),
+        tuple(sudo_random_interval_track.get(b) for b in sudo_bases),
+        tuple(sudo_decks[b]["cursor"] if b in sudo_decks else 0 for b in sudo_bases),
+    )
 
-    # Decide what last_played should be for this write
-    if (
-        prev_currently_playing
-        and prev_currently_playing.lower() != "idle"
-        and prev_currently_playing != currently_playing
-    ):
-        last_played = prev_currently_playing
-        last_played_memory = prev_currently_playing
-    else:
-        last_played = last_played_memory
+def build_bases_state(now):
+    return {
+        "random_last_played": {b: random_last_played.get(b, 0) for b in random_bases},
+        "random_current_track": {b: os.path.basename(random_current_track.get(b, "")) if random_current_track.get(b, "") else "N/A" for b in random_bases},
 
-    # Update previous state for next call
-    prev_currently_playing = currently_playing
+        "rotation_last_played": {b: rotation_last_played.get(b, 0) for b in rotation_bases},
+        "rotation_current_track": {b: rotation_current_track.get(b, b+1) for b in rotation_bases},
+
+        "sudo_random_last_interval": {b: sudo_random_last_interval.get(b, 0) for b in sudo_bases},
+        "sudo_random_interval_track": {b: os.path.basename(sudo_random_interval_track.get(b, "")) if sudo_random_interval_track.get(b, "") else "N/A" for b in sudo_bases},
+        "sudo_random_played_in_cycle": {b: [os.path.basename(x) for x in sudo_deck_played(b)] for b in sudo_bases},
+    }
 
+def build_bases_lines(now):
     # Random bases lines
     random_bases_lines = []
     for b, e, t in zip(random_bases, random_ends, random_intervals):
@@ -2975,7 +3665,7 @@ def write_state():
     for b, e, t in zip(sudo_bases, sudo_ends, sudo_intervals):
         last = sudo_random_last_interval.get(b, 0)
         current = sudo_random_interval_track.get(b, 'N/A')
-        played = sudo_random_played_in_cycle.get(b, set())
+        played = sudo_deck_played(b)
         remaining = int(max(0, t*60 - (now - last)))
         if not current or str(current).upper() == "N/A":
             track_name = "N/A"
@@ -2985,9 +3675,15 @@ def write_state():
             f"Base {b} | End {e} Interval {t}: Track={track_name} Remaining={remaining}s PlayedInCycle={len(played)}"
         )
 
-    # --- ALT SERIES STATE (NEW) ---
+    return {
+        "random_bases_lines": random_bases_lines,
+        "rotation_bases_lines": rotation_bases_lines,
+        "sudo_bases_lines": sudo_bases_lines,
+    }
+
+def build_alt_bases_lines(now):
     alt_bases_lines = []
-    for key, last_played_dict in alternate_series_last_played.items():
+    for key, last_played_dict in list(alternate_series_last_played.items()):
         bases = list(key)
         pointer = alternate_series_pointers.get(key, 0)
         track_pointers = alternate_series_track_pointers.get(key, {})
@@ -3007,160 +3703,227 @@ def write_state():
             alt_bases_lines.append(
                 f"Series {key} Base {base} Type {typ} | End {end} Interval {interval//60 if interval else 0}m: Track={track_display} Remaining={remaining}s"
             )
+    return {"alt_bases_lines": alt_bases_lines}
 
-    # --- MESSAGE TIMER REMAINING CALCULATION ---
-    if message_timer_last_played and message_timer_value:
-        message_timer_remaining = max(0, message_timer_value * 60 - (now - message_timer_last_played))
-    else:
-        message_timer_remaining = 0
+def state_key_message_timer(now):
+    return (message_timer_last_played, message_timer_value)
 
-    # --- COS ACTIVITY/REPEATER ACTIVITY STATE ---
-    cos_today_minutes = int(round(cos_today_seconds / 60)) if 'cos_today_seconds' in globals() else 0
+def build_message_timer_state(now):
+    return {
+        "message_timer_last_played": message_timer_last_played,
+        "message_timer_value": message_timer_value,
+    }
 
-    # --- Ensure cos_today_date is set before writing ---
+def state_key_activity(now):
     global cos_today_date
     if not ('cos_today_date' in globals()) or not cos_today_date:
         cos_today_date = datetime.now().strftime("%Y-%m-%d")
+    return (cos_today_seconds, cos_today_date)
 
-    state = {
-        "currently_playing": currently_playing,
-        "currently_playing_info": currently_playing_info,
-        "currently_playing_info_timestamp": currently_playing_info_timestamp,
-        "playing_end_time": playing_end_time,
-        "playback_status": playback_status,
-        "serial_port_missing": serial_port_missing,
-        "sound_card_missing": sound_card_missing,
-        "serial_history": serial_history[-10:],
-        "cos_active": is_cos_active(),
-        "remote_device_active": is_remote_busy_active(),
-        "uptime": get_drx_uptime(),
-        "version": VERSION,
-
-        "random_last_played": {b: random_last_played.get(b, 0) for b in random_bases},
-        "random_current_track": {b: os.path.basename(random_current_track.get(b, "")) if random_current_track.get(b, "") else "N/A" for b in random_bases},
-
-        "rotation_last_played": {b: rotation_last_played.get(b, 0) for b in rotation_bases},
-        "rotation_current_track": {b: rotation_current_track.get(b, b+1) for b in rotation_bases},
-
-        "sudo_random_last_interval": {b: sudo_random_last_interval.get(b, 0) for b in sudo_bases},
-        "sudo_random_interval_track": {b: os.path.basename(sudo_random_interval_track.get(b, "")) if sudo_random_interval_track.get(b, "") else "N/A" for b in sudo_bases},
-        "sudo_random_played_in_cycle": {b: [os.path.basename(x) for x in sudo_random_played_in_cycle.get(b, set())] for b in sudo_bases},
-
-        "random_bases_lines": random_bases_lines,
-        "rotation_bases_lines": rotation_bases_lines,
-        "sudo_bases_lines": sudo_bases_lines,
-        "alt_bases_lines": alt_bases_lines,
-
-        "drx_start_time": DRX_START_TIME,
-        "updated_at": now,
-        "last_played": last_played,
-
-        # --- MESSAGE TIMER FIELDS ---
-        "message_timer_last_played": message_timer_last_played,
-        "message_timer_value": message_timer_value,
-        "message_timer_remaining": int(message_timer_remaining),
-
-        # --- COS/Repeater Activity fields ---
+def build_activity_state(now):
+    return {
         "cos_today_seconds": cos_today_seconds,
-        "cos_today_minutes": cos_today_minutes,
+        "cos_today_minutes": int(round(cos_today_seconds / 60)) if 'cos_today_seconds' in globals() else 0,
         "cos_today_date": cos_today_date,
     }
-    
-    # --- WX ALERT STATE ---
+
+def state_key_wx(now):
     try:
-        wx_alert_active = (ctone_override_expire and time.time() < ctone_override_expire)
+        wx_alert_active = bool(ctone_override_expire and now < ctone_override_expire)
     except Exception:
         wx_alert_active = False
+    return (wx_alert_active, ctone_override_expire, wx_fetch_status_seq)
 
-    state["wx_alert_active"] = wx_alert_active
-    state["ctone_override_expire"] = ctone_override_expire  # <--- ADD THIS LINE
+def build_wx_state(now):
+    wx_alert_active, expire, _ = state_key_wx(now)
+    return {"wx_alert_active": wx_alert_active, "ctone_override_expire": expire, "wx_fetch_status": wx_fetch_status}
 
-    # Store state in memory for API access
-    with state_lock:
-        current_state_memory = state
-    
-    # NOTE: State writes to disk are disabled - all state is now kept in memory only
-    # Activity data is still persisted via the activity file
-    # No writes to drx_state.json anymore per requirements
+def state_key_sound_cache(now):
+    return (
+        prefetch_stats["hits"], prefetch_stats["misses"], prefetch_stats["warmed"], len(prefetch_warm),
+        warm_set_stats["memory_plays"], warm_set_stats["disk_plays"], len(warm_set),
+    )
 
-def maybe_run_webcmd():
-    global serial_history
-    state = {}
+def build_sound_cache_state(now):
+    return {"prefetch_stats": get_prefetch_stats(), "warm_set_stats": get_warm_set_stats()}
 
-    if os.path.exists(WEBCMD_FILE):
-        try:
-            with open(WEBCMD_FILE, 'r') as f:
-                try:
-                    cmd = json.load(f)
-                except json.JSONDecodeError:
-                    # File is empty or not valid JSON
-                    debug_log("maybe_run_webcmd: WEBCMD_FILE is empty or invalid JSON, ignoring and deleting")
-                    os.remove(WEBCMD_FILE)
-                    return
+def state_key_static(now):
+    return (VERSION, DRX_START_TIME)
 
-            # Add Echo Test command support
-            if cmd.get("type") == "echo_test" and "track" in cmd:
-                # Queue the echo test command as a string, example: "RE1234"
-                track_num = int(cmd["track"])
-                debug_log(f"Echo Test requested via web for track {track_num}")
-                command_queue.put(f"RE{track_num:04d}")
-                log_recent(f"Echo Test: Started for track {track_num} (web)")
-
-                # Update history
-                serial_history.insert(0, {
-                    "cmd": f"Echo Test: {track_num:04d}",
-                    "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    "src": "Web"
-                })
+def build_static_state(now):
+    return {"version": VERSION, "drx_start_time": DRX_START_TIME}
 
-                # NOTE: State file updates disabled - serial_history is updated in memory via write_state()
+STATE_COMPONENTS = [
+    ("playback", state_key_playback, build_playback_state),
+    ("io", state_key_io, build_io_state),
+    ("history", state_key_history, build_history_state),
+    ("bases", state_key_bases, build_bases_state),
+    ("message_timer", state_key_message_timer, build_message_timer_state),
+    ("activity", state_key_activity, build_activity_state),
+    ("wx", state_key_wx, build_wx_state),
+    ("sound_cache", state_key_sound_cache, build_sound_cache_state),
+    ("static", state_key_static, build_static_state),
+]
 
-            elif cmd.get("type") == "play":
-                input_cmd = cmd.get("input", "").strip()
-                if input_cmd.lower().endswith('.wav'):
-                    source = "web dropdown"
-                else:
-                    source = "web input box"
-                try:
-                    command_queue.put(input_cmd)
-                    log_recent(f"Play requested: {input_cmd} ({source})")
-                    # --- Update global and state serial_history ---
-                    serial_history.insert(0, {
-                        "cmd": f"> {input_cmd}",
-                        "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        "src": "Web"
-                    })
-                    serial_history = serial_history[:10]
-                    # NOTE: State file updates disabled - serial_history is updated in memory via write_state()
-                except Exception as e:
-                    log_recent(f"Play requested: {input_cmd} ({source}) - failed -> {e}")
+def write_state():
+    """
+    Refresh the in-memory state served by /api/state.
+    Only components whose inputs changed are rebuilt; state_version is bumped
+    when any of them produced different data.
+    """
+    global current_state_memory, state_version, state_last_write
+    global prev_currently_playing, last_played_memory
+    now = time.time()
 
-            elif cmd.get("type") == "stop":
-                playback_interrupt.set()
-                log_recent("Playback stopped from web")
+    # Decide what last_played should be for this write
+    if (
+        prev_currently_playing
+        and prev_currently_playing.lower() != "idle"
+        and prev_currently_playing != currently_playing
+    ):
+        last_played_memory = prev_currently_playing
+    # Update previous state for next call
+    prev_currently_playing = currently_playing
 
-            elif cmd.get("type") == "reload_config":
+    with state_lock:
+        changed = []
+        for name, key_fn, build_fn in STATE_COMPONENTS:
+            try:
+                key = key_fn(now)
+                component = state_components.get(name)
+                if component is not None and component["key"] == key:
+                    continue
+                data = build_fn(now)
+            except Exception:
+                log_exception(f"write_state ({name})")
+                continue
+            if component is not None and component["data"] == data:
+                component["key"] = key
+                continue
+            changed.append(name)
+            state_components[name] = {"key": key, "version": 0, "data": data}
+        if changed:
+            state_version += 1
+            state = dict(current_state_memory)
+            for name in changed:
+                state_components[name]["version"] = state_version
+                state.update(state_components[name]["data"])
+            state["state_version"] = state_version
+            current_state_memory = state
+            state_changed.notify_all()
+        state_last_write = now
+
+def get_state_changes(since, wait=0):
+    """
+    Fields from every component that changed after version `since` (all of them for since=0).
+    With wait > 0, block up to that many seconds for something to change first.
+    A `since` ahead of state_version means drx_main restarted, so everything is returned.
+    """
+    with state_changed:
+        if wait > 0 and since == state_version:
+            state_changed.wait_for(lambda: state_version != since, timeout=wait)
+        if since > state_version:
+            since = 0
+        changes = {}
+        for name, component in state_components.items():
+            if component["version"] > since:
+                changes.update(component["data"])
+        return state_version, changes
+
+def state_live_fields():
+    """
+    Fields that move on their own every second; computed when served instead of versioned,
+    so a running countdown does not bump state_version every second: uptime, the base and
+    alternate-series lines with their Remaining= countdowns, and the message timer's.
+    drx_start_time rides along so a subscriber can tell drx_main restarted under its cursor.
+    """
+    now = time.time()
+    fields = {"uptime": get_drx_uptime(), "updated_at": state_last_write, "drx_start_time": DRX_START_TIME}
+    for build_fn in (build_bases_lines, build_alt_bases_lines):
+        try:
+            fields.update(build_fn(now))
+        except Exception:
+            log_exception(f"state_live_fields ({build_fn.__name__})")
+    if message_timer_last_played and message_timer_value:
+        fields["message_timer_remaining"] = int(max(0, message_timer_value * 60 - (now - message_timer_last_played)))
+    else:
+        fields["message_timer_remaining"] = 0
+    return fields
+
+# --- Web Commands ---
+webcmd_lock = threading.Lock()
+
+def run_webcmd(cmd):
+    """
+    Execute one command sent by the web UI and return its result.
+    Playback commands go straight onto command_queue, which wakes the command
+    processor at once; restart and reboot are deferred so the caller gets its reply first.
+    """
+    global interrupt_requested_ns
+    cmd_type = cmd.get("type")
+    result = {"id": uuid.uuid4().hex[:12], "type": cmd_type, "ok": True}
+
+    try:
+        # Add Echo Test command support
+        if cmd_type == "echo_test" and "track" in cmd:
+            # Queue the echo test command as a string, example: "RE1234"
+            track_num = int(cmd["track"])
+            debug_log(f"Echo Test requested via web for track {track_num}")
+            trace = queue_command(f"RE{track_num:04d}", "Web")
+            event_journal.record(f"Echo Test: {track_num:04d}", "Web", "queued")
+            log_recent(f"Echo Test: Started for track {track_num} (web)")
+            result.update(id=trace["id"], result="queued", queue_depth=command_queue.qsize())
+
+        elif cmd_type == "play":
+            input_cmd = str(cmd.get("input", "")).strip()
+            if not input_cmd:
+                return dict(result, ok=False, error="no input given")
+            if input_cmd.lower().endswith('.wav'):
+                source = "web dropdown"
+            else:
+                source = "web input box"
+            try:
+                trace = queue_command(input_cmd, "Web")
+                event_journal.record(f"> {input_cmd}", "Web", "queued")
+                log_recent(f"Play requested: {input_cmd} ({source})")
+                result.update(id=trace["id"], result="queued", queue_depth=command_queue.qsize())
+            except Exception as e:
+                log_recent(f"Play requested: {input_cmd} ({source}) - failed -> {e}")
+                event_journal.record(f"> {input_cmd}", "Web", "failed")
+                result.update(ok=False, error=str(e))
+
+        elif cmd_type == "stop":
+            interrupt_requested_ns = time.monotonic_ns()
+            playback_interrupt.set()
+            log_recent("Playback stopped from web")
+            result["result"] = "stopped"
+
+        elif cmd_type == "reload_config":
+            with webcmd_lock:
                 reload_config()
-                log_recent("Configuration reload requested from web")
+            log_recent("Configuration reload requested from web")
+            result["result"] = "reloaded"
 
-            elif cmd.get("type") == "restart":
-                log_recent("DRX script restart requested from web")
-                os.remove(WEBCMD_FILE)
-                os.execv(sys.executable, [sys.executable] + sys.argv)
-                return
+        elif cmd_type == "restart":
+            log_recent("DRX script restart requested from web")
+            threading.Timer(0.5, lambda: os.execv(sys.executable, [sys.executable] + sys.argv)).start()
+            result["result"] = "restarting"
 
-            elif cmd.get("type") == "reboot":
-                log_recent("System reboot requested from web")
-                os.remove(WEBCMD_FILE)
-                os.system("reboot")
-                return
+        elif cmd_type == "reboot":
+            log_recent("System reboot requested from web")
+            threading.Timer(0.5, lambda: os.system("reboot")).start()
+            result["result"] = "rebooting"
 
-            os.remove(WEBCMD_FILE)
-        except Exception:
-            log_exception("maybe_run_webcmd")
+        else:
+            debug_log(f"run_webcmd: unknown command type {cmd_type!r}")
+            result.update(ok=False, error=f"unknown command type: {cmd_type}")
+    except Exception as e:
+        log_exception("run_webcmd")
+        result.update(ok=False, error=str(e))
+    return result
 
 def status_screen(stdscr):
-    global serial_buffer, serial_history, currently_playing, currently_playing_info
+    global serial_buffer, currently_playing, currently_playing_info
     global currently_playing_info_timestamp, playing_end_time, playback_status
     global serial_port_missing, sound_card_missing
     curses.start_color()
@@ -3230,7 +3993,7 @@ def status_screen(stdscr):
                 if y >= max_y - 2: break
                 last = sudo_random_last_interval.get(b, 0)
                 current = sudo_random_interval_track.get(b, 'N/A')
-                played = sudo_random_played_in_cycle.get(b, set())
+                played = sudo_deck_played(b)
                 remaining = max(0, t*60 - (time.time() - last))
                 track_name = os.path.basename(current) if current != 'N/A' and current else 'N/A'
                 msg = f"Base {b} | End {e} Interval {t}: Track={track_name} Remaining={remaining:.1f}s PlayedInCycle={len(played)}"
@@ -3241,11 +4004,11 @@ def status_screen(stdscr):
             if y < max_y - 2:
                 stdscr.move(y, 0)
                 stdscr.clrtoeol()
-                # Show last 5 serial_history entries by extracting the "cmd" field:
+                # Show the last 5 journal entries by extracting the "cmd" field:
                 serial_display = ' | '.join(
                     ''.join(c for c in (s["cmd"] if isinstance(s, dict) else str(s)) if c in string.printable and c not in '\x1b')
-                    for s in serial_history[:5]
-                ) if serial_history else 'None'
+                    for s in event_journal.latest(5)
+                ) if event_journal.seq else 'None'
                 stdscr.addstr(y, 0, f"Serial Buffer: {serial_display}"[:max_x - 1], curses.color_pair(5))
                 y += 1
             if y < max_y - 2:
@@ -3315,7 +4078,7 @@ def fallback_command_prompt():
             if cmd.strip().lower() in ('exit', 'quit'):
                 print("Exiting DRX.")
                 sys.exit(0)
-            command_queue.put(cmd)
+            queue_command(cmd, "Console")
         except KeyboardInterrupt:
             print("\nExiting DRX by Ctrl+C.")
             sys.exit(0)
@@ -3387,7 +4150,6 @@ rotation_current_track = {}
 
 sudo_random_last_interval = {}
 sudo_random_interval_track = {}
-sudo_random_played_in_cycle = {}
 sudo_random_last_file = {}
 
 playback_interrupt = threading.Event()
@@ -3565,30 +4327,102 @@ def save_state():
     # No longer write state to file - all state is in memory only
     pass
 
-def parse_temperature_from_wx_data():
-    """Reads wx/wx_data and extracts the temperature after 'temperature:'."""
-    if not os.path.exists(WX_DATA_FILE):
-        return None
-    with open(WX_DATA_FILE, "r") as f:
-        for line in f:
-            if line.startswith("temperature:"):
-                try:
-                    # e.g. line = "temperature: 74 F"
-                    parts = line.strip().split(":")
-                    value = parts[1].strip().split()[0]
-                    return int(value)
-                except Exception:
-                    continue
+def parse_temperature_from_wx_data(lines=None):
+    """Reads wx/wx_data (or the given lines of it) and extracts the temperature after 'temperature:'."""
+    if lines is None:
+        if not os.path.exists(WX_DATA_FILE):
+            return None
+        with open(WX_DATA_FILE, "r") as f:
+            lines = f.readlines()
+    for line in lines:
+        if line.startswith("temperature:"):
+            try:
+                # e.g. line = "temperature: 74 F"
+                parts = line.strip().split(":")
+                value = parts[1].strip().split()[0]
+                return int(value)
+            except Exception:
+                continue
     return None
 
 # --- Flask API Routes ---
 @app.route('/api/state')
 def get_state():
-    """Return current state from memory as JSON."""
-    global current_state_memory
+    """
+    Return current state from memory as JSON.
+    With ?since=N only the fields changed after version N are returned;
+    adding &wait=S long-polls up to S seconds (max 30) until there is a change.
+    """
+    since = request.args.get('since', type=int)
+    if since is not None:
+        wait = min(max(request.args.get('wait', 0, type=float), 0), 30)
+        version, changes = get_state_changes(since, wait)
+        changes.update(state_live_fields())
+        return jsonify({"state_version": version, "since": since, "changes": changes})
     with state_lock:
         # Return copy to avoid modification issues
-        return jsonify(current_state_memory.copy())
+        state = current_state_memory.copy()
+    state.update(state_live_fields())
+    return jsonify(state)
+
+@app.route('/api/traces')
+def get_traces():
+    """Return recent command traces, newest first, plus the slowest of them."""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        limit = 50
+    traces = get_recent_traces()
+    slowest = sorted(traces, key=lambda t: t["total_ms"], reverse=True)
+    return jsonify({"recent": traces[:limit], "slowest": slowest[:limit]})
+
+@app.route('/api/wx_trends')
+def get_wx_trends_route():
+    """Weather trends over ?pressure_hours= (default 3), ?temp_hours= (24) and ?rain_hours= (24)."""
+    hours = {key: min(max(request.args.get(key, default, type=float), 0.1), 24 * 365)
+             for key, default in (("pressure_hours", 3), ("temp_hours", 24), ("rain_hours", 24))}
+    try:
+        return jsonify(get_wx_trends(**hours))
+    except (OSError, ValueError) as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/wx', methods=['POST'])
+def post_wx():
+    """Weather updates pushed by drx_wx: {"kind": "alerts" or "observation", "file": signature, ...}."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or payload.get("kind") not in ("alerts", "observation"):
+        return jsonify({"ok": False, "error": "expected a JSON object with kind alerts or observation"}), 400
+    try:
+        changed = apply_wx_push(payload)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        return jsonify({"ok": False, "error": f"bad {payload.get('kind')} update: {e}"}), 400
+    return jsonify({"ok": True, "changed": changed})
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text exposition of the counters, histograms and gauges above."""
+    return render_metrics(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+@app.route('/api/journal')
+def get_journal():
+    """Command events after ?since=N (oldest first) plus the cursor to send next time."""
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    events, cursor = event_journal.since(since, limit)
+    return jsonify({"events": events, "next": cursor})
+
+@app.route('/api/command', methods=['POST'])
+def post_command():
+    """
+    Run one command object, or a list of them, from the web UI.
+    Every command is answered with its own id and result, in the order sent.
+    """
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        return jsonify(run_webcmd(payload))
+    if isinstance(payload, list) and all(isinstance(c, dict) for c in payload):
+        return jsonify([run_webcmd(c) for c in payload])
+    return jsonify({"ok": False, "error": "expected a JSON command object or list"}), 400
 
 def run_flask_server():
     """Run Flask server in a separate thread."""
@@ -3632,27 +4466,24 @@ def speak_temperature():
                 break
 
         # Read temperature
-        temp = parse_temperature_from_wx_data()
+        observation = get_wx_observation()
+        temp = observation["temperature"]
         if temp is None:
             debug_log("W2 TEMPERATURE: No temperature found in wx/wx_data")
             return
 
         log_recent(f"Temperature Report: Current temperature is {temp} degrees")
 
-        # Prepare wav sequence
-        wavs = []
-        wavs.append("call_tempis.wav")  # Play this before the temperature
-        wavs += get_wav_sequence_for_number(temp)
-        wavs.append("degrees.wav")
-
-        # Play wav files, but do NOT update status during playback, only at start and end.
-        for wav in wavs:
-            wav_path = os.path.join(EXTRA_SOUND_DIR, wav)
-            if os.path.exists(wav_path):
-                debug_log(f"W2 TEMPERATURE: Playing {wav_path}")
-                play_single_wav(wav_path, interrupt_on_cos=False, block_interrupt=True, reset_status_on_end=False)
-            else:
-                debug_log(f"W2 TEMPERATURE: WAV file not found: {wav_path}")
+        # Play the pre-rendered report if it matches the current wx_data, otherwise each wav in turn.
+        # Do NOT update status during playback, only at start and end.
+        rendered = ready_wx_report("W2", observation["signature"])
+        if rendered:
+            debug_log(f"W2 TEMPERATURE: Playing pre-rendered {rendered}")
+            play_single_wav(rendered, interrupt_on_cos=False, block_interrupt=True, reset_status_on_end=False)
+        else:
+            for item in build_temperature_sequence(temp):
+                debug_log(f"W2 TEMPERATURE: Playing {item['wav']}")
+                play_single_wav(item["wav"], interrupt_on_cos=False, block_interrupt=True, reset_status_on_end=False)
 
         debug_log("W2 TEMPERATURE: Temperature report completed")
 
@@ -3664,8 +4495,23 @@ def speak_temperature():
         debug_log("W2 TEMPERATURE: Setting REMOTE_BUSY to inactive")
         set_remote_busy(False)
 
-def parse_wx_conditions_from_wx_data():
-    """Reads wx/wx_data and extracts a dict of wx conditions in the requested order, matching field names in the file."""
+def build_temperature_sequence(temp):
+    """The W2 report for a temperature: call_tempis, the number and degrees, skipping missing wavs."""
+    wavs = []
+    wavs.append("call_tempis.wav")  # Play this before the temperature
+    wavs += get_wav_sequence_for_number(temp)
+    wavs.append("degrees.wav")
+    sequence = []
+    for wav in wavs:
+        wav_path = os.path.join(EXTRA_SOUND_DIR, wav)
+        if os.path.exists(wav_path):
+            sequence.append({"wav": wav_path})
+        else:
+            debug_log(f"W2 TEMPERATURE: WAV file not found: {wav_path}")
+    return sequence
+
+def parse_wx_conditions_from_wx_data(lines=None):
+    """Reads wx/wx_data (or the given lines of it) and extracts a dict of wx conditions in the requested order, matching field names in the file."""
     wx_fields = [
         "observations",     # 1. conditions (observations)
         "temperature",      # 2. temperature
@@ -3679,41 +4525,100 @@ def parse_wx_conditions_from_wx_data():
         "precipRate",       # 10. precipRate
     ]
     wx_data = { key: None for key in wx_fields }
-    if not os.path.exists(WX_DATA_FILE):
-        return wx_data
-    with open(WX_DATA_FILE, "r") as f:
-        for line in f:
-            for key in wx_fields:
-                if line.lower().startswith(f"{key.lower()}:"):
-                    try:
-                        value = line.strip().split(":", 1)[1].strip()
-                        wx_data[key] = value
-                    except Exception:
-                        continue
+    if lines is None:
+        if not os.path.exists(WX_DATA_FILE):
+            return wx_data
+        with open(WX_DATA_FILE, "r") as f:
+            lines = f.readlines()
+    for line in lines:
+        for key in wx_fields:
+            if line.lower().startswith(f"{key.lower()}:"):
+                try:
+                    value = line.strip().split(":", 1)[1].strip()
+                    wx_data[key] = value
+                except Exception:
+                    continue
     return wx_data
     
-def speak_wx_conditions():
-    global currently_playing, currently_playing_info, currently_playing_info_timestamp, playback_status
-
-    try:
-        debug_log("W1 CONDITIONS: Setting REMOTE_BUSY to active immediately")
-        set_remote_busy(True)
+def build_wx_conditions_sequence(wx_data):
+    """The W1 report for parsed wx_data; wavs that do not exist are synthesized from their names."""
+    wavs = []
+
+    # 0. Play HereAre.wav at the beginning
+    wavs.append("HereAre.wav")
+
+    # 1. Observations (play the actual wx_data value, e.g. AFewClouds.wav)
+    if wx_data.get("observations"):
+        obs_wav = (
+            wx_data["observations"]
+            .replace(" ", "")
+            .replace("/", "")
+            .replace(".", "")
+            .replace("-", "")
+            .replace(":", "")
+            + ".wav"
+        )
+        wavs.append(obs_wav)
 
-        wx_data = parse_wx_conditions_from_wx_data()
-        log_recent(f"WX Report: {wx_data}")
+    # 2. PrecipRate (now in position 2, handles decimals, skips if 0.00)
+    if wx_data.get("precipRate"):
+        precip_val = wx_data["precipRate"].split()[0]
+        try:
+            if float(precip_val) != 0.0:
+                wavs.append("precip_rate.wav")
+                if "." in precip_val:
+                    whole, frac = precip_val.split(".", 1)
+                    wavs += [f"{d}.wav" for d in whole]
+                    wavs.append("point.wav")
+                    wavs += [f"{d}.wav" for d in frac[:2]]
+                else:
+                    wavs += [f"{d}.wav" for d in precip_val]
+                wavs.append("inches_per_hour.wav")
+        except Exception:
+            pass
 
-        summary = "Playing weather conditions"
-        status_manager.set_weather_report("WX Conditions Report", summary)
+    # 3. Temperature (play tempis.wav before value, minus.wav if negative, always play degrees.wav)
+    if wx_data.get("temperature"):
+        wavs.append("tempis.wav")
+        try:
+            temp_str = wx_data["temperature"].split()[0]
+            if temp_str.startswith('-'):
+                wavs.append("minus.wav")
+                temp_num = int(float(temp_str))
+                wavs += get_wav_sequence_for_number(abs(temp_num))
+            else:
+                temp_num = int(float(temp_str))
+                wavs += get_wav_sequence_for_number(temp_num)
+            wavs.append("degrees.wav")
+        except Exception:
+            pass
 
-        wavs = []
+    # 4. Humidity
+    if wx_data.get("humidity"):
+        wavs.append("humidity_is.wav")
+        try:
+            hum_num = int(float(wx_data["humidity"].split()[0]))
+            wavs += get_wav_sequence_for_number(hum_num)
+            wavs.append("percent.wav")
+        except Exception:
+            pass
 
-        # 0. Play HereAre.wav at the beginning
-        wavs.append("HereAre.wav")
+    # 5 & 6. Wind direction and speed combined logic
+    wind_speed = None
+    if wx_data.get("wind_speed"):
+        try:
+            wind_speed = int(float(wx_data["wind_speed"].split()[0]))
+        except Exception:
+            wind_speed = None
 
-        # 1. Observations (play the actual wx_data value, e.g. AFewClouds.wav)
-        if wx_data.get("observations"):
-            obs_wav = (
-                wx_data["observations"]
+    if wind_speed == 0:
+        wavs.append("wind_is.wav")
+        wavs.append("Calm.wav")
+    else:
+        if wx_data.get("winddir"):
+            wavs.append("wind_is.wav")
+            wind_dir_wav = (
+                wx_data["winddir"]
                 .replace(" ", "")
                 .replace("/", "")
                 .replace(".", "")
@@ -3721,143 +4626,95 @@ def speak_wx_conditions():
                 .replace(":", "")
                 + ".wav"
             )
-            wavs.append(obs_wav)
-
-        # 2. PrecipRate (now in position 2, handles decimals, skips if 0.00)
-        if wx_data.get("precipRate"):
-            precip_val = wx_data["precipRate"].split()[0]
-            try:
-                if float(precip_val) != 0.0:
-                    wavs.append("precip_rate.wav")
-                    if "." in precip_val:
-                        whole, frac = precip_val.split(".", 1)
-                        wavs += [f"{d}.wav" for d in whole]
-                        wavs.append("point.wav")
-                        wavs += [f"{d}.wav" for d in frac[:2]]
-                    else:
-                        wavs += [f"{d}.wav" for d in precip_val]
-                    wavs.append("inches_per_hour.wav")
-            except Exception:
-                pass
+            wavs.append(wind_dir_wav)
+        if wind_speed is not None:
+            wavs.append("at.wav")
+            wavs += get_wav_sequence_for_number(wind_speed)
+            wavs.append("mph.wav")
+
+    # 7. Wind gust
+    if wx_data.get("wind_gust"):
+        try:
+            gust_num = int(float(wx_data["wind_gust"].split()[0]))
+            if gust_num != 0:
+                wavs.append("guststo.wav")
+                wavs += get_wav_sequence_for_number(gust_num)
+                wavs.append("mph.wav")
+        except Exception:
+            pass
 
-        # 3. Temperature (play tempis.wav before value, minus.wav if negative, always play degrees.wav)
-        if wx_data.get("temperature"):
-            wavs.append("tempis.wav")
-            try:
-                temp_str = wx_data["temperature"].split()[0]
-                if temp_str.startswith('-'):
-                    wavs.append("minus.wav")
-                    temp_num = int(float(temp_str))
-                    wavs += get_wav_sequence_for_number(abs(temp_num))
-                else:
-                    temp_num = int(float(temp_str))
-                    wavs += get_wav_sequence_for_number(temp_num)
-                wavs.append("degrees.wav")
-            except Exception:
-                pass
+    # 8. Pressure
+    if wx_data.get("pressure"):
+        wavs.append("pressure_is.wav")
+        try:
+            pres_val = wx_data["pressure"].split()[0]
+            if "." in pres_val:
+                whole, frac = pres_val.split(".", 1)
+                wavs += [f"{d}.wav" for d in whole]
+                wavs.append("point.wav")
+                wavs += [f"{d}.wav" for d in frac[:2]]
+            else:
+                wavs += [f"{d}.wav" for d in pres_val]
+            wavs.append("inches.wav")
+        except Exception:
+            pass
 
-        # 4. Humidity
-        if wx_data.get("humidity"):
-            wavs.append("humidity_is.wav")
-            try:
-                hum_num = int(float(wx_data["humidity"].split()[0]))
-                wavs += get_wav_sequence_for_number(hum_num)
-                wavs.append("percent.wav")
-            except Exception:
-                pass
+    # 9. Pressure status
+    if wx_data.get("pressure_status"):
+        pres_status_wav = (
+            wx_data["pressure_status"]
+            .replace(" ", "")
+            .replace("/", "")
+            .replace(".", "")
+            .replace("-", "")
+            .replace(":", "")
+            + ".wav"
+        )
+        wavs.append(pres_status_wav)
 
-        # 5 & 6. Wind direction and speed combined logic
-        wind_speed = None
-        if wx_data.get("wind_speed"):
-            try:
-                wind_speed = int(float(wx_data["wind_speed"].split()[0]))
-            except Exception:
-                wind_speed = None
+    # 10. Visibility
+    if wx_data.get("visibility"):
+        wavs.append("visibility_is.wav")
+        try:
+            vis_num = float(wx_data["visibility"].split()[0])
+            vis_int = int(round(vis_num))
+            wavs += get_wav_sequence_for_number(vis_int)
+            wavs.append("miles.wav")
+        except Exception:
+            pass
 
-        if wind_speed == 0:
-            wavs.append("wind_is.wav")
-            wavs.append("Calm.wav")
+    # --- PLAY LOGIC WITH PIPER BACKUP ---
+    sequence = []
+    for wav in wavs:
+        wav_path = os.path.join(EXTRA_SOUND_DIR, wav)
+        if os.path.exists(wav_path):
+            sequence.append({"wav": wav_path})
         else:
-            if wx_data.get("winddir"):
-                wavs.append("wind_is.wav")
-                wind_dir_wav = (
-                    wx_data["winddir"]
-                    .replace(" ", "")
-                    .replace("/", "")
-                    .replace(".", "")
-                    .replace("-", "")
-                    .replace(":", "")
-                    + ".wav"
-                )
-                wavs.append(wind_dir_wav)
-            if wind_speed is not None:
-                wavs.append("at.wav")
-                wavs += get_wav_sequence_for_number(wind_speed)
-                wavs.append("mph.wav")
-
-        # 7. Wind gust
-        if wx_data.get("wind_gust"):
-            try:
-                gust_num = int(float(wx_data["wind_gust"].split()[0]))
-                if gust_num != 0:
-                    wavs.append("guststo.wav")
-                    wavs += get_wav_sequence_for_number(gust_num)
-                    wavs.append("mph.wav")
-            except Exception:
-                pass
+            # Synthesize fallback: base name, underscores become spaces
+            word = os.path.splitext(wav)[0].replace('_', ' ')
+            sequence.append({"synthesize": word})
+    return sequence
 
-        # 8. Pressure
-        if wx_data.get("pressure"):
-            wavs.append("pressure_is.wav")
-            try:
-                pres_val = wx_data["pressure"].split()[0]
-                if "." in pres_val:
-                    whole, frac = pres_val.split(".", 1)
-                    wavs += [f"{d}.wav" for d in whole]
-                    wavs.append("point.wav")
-                    wavs += [f"{d}.wav" for d in frac[:2]]
-                else:
-                    wavs += [f"{d}.wav" for d in pres_val]
-                wavs.append("inches.wav")
-            except Exception:
-                pass
+def speak_wx_conditions():
+    global currently_playing, currently_playing_info, currently_playing_info_timestamp, playback_status
 
-        # 9. Pressure status
-        if wx_data.get("pressure_status"):
-            pres_status_wav = (
-                wx_data["pressure_status"]
-                .replace(" ", "")
-                .replace("/", "")
-                .replace(".", "")
-                .replace("-", "")
-                .replace(":", "")
-                + ".wav"
-            )
-            wavs.append(pres_status_wav)
+    try:
+        debug_log("W1 CONDITIONS: Setting REMOTE_BUSY to active immediately")
+        set_remote_busy(True)
 
-        # 10. Visibility
-        if wx_data.get("visibility"):
-            wavs.append("visibility_is.wav")
-            try:
-                vis_num = float(wx_data["visibility"].split()[0])
-                vis_int = int(round(vis_num))
-                wavs += get_wav_sequence_for_number(vis_int)
-                wavs.append("miles.wav")
-            except Exception:
-                pass
+        observation = get_wx_observation()
+        wx_data = observation["conditions"]
+        log_recent(f"WX Report: {wx_data}")
 
-        # --- PLAY LOGIC WITH PIPER BACKUP ---
-        sequence = []
-        for wav in wavs:
-            wav_path = os.path.join(EXTRA_SOUND_DIR, wav)
-            if os.path.exists(wav_path):
-                sequence.append({"wav": wav_path})
-            else:
-                # Synthesize fallback: base name, underscores become spaces
-                word = os.path.splitext(wav)[0].replace('_', ' ')
-                sequence.append({"synthesize": word})
+        summary = "Playing weather conditions"
+        status_manager.set_weather_report("WX Conditions Report", summary)
 
-        play_sequence(sequence, debug_log)
+        rendered = ready_wx_report("W1", observation["signature"])
+        if rendered:
+            debug_log(f"W1 CONDITIONS: Playing pre-rendered {rendered}")
+            play_single_wav(rendered, interrupt_on_cos=False, block_interrupt=True, reset_status_on_end=False)
+        else:
+            play_sequence(build_wx_conditions_sequence(wx_data), debug_log)
         debug_log("W1 CONDITIONS: WX report completed")
 
     except Exception as e:
@@ -3868,6 +4725,180 @@ def speak_wx_conditions():
         debug_log("W1 CONDITIONS: Setting REMOTE_BUSY to inactive")
         set_remote_busy(False)
 
+# --- WX Report Cache ---
+# wx/wx_data only changes when drx_wx polls, so it is parsed once per change
+# into wx_observation, and the W1 and W2 reports are rendered to WAVs in the
+# background right away. A W1 or W2 then plays one ready file.
+WX_REPORT_DIR = os.path.join(DRX_DIRECTORY, "sounds", "wx_cache")
+WX_REPORT_POLL = 2  # Seconds between checks of wx/wx_data for a change
+wx_observation_lock = threading.Lock()
+wx_observation = {"signature": False, "conditions": None, "temperature": None}
+wx_reports = {}  # "W1"/"W2" -> (wx_data signature, path of the rendered report)
+
+def wx_data_signature():
+    try:
+        st = os.stat(WX_DATA_FILE)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+def get_wx_observation():
+    """The parsed wx/wx_data as {signature, conditions, temperature}, re-read only after it changed."""
+    signature = wx_data_signature()
+    with wx_observation_lock:
+        if signature != wx_observation["signature"]:
+            lines = []
+            if signature is not None:
+                try:
+                    with open(WX_DATA_FILE, "r") as f:
+                        lines = f.readlines()
+                except OSError as e:
+                    debug_log(f"WX REPORT: Could not read {WX_DATA_FILE}: {e}")
+            apply_wx_observation(lines, signature)
+        return dict(wx_observation)
+
+def apply_wx_observation(lines, signature):
+    """Parse wx_data lines (read from disk or pushed by drx_wx) as the file with this signature. Call with wx_observation_lock held."""
+    with metric_timer("drx_wx_parse_seconds", report="observation"):
+        wx_observation.update(
+            signature=signature,
+            conditions=parse_wx_conditions_from_wx_data(lines),
+            temperature=parse_temperature_from_wx_data(lines),
+        )
+
+def ready_wx_report(name, signature):
+    """Path of the rendered W1/W2 report if it was made from the wx_data with this signature."""
+    with wx_observation_lock:
+        rendered = wx_reports.get(name)
+    if rendered and rendered[0] == signature and os.path.exists(rendered[1]):
+        return rendered[1]
+    return None
+
+def render_wx_reports(observation):
+    os.makedirs(WX_REPORT_DIR, exist_ok=True)
+    reports = [("W1", build_wx_conditions_sequence(observation["conditions"]))]
+    if observation["temperature"] is not None:
+        reports.append(("W2", build_temperature_sequence(observation["temperature"])))
+    for name, sequence in reports:
+        path = os.path.join(WX_REPORT_DIR, f"{name}.wav")
+        rendered = render_sequence_to_wav(sequence, path, name.lower()) if sequence else None
+        with wx_observation_lock:
+            if rendered:
+                os.replace(rendered, path)
+                wx_reports[name] = (observation["signature"], path)
+            else:
+                wx_reports.pop(name, None)
+        debug_log(f"WX REPORT: {name} {'rendered to ' + path if rendered else 'not rendered'}")
+
+WX_HISTORY_DIR = os.path.join(os.path.dirname(__file__), "wx", "history")
+wx_history = None  # Read-only view of the observation history drx_wx appends to
+
+def get_wx_trends(pressure_hours=3, temp_hours=24, rain_hours=24):
+    """Trends from the observation history: pressure tendency, temperature range and rain total."""
+    global wx_history
+    if wx_history is None:
+        wx_history = ObservationStore(WX_HISTORY_DIR, readonly=True)
+    tendency = wx_history.pressure_tendency(pressure_hours)
+    temp_range = wx_history.temperature_range(temp_hours)
+    return {
+        "latest": wx_history.latest(),
+        "pressure_tendency": {"hours": pressure_hours, "change": tendency[0], "trend": tendency[1]} if tendency else None,
+        "temperature_range": {"hours": temp_hours, "min": temp_range[0], "max": temp_range[1]} if temp_range else None,
+        "rain_total": {"hours": rain_hours, "inches": wx_history.rain_total_since(rain_hours)},
+    }
+
+def wx_report_watch_loop():
+    """Re-parse wx/wx_data whenever drx_wx rewrites or pushes it and render the W1/W2 reports for it."""
+    rendered_signature = None
+    while True:
+        wx_observation_changed.clear()
+        try:
+            observation = get_wx_observation()
+            if observation["signature"] is not None and observation["signature"] != rendered_signature:
+                rendered_signature = observation["signature"]
+                render_wx_reports(observation)
+        except Exception as e:
+            debug_log(f"WX REPORT: Exception in wx_report_watch_loop: {e}")
+            log_exception("wx_report_watch_loop")
+        wx_observation_changed.wait(wx_poll_interval("observation", WX_REPORT_POLL))
+
+# --- WX Push ---
+# drx_wx POSTs each update to /api/wx right after writing the file it came
+# from, with that file's stat signature. Applying a push fills the same
+# caches the file readers use, so the file is not read again, and wakes the
+# thread waiting on it at once. While pushes keep arriving the files are
+# only checked every WX_PUSH_FALLBACK_POLL seconds; if they stop (drx_wx
+# restarted without push_url, or an older drx_wx) the old intervals return.
+WX_PUSH_FALLBACK_POLL = 60
+wx_alerts_changed = threading.Event()
+wx_observation_changed = threading.Event()
+wx_push_seen = {}  # "alerts"/"observation" -> (time of last push, drx_wx polling interval)
+wx_fetch_status = None  # drx_wx's last per-source fetch report (see wx_fetch_status.json)
+wx_fetch_status_seq = 0
+
+def wx_poll_interval(kind, default):
+    """How long a file watcher may sleep: `default`, or WX_PUSH_FALLBACK_POLL while drx_wx is pushing `kind`."""
+    seen = wx_push_seen.get(kind)
+    if seen and time.time() - seen[0] < 3 * max(seen[1], WX_PUSH_FALLBACK_POLL):
+        return max(default, WX_PUSH_FALLBACK_POLL)
+    return default
+
+def validate_wx_push(payload):
+    """Raise ValueError unless a drx_wx push has every field apply_wx_push uses, with the right types."""
+    signature = payload.get("file")
+    if signature is not None and not isinstance(signature, list):
+        raise ValueError("file must be a list or null")
+    if not isinstance(payload.get("polling_time") or 0, (int, float)):
+        raise ValueError("polling_time must be a number")
+    if payload["kind"] == "alerts":
+        if "generation" not in payload:
+            raise ValueError("missing generation")
+        alerts = payload.get("alerts")
+        if not isinstance(alerts, list) or not all(isinstance(a, dict) for a in alerts):
+            raise ValueError("alerts must be a list of objects")
+        for record in alerts:
+            for field in ("code", "effective", "expires"):
+                if not isinstance(record.get(field), str):
+                    raise ValueError(f"alert {record.get('id')!r} has no {field}")
+    else:
+        lines = payload.get("lines")
+        if not isinstance(lines, list) or not all(isinstance(line, str) for line in lines):
+            raise ValueError("lines must be a list of strings")
+        if payload.get("fetch_status") is not None and not isinstance(payload["fetch_status"], dict):
+            raise ValueError("fetch_status must be an object")
+
+def apply_wx_push(payload):
+    """
+    Apply one update pushed by drx_wx; returns True if it changed anything.
+    The payload is validated before any cache is touched, so a bad push
+    leaves drx_main reading the files as before. Raises ValueError if it is bad.
+    """
+    global wx_fetch_status, wx_fetch_status_seq
+    validate_wx_push(payload)
+    kind = payload["kind"]
+    signature = tuple(payload["file"]) if payload.get("file") else None
+    changed = False
+    if kind == "alerts":
+        with wx_alert_store_lock:
+            generation = wx_alert_store_cache["generation"]
+            apply_wx_alert_store(payload, signature, debug_log)
+            changed = wx_alert_store_cache["generation"] != generation
+        if changed:
+            wx_alerts_changed.set()
+    elif kind == "observation":
+        with wx_observation_lock:
+            if signature is None or signature != wx_observation["signature"]:
+                apply_wx_observation(payload["lines"], signature)
+                changed = True
+        if changed:
+            wx_observation_changed.set()
+        if payload.get("fetch_status") is not None:
+            wx_fetch_status = payload["fetch_status"]
+            wx_fetch_status_seq += 1
+    wx_push_seen[kind] = (time.time(), payload.get("polling_time") or 0)
+    metric_inc("drx_wx_pushes_total", kind=kind, changed=str(changed).lower())
+    return changed
+
 # START OF WX ALERT SECTION
 
 def is_eas_alert(same_code, same_codes_set):
@@ -3875,7 +4906,7 @@ def is_eas_alert(same_code, same_codes_set):
     return first_code in same_codes_set
 
 def cleanup_wx_alert_wav():
-    wx_alert_wav = "/home/drx/DRX/sounds/9995-WX Alert.wav"
+    wx_alert_wav = WX_ALERT_BRIEF_WAV
     try:
         debug_log(f"[CLEANUP] Entered cleanup_wx_alert_wav()")
         if os.path.exists(wx_alert_wav):
@@ -3888,6 +4919,8 @@ def cleanup_wx_alert_wav():
         debug_log(f"[CLEANUP] Exception: {e}")
 
 def speak_wx_alerts_single(alert, debug_log=None):
+    # Get the broadcast audio or wait for the pre-rendered announcement before keying up
+    rendered = alert_announcement_wav(alert)
     try:
         set_remote_busy(True)
         # Wait for COS to clear, debounce, as in speak_wx_alerts
@@ -3904,8 +4937,11 @@ def speak_wx_alerts_single(alert, debug_log=None):
                 if time.time() - debounce_start >= COS_DEBOUNCE_TIME:
                     break
         status_manager.set_weather_report("WX Alert Report", f"Alert: {alert['description']}")
-        sequence = build_wx_alert_sequence_full_for_alert(alert, debug_log)
-        play_sequence(sequence, debug_log)
+        if rendered:
+            play_single_wav(rendered, interrupt_on_cos=False, block_interrupt=True, reset_status_on_end=False)
+        else:
+            sequence = build_wx_alert_sequence_full_for_alert(alert, debug_log)
+            play_sequence(sequence, debug_log)
     except Exception as e:
         debug_log and debug_log(f"Exception in speak_wx_alerts_single: {e}")
         log_exception("speak_wx_alerts_single")
@@ -3940,19 +4976,29 @@ def wx_alert_monitor(config, debug_log=None, same_codes=None, ctone_eas_only=Fal
     last_alerts_fp = None
 
     while True:
+        wx_alerts_changed.clear()
         current_alerts = parse_all_active_wx_alerts(debug_log)
         def alert_id(a):
-            return f"{a['effective_time'].strftime('%Y-%m-%d %H:%M:%S')}|{a['description']}"
+            # NWS id from the alert store; alerts parsed from the wx_alerts text have none
+            return a.get('id') or f"{a['effective_time'].strftime('%Y-%m-%d %H:%M:%S')}|{a['description']}"
         current_ids = set(alert_id(a) for a in current_alerts)
-        new_alerts = [a for a in current_alerts if alert_id(a) not in announced_alert_ids]
 
         now = time.time()
         now_dt = datetime.now()
         current_fp = alerts_fingerprint(current_alerts)
 
         if current_fp != last_alerts_fp:
+            archive = get_wx_alert_archive()
+            if archive:
+                try:
+                    archive.observe([dict(a, id=alert_id(a)) for a in current_alerts])
+                    # Alerts read out before a restart are not read out again
+                    announced_alert_ids |= archive.announced_ids(current_ids)
+                except Exception as e:
+                    debug_log and debug_log(f"WX ALERT ARCHIVE: {e}")
+            new_alerts = [a for a in current_alerts if alert_id(a) not in announced_alert_ids]
+            prerender_wx_alerts(current_alerts)
             if current_alerts:
-                build_multi_alert_combined_wav(current_alerts, debug_log)
 
                 # --- LOG WX ALERTS ---
                 for a in current_alerts:
@@ -3960,8 +5006,8 @@ def wx_alert_monitor(config, debug_log=None, same_codes=None, ctone_eas_only=Fal
                     desc = a.get("description", "")
                     expires_time = a.get("expires_time")
                     block = a.get("block", "")
-                    nws_id = ""
-                    ugc_zones = []
+                    nws_id = a.get("id") or ""
+                    ugc_zones = list(a.get("zones") or [])
 
                     if block:
                         m = re.search(r"^\s*id:\s*(urn:oid:[^\s]+)", block, re.MULTILINE)
@@ -3999,6 +5045,11 @@ def wx_alert_monitor(config, debug_log=None, same_codes=None, ctone_eas_only=Fal
                         activate_ctone_override_from_alert(config)
                     speak_wx_alerts_single(alert, debug_log=debug_log)
                     announced_alert_ids.add(alert_id(alert))
+                    if archive:
+                        try:
+                            archive.mark_announced(alert_id(alert))
+                        except Exception as e:
+                            debug_log and debug_log(f"WX ALERT ARCHIVE: {e}")
             else:
                 cleanup_wx_alert_wav()
                 last_cleanup_time = now
@@ -4007,8 +5058,14 @@ def wx_alert_monitor(config, debug_log=None, same_codes=None, ctone_eas_only=Fal
             last_active_alerts = current_alerts
             announced_alert_ids &= current_ids
 
-        # Always poll for alerts every 5 seconds
-        interval_seconds = normal_interval_seconds
+        sync_alert_audio_if_due(current_alerts)
+
+        # Poll every 5 seconds, or wait for drx_wx to push a change while it is pushing
+        interval_seconds = wx_poll_interval("alerts", normal_interval_seconds)
+        if current_alerts:
+            # Wake in time to notice the next alert expiring
+            until_expiry = (min(a["expires_time"] for a in current_alerts) - datetime.now()).total_seconds()
+            interval_seconds = min(interval_seconds, max(until_expiry, 1))
 
         # When idle (no active alerts), run cleanup every 5 minutes
         if not current_alerts:
@@ -4016,7 +5073,7 @@ def wx_alert_monitor(config, debug_log=None, same_codes=None, ctone_eas_only=Fal
                 cleanup_wx_alert_wav()
                 last_cleanup_time = now
 
-        time.sleep(interval_seconds)
+        wx_alerts_changed.wait(interval_seconds)
 
 def start_wx_alert_monitoring(config, debug_log=None):
     """
@@ -4058,17 +5115,18 @@ def synthesize_and_play_with_piper(text, debug_log=None):
         debug_log and debug_log(f"Piper synthesize: '{text}'")
         env = os.environ.copy()
         env["LD_LIBRARY_PATH"] = f"{PIPER_DIR}:{env.get('LD_LIBRARY_PATH','')}"
-        proc = subprocess.Popen(
-            [
-                PIPER_BINARY,
-                "--model", PIPER_MODEL,
-                "--output_raw"
-            ],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=env
-        )
+        with metric_timer("drx_spawn_seconds", program="piper"):
+            proc = subprocess.Popen(
+                [
+                    PIPER_BINARY,
+                    "--model", PIPER_MODEL,
+                    "--output_raw"
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env
+            )
         aplay = subprocess.Popen(
             ["aplay", "-f", "S16_LE", "-r", "22050"],
             stdin=proc.stdout,
@@ -4342,10 +5400,10 @@ def handle_w3x():
         debug_log("W3x: Setting REMOTE_BUSY to inactive")
         set_remote_busy(False)
 
-def build_multi_alert_combined_wav(alerts, debug_log=None):
+def build_multi_alert_sequence(alerts, debug_log=None):
     """
-    Given a list of alert dicts (from parse_all_active_wx_alerts), build a combined minimal WAV.
-    Newest alert is first.
+    Given a list of alert dicts (from parse_all_active_wx_alerts), build the sequence
+    for the combined minimal WAV (9995-WX Alert.wav). Newest alert is first.
     """
     EXTRA_SOUND_DIR = os.path.join("/home/drx/DRX/sounds", "extra")
     sequence = []
@@ -4358,9 +5416,7 @@ def build_multi_alert_combined_wav(alerts, debug_log=None):
             sequence.append({"wav": in_effect_wav})
         else:
             sequence.append({"synthesize": "in effect"})
-    combined_wav_path = "/home/drx/DRX/sounds/9995-WX Alert.wav"
-    create_combined_wav(sequence, combined_wav_path, debug_log)
-    debug_log and debug_log(f"[MONITOR] Combined WX Alert wav regenerated for {len(alerts)} alerts.")
+    return sequence
 
 def speak_wx_alerts(*args, **kwargs):
     debug_log = kwargs.get('debug_log', None)
@@ -4411,11 +5467,15 @@ def speak_wx_alerts(*args, **kwargs):
 
         # Announce each alert (full version), newest first
         for alert in active_alerts:
-            # Build the full sequence for this alert only
-            sequence = build_wx_alert_sequence_full_for_alert(alert, debug_log)
             # Optionally, set status to the description for user feedback
             status_manager.set_weather_report("WX Alert Report", f"Alert: {alert['description']}")
-            play_sequence(sequence, debug_log)
+            rendered = alert_announcement_wav(alert)
+            if rendered:
+                play_single_wav(rendered, interrupt_on_cos=False, block_interrupt=True, reset_status_on_end=False)
+            else:
+                # Not pre-rendered (alert monitoring off, or the render failed): build and play it live
+                sequence = build_wx_alert_sequence_full_for_alert(alert, debug_log)
+                play_sequence(sequence, debug_log)
             # Optional: brief pause between alerts for clarity
             time.sleep(0.3)
 
@@ -4554,12 +5614,21 @@ def append_datetime_wavs(dt, sequence):
         sequence += [{"wav": os.path.join(EXTRA_SOUND_DIR, w)} for w in get_wav_sequence_for_number(year_last_two)]
     return sequence
 
-def get_same_description_from_code(same_code, same_csv_path):
+same_descriptions = {}  # same.csv path -> (mtime_ns, {CODE: description})
+
+def load_same_descriptions(same_csv_path):
+    """Read same.csv into {CODE: description}, once per change of the file."""
     import csv
-    debug_log(f"Reading SAME CSV from: {same_csv_path}")
-    if not os.path.exists(same_csv_path):
+    try:
+        mtime_ns = os.stat(same_csv_path).st_mtime_ns
+    except OSError:
         debug_log(f"SAME CSV not found at {same_csv_path}")
-        return None
+        return {}
+    cached = same_descriptions.get(same_csv_path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    debug_log(f"Reading SAME CSV from: {same_csv_path}")
+    table = {}
     try:
         with open(same_csv_path, "r", encoding="utf-8") as csvfile:
             reader = csv.reader(csvfile)
@@ -4578,15 +5647,18 @@ def get_same_description_from_code(same_code, same_csv_path):
                     continue
                 if not description or "event" in desc_lower or "code" in desc_lower or "status" in desc_lower:
                     continue
-                # Log what is being compared
-                debug_log(f"Comparing: '{code.upper()}' (desc: '{description}') <-> '{same_code.upper()}'")
-                if code.upper() == same_code.upper():
-                    debug_log(f"MATCH: '{code.upper()}' -> '{description}'")
-                    return description
+                table.setdefault(code.upper(), description)  # First row for a code wins
     except Exception as e:
         debug_log(f"Failed to read SAME CSV: {e}")
-    debug_log(f"No match for code '{same_code}' in SAME CSV.")
-    return None
+        return {}
+    same_descriptions[same_csv_path] = (mtime_ns, table)
+    return table
+
+def get_same_description_from_code(same_code, same_csv_path):
+    description = load_same_descriptions(same_csv_path).get(same_code.upper())
+    if description is None:
+        debug_log(f"No match for code '{same_code}' in SAME CSV.")
+    return description
 
 def find_best_wav_for_words(words, extra_dir):
     """
@@ -4618,6 +5690,225 @@ def find_best_wav_for_words(words, extra_dir):
         return candidates[0]
     return None
 
+# --- Alert Pre-rendering ---
+# Announcements are rendered to WAV (sox, plus Piper for words without a
+# recording) by a worker pool as soon as an alert is ingested. Playback is
+# then a single file instead of synthesis while REMOTE_BUSY is held. Full
+# renders are cached per alert ID and version; the brief 9995-WX Alert.wav
+# covers the current set of alerts.
+ALERT_RENDER_DIR = os.path.join(DRX_DIRECTORY, "sounds", "alert_cache")
+WX_ALERT_BRIEF_WAV = "/home/drx/DRX/sounds/9995-WX Alert.wav"
+ALERT_RENDER_WAIT = 20  # Seconds an announcement waits for its render before building it live
+alert_render_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="alert_render")
+alert_render_lock = threading.Lock()
+alert_renders = {}  # render key -> {"path", "ready": Event, "ok"}
+alert_brief_seq = 0  # Bumped for every new set of alerts; only the latest brief render is kept
+# Optional NOAA Weather Radio audio: with [WX] alert_audio_source set, each
+# alert's broadcast audio is fetched and transcoded in the background and
+# played in place of the rendered announcement (see drx_alert_audio.py). The
+# cache is synced again every ALERT_AUDIO_SYNC_INTERVAL while it has anything
+# to do, so a clip the source only gets later is picked up and expired audio
+# is evicted.
+ALERT_AUDIO_DIR = os.path.join(DRX_DIRECTORY, "sounds", "alert_audio")
+ALERT_AUDIO_WAIT = 15  # Seconds an announcement waits for a pending fetch of its broadcast audio
+ALERT_AUDIO_SYNC_INTERVAL = 60
+alert_audio_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert_audio")
+alert_audio_lock = threading.Lock()
+alert_audio_cache = None
+alert_audio_settings = None  # (source, station) alert_audio_cache was made for
+alert_audio_jobs = {}  # alert id -> the sync that fetches its audio
+alert_audio_job = None  # The latest sync
+alert_audio_synced_at = 0
+
+def alert_render_key(alert):
+    """Alert ID plus a version hash of everything that is spoken, so an updated alert renders again."""
+    alert_id = alert.get("id") or f"{alert.get('code')}|{alert.get('effective_time')}"
+    spoken = "|".join(str(alert.get(k) or "") for k in
+                      ("code", "description", "nws_headline", "effective_time", "expires_time", "block"))
+    return f"{alert_id}#{hashlib.sha1(spoken.encode('utf-8')).hexdigest()[:12]}"
+
+def resolve_sequence_for_render(sequence):
+    """Replace missing WAVs and synthesized words with the recordings play_sequence would pick."""
+    resolved = []
+    for item in sequence:
+        if "wav" in item and os.path.exists(item["wav"]):
+            resolved.append(item)
+            continue
+        if "synthesize" in item:
+            text = item["synthesize"]
+        else:
+            text = os.path.splitext(os.path.basename(item["wav"]))[0].replace('_', ' ')
+        found_wav = find_best_wav_for_words(text.split(), EXTRA_SOUND_DIR)
+        resolved.append({"wav": found_wav} if found_wav and os.path.exists(found_wav) else {"synthesize": text})
+    return resolved
+
+def render_sequence_to_wav(sequence, path, kind):
+    """
+    Render a sequence for `path`; returns the finished temp file for the caller to os.replace(), or None.
+    The temp file goes in ALERT_RENDER_DIR (same filesystem as sounds/, so the replace is atomic) rather
+    than next to `path`, where a crash would leave it for the sound directory scans to find.
+    """
+    os.makedirs(ALERT_RENDER_DIR, exist_ok=True)
+    tmp = os.path.join(ALERT_RENDER_DIR, f"{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.tmp.wav")
+    with metric_timer("drx_prerender_seconds", kind=kind):
+        ok = create_combined_wav(resolve_sequence_for_render(sequence), tmp, debug_log)
+    if ok and os.path.exists(tmp):
+        return tmp
+    with contextlib.suppress(OSError):
+        os.remove(tmp)
+    return None
+
+def render_alert_full(key, alert, entry):
+    try:
+        rendered = render_sequence_to_wav(build_wx_alert_sequence_full_for_alert(alert, debug_log), entry["path"], "full")
+        if rendered:
+            os.replace(rendered, entry["path"])
+            entry["ok"] = True
+            debug_log(f"[ALERT RENDER] {key} ready at {entry['path']}")
+    except Exception as e:
+        debug_log(f"[ALERT RENDER] {key} failed: {e}")
+        log_exception("render_alert_full")
+    finally:
+        entry["ready"].set()
+        with alert_render_lock:
+            dropped = alert_renders.get(key) is not entry
+        if dropped:
+            with contextlib.suppress(OSError):
+                os.remove(entry["path"])
+
+def render_alert_brief(seq, alerts):
+    try:
+        sequence = build_multi_alert_sequence(alerts, debug_log)
+        rendered = render_sequence_to_wav(sequence, WX_ALERT_BRIEF_WAV, "brief")
+        if not rendered:
+            return
+        with alert_render_lock:
+            current = seq == alert_brief_seq
+            if current:
+                os.replace(rendered, WX_ALERT_BRIEF_WAV)
+        if current:
+            debug_log(f"[ALERT RENDER] Combined WX Alert wav ready for {len(alerts)} alerts.")
+        else:
+            os.remove(rendered)
+    except Exception as e:
+        debug_log(f"[ALERT RENDER] Combined WX Alert wav failed: {e}")
+        log_exception("render_alert_brief")
+
+def prerender_wx_alerts(alerts):
+    """
+    Queue full renders for alerts (or alert versions) not rendered yet, and
+    the brief for the new set of alerts. Renders for alerts that are no
+    longer active are dropped.
+    """
+    global alert_brief_seq
+    os.makedirs(ALERT_RENDER_DIR, exist_ok=True)
+    with alert_render_lock:
+        alert_brief_seq += 1
+        keys = set()
+        for alert in alerts:
+            key = alert_render_key(alert)
+            keys.add(key)
+            if key in alert_renders:
+                continue
+            name = f"alert-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.wav"
+            entry = {"path": os.path.join(ALERT_RENDER_DIR, name), "ready": threading.Event(), "ok": False}
+            alert_renders[key] = entry
+            alert_render_pool.submit(render_alert_full, key, alert, entry)
+        for key in [k for k in alert_renders if k not in keys]:
+            entry = alert_renders.pop(key)
+            if entry["ready"].is_set():
+                with contextlib.suppress(OSError):
+                    os.remove(entry["path"])
+        if alerts:
+            alert_render_pool.submit(render_alert_brief, alert_brief_seq, list(alerts))
+    queue_alert_audio(alerts)
+
+def get_alert_audio_cache():
+    """The alert audio cache for the current [WX] alert_audio_source / alert_audio_station, or None when unset."""
+    global alert_audio_cache, alert_audio_settings
+    settings = (config.get('WX', 'alert_audio_source', fallback='').strip(),
+                config.get('WX', 'alert_audio_station', fallback='').strip())
+    if settings != alert_audio_settings:  # First use, or changed by a config reload
+        alert_audio_settings = settings
+        alert_audio_cache = None
+        if settings[0]:
+            try:
+                alert_audio_cache = AlertAudioCache(ALERT_AUDIO_DIR, settings[0], station=settings[1],
+                                                    user_agent=f"DRX/{VERSION}")
+            except Exception as e:
+                debug_log(f"[ALERT AUDIO] Could not set up {ALERT_AUDIO_DIR}: {e}")
+    return alert_audio_cache
+
+def fetch_alert_audio(cache, alerts):
+    try:
+        with metric_timer("drx_prerender_seconds", kind="nwr"):
+            results = cache.sync(alerts)
+        for alert_id, path in results.items():
+            if path:
+                debug_log(f"[ALERT AUDIO] {alert_id} has broadcast audio at {path}")
+            elif alert_id in cache.errors:
+                debug_log(f"[ALERT AUDIO] {alert_id} failed: {cache.errors[alert_id]}")
+    except Exception as e:
+        debug_log(f"[ALERT AUDIO] Sync failed: {e}")
+        log_exception("fetch_alert_audio")
+
+def queue_alert_audio(alerts):
+    """Sync the alert audio cache with these alerts in the background, if it is configured."""
+    global alert_audio_job, alert_audio_synced_at
+    cache = get_alert_audio_cache()
+    if not cache:
+        return
+    with alert_audio_lock:
+        alert_audio_job = alert_audio_pool.submit(fetch_alert_audio, cache, list(alerts))
+        alert_audio_synced_at = time.time()
+        alert_audio_jobs.clear()
+        for alert in alerts:
+            if alert.get("id"):
+                alert_audio_jobs[alert["id"]] = alert_audio_job
+
+def sync_alert_audio_if_due(alerts):
+    """
+    Called from the alert monitor on every pass: syncs again once
+    ALERT_AUDIO_SYNC_INTERVAL has passed, while there are alerts or cached
+    audio and the previous sync has finished.
+    """
+    cache = get_alert_audio_cache()
+    if not cache or not (alerts or cache.index):
+        return
+    with alert_audio_lock:
+        due = time.time() - alert_audio_synced_at >= ALERT_AUDIO_SYNC_INTERVAL
+        busy = alert_audio_job is not None and not alert_audio_job.done()
+    if due and not busy:
+        queue_alert_audio(alerts)
+
+def alert_announcement_wav(alert):
+    """
+    What to play for an alert: its broadcast audio if that is cached (waiting
+    for a fetch in progress), else its pre-rendered announcement (waiting for
+    the render), else None to build it live.
+    """
+    cache = get_alert_audio_cache()
+    if cache:
+        with alert_audio_lock:
+            job = alert_audio_jobs.get(alert.get("id"))
+        if job is not None:
+            wait_futures([job], timeout=ALERT_AUDIO_WAIT)
+    audio = cache.get(alert) if cache else None
+    if audio:
+        metric_inc("drx_alert_announcements_total", source="broadcast")
+        return audio
+    rendered = wait_alert_render(alert)
+    metric_inc("drx_alert_announcements_total", source="rendered" if rendered else "live")
+    return rendered
+
+def wait_alert_render(alert, timeout=ALERT_RENDER_WAIT):
+    """The alert's pre-rendered announcement, once ready; None if it was never queued, failed or is late."""
+    with alert_render_lock:
+        entry = alert_renders.get(alert_render_key(alert))
+    if entry is None or not entry["ready"].wait(timeout):
+        return None
+    return entry["path"] if entry["ok"] and os.path.exists(entry["path"]) else None
+
 def play_sequence(sequence, debug_log=None):
     # Play each item in sequence; synthesize if WAV is missing
     for item in sequence:
@@ -4710,7 +6001,7 @@ def get_last_expires_time_from_wx_alerts():
 def create_combined_wav(sequence, outfile, debug_log=None):
     """
     Given a sequence of {"wav": path} and/or {"synthesize": text}, create a single .wav file.
-    Output: 16-bit, 22050 Hz, mono, signed PCM.
+    Output: 16-bit, 22050 Hz, mono, signed PCM. Returns True if the file was written.
     """
     sox_cmd = [
         "sox",  # Requires sox to be installed!
@@ -4764,8 +6055,10 @@ def create_combined_wav(sequence, outfile, debug_log=None):
             # If running unprivileged, chown may fail, ignore
             pass
         debug_log and debug_log(f"Combined WAV created at {outfile}")
+        return True
     except Exception as e:
         debug_log and debug_log(f"create_combined_wav failed: {e}")
+        return False
     finally:
         # Clean up temp files
         for tf in tempfiles:
@@ -4775,13 +6068,108 @@ def create_combined_wav(sequence, outfile, debug_log=None):
                 except Exception:
                     pass    
 
+WX_ALERT_STORE = os.path.join(os.path.dirname(__file__), 'wx', 'wx_alerts.json')
+wx_alert_store_cache = {"signature": None, "generation": None, "alerts": []}
+wx_alert_store_lock = threading.Lock()
+WX_ALERT_ARCHIVE_DB = os.path.join(os.path.dirname(__file__), 'logs', 'alerts.db')
+wx_alert_archive = None
+
+def get_wx_alert_archive():
+    """The alert archive (logs/alerts.db), opened on first use; None if it cannot be opened."""
+    global wx_alert_archive
+    if wx_alert_archive is None:
+        try:
+            wx_alert_archive = AlertArchive(WX_ALERT_ARCHIVE_DB)
+        except Exception as e:
+            debug_log(f"WX ALERT ARCHIVE: Could not open {WX_ALERT_ARCHIVE_DB}: {e}")
+    return wx_alert_archive
+
+def describe_wx_alert(code, description=None):
+    """Spoken description for an alert: NWS messages keep their own, others come from same.csv."""
+    if code.upper() == "NWS":
+        return description or "National Weather Service Message"
+    same_csv_path = os.path.join(os.path.dirname(__file__), "wx", "same.csv")
+    desc = get_same_description_from_code(code, same_csv_path)
+    if not desc:
+        desc = "Special Weather Statement" if code.upper() == "SVS" else f"Unknown alert ({code})"
+    return desc
+
+def load_wx_alert_store(debug_log=None):
+    """
+    Alerts from the wx_alerts.json store written by drx_wx, newest first, or
+    None if there is no store. An unchanged file costs one stat(); the alerts
+    are only rebuilt when the store's generation has moved.
+    """
+    try:
+        st = os.stat(WX_ALERT_STORE)
+    except OSError:
+        return None
+    signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+    with wx_alert_store_lock:
+        if signature == wx_alert_store_cache["signature"]:
+            return wx_alert_store_cache["alerts"]
+        try:
+            with open(WX_ALERT_STORE, 'r') as f:
+                store = json.load(f)
+        except (OSError, ValueError) as e:
+            debug_log and debug_log(f"load_wx_alert_store: could not read {WX_ALERT_STORE}: {e}")
+            return wx_alert_store_cache["alerts"]
+        return apply_wx_alert_store(store, signature, debug_log)
+
+def apply_wx_alert_store(store, signature, debug_log=None):
+    """
+    Make `store` (wx_alerts.json as read from disk or pushed by drx_wx) the
+    cached alerts for the file with this signature. The alerts are only
+    rebuilt when the store's generation has moved. The signature is only
+    recorded once the store has been read, so a store that raises here is
+    read from disk again next time. Call with wx_alert_store_lock held.
+    """
+    if store.get("generation") == wx_alert_store_cache["generation"]:
+        wx_alert_store_cache["signature"] = signature
+        return wx_alert_store_cache["alerts"]
+
+    alerts = []
+    seen = set()
+    for record in store.get("alerts", []):
+        code = (record.get("code") or "").strip()
+        try:
+            eff_dt = datetime.strptime(record.get("effective", ""), "%Y-%m-%d %H:%M:%S")
+            exp_dt = datetime.strptime(record.get("expires", ""), "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+        if not code or record.get("id") in seen:
+            continue
+        seen.add(record.get("id"))
+        alerts.append({
+            "id": record.get("id"),
+            "description": describe_wx_alert(code, record.get("description")),
+            "effective_time": eff_dt,
+            "expires_time": exp_dt,
+            "block": "",
+            "code": code,
+            "nws_headline": record.get("nws_headline", ""),
+            "zones": record.get("zones", []),
+        })
+    alerts.sort(key=lambda a: a["effective_time"], reverse=True)
+    wx_alert_store_cache["signature"] = signature
+    wx_alert_store_cache["generation"] = store.get("generation")
+    wx_alert_store_cache["alerts"] = alerts
+    debug_log and debug_log(f"apply_wx_alert_store: generation {store.get('generation')}, {len(alerts)} alerts")
+    return alerts
+
 def parse_all_active_wx_alerts(debug_log=None):
     """
-    Parse wx_alerts and return a list of dicts for all alerts that have not expired.
+    Return a list of dicts for all alerts that have not expired.
     Each dict has: description, effective_time (datetime), expires_time (datetime), block, code
     Alerts are sorted newest first (latest effective_time first).
     Only unique alerts (by @id or id, or fallback code/desc) are returned.
+    Read from the wx_alerts.json store, or by parsing the wx_alerts text if drx_wx has not written one.
     """
+    stored = load_wx_alert_store(debug_log)
+    if stored is not None:
+        now = datetime.now()
+        return [a for a in stored if a["expires_time"] > now]
+
     wx_alerts_path = os.path.join(os.path.dirname(__file__), 'wx', 'wx_alerts')
     if not os.path.exists(wx_alerts_path):
         return []
@@ -4805,21 +6193,8 @@ def parse_all_active_wx_alerts(debug_log=None):
                 continue
             if exp_dt > now:
                 code = code_match.group(1).strip()
-                desc = None
-                if code.upper() == "NWS":
-                    desc_match = re.search(r'Description:\s*(.+)', block)
-                    if desc_match:
-                        desc = desc_match.group(1).strip()
-                    else:
-                        desc = "National Weather Service Message"
-                else:
-                    same_csv_path = os.path.join(os.path.dirname(__file__), "wx", "same.csv")
-                    desc = get_same_description_from_code(code, same_csv_path)
-                if not desc:
-                    if code.upper() == "SVS":
-                        desc = "Special Weather Statement"
-                    else:
-                        desc = f"Unknown alert ({code})"
+                desc_match = re.search(r'Description:\s*(.+)', block)
+                desc = describe_wx_alert(code, desc_match.group(1).strip() if desc_match else None)
                 # True dedupe: use NWS @id or id if present, else fallback to (code, desc)
                 id_match = re.search(r'@id:\s*(\S+)', block)
                 if id_match:
@@ -5035,6 +6410,7 @@ def main():
             serial_port_missing = True
 
         load_state()
+        load_sudo_decks()
         
         # Initialize status manager with callback
         global status_manager
@@ -5046,15 +6422,18 @@ def main():
             start_wx_alert_monitoring(config, debug_log)
         
         try:
-            threading.Thread(target=serial_read_loop, daemon=True).start()
-            threading.Thread(target=process_serial_commands, daemon=True).start()
-            threading.Thread(target=bg_write_state_and_webcmd_loop, daemon=True).start()
-            threading.Thread(target=bg_cos_state_update_loop, daemon=True).start()
-            threading.Thread(target=command_processor_loop, daemon=True).start()
-            threading.Thread(target=dtmf_cos_edge_monitor, daemon=True).start()
-            threading.Thread(target=monitor_cos, daemon=True).start()
-            threading.Thread(target=run_flask_server, daemon=True).start()
-            threading.Thread(target=monitor_tot_cos, daemon=True).start()
+            start_thread(serial_read_loop)
+            start_thread(process_serial_commands)
+            start_thread(bg_write_state_loop)
+            start_thread(bg_cos_state_update_loop)
+            start_thread(command_processor_loop)
+            start_thread(dtmf_cos_edge_monitor)
+            start_thread(monitor_cos)
+            start_thread(run_flask_server)
+            start_thread(monitor_tot_cos)
+            start_thread(sound_prefetch_loop)
+            start_thread(warm_set_rebalance_loop)
+            start_thread(wx_report_watch_loop)
 
             if is_terminal():
                 try:
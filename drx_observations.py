@@ -0,0 +1,254 @@
+"""
+DRX weather observation store
+
+Keeps every observation drx_wx fetches, so trends can be read back without
+refetching or rescanning:
+
+    wx/history/obs-300.bin     5-minute buckets
+    wx/history/obs-3600.bin    hourly rollups
+    wx/history/obs-86400.bin   daily rollups
+
+Each file is a small header followed by fixed-width records, one per time
+bucket, so the record for any timestamp sits at a computed offset. A bucket
+with no observation is left as zeros, which is also what a sparse file
+reads back as. Each observation is merged into its bucket in all three
+tiers.
+
+A record keeps the bucket's temperature min/max/sum, first and last
+pressure, last humidity, peak wind and a running rainfall total. The
+rainfall total is the inches accumulated since the store was created, so
+rain over any window is one subtraction.
+
+    pressure_tendency(3)    last pressure minus the one 3 hours earlier
+    temperature_range(24)   min/max over the window, read in one pread()
+    rain_total_since(24)    inches of rain over the window
+"""
+
+import os
+import math
+import time
+import struct
+
+HEADER = struct.Struct("<4sHHII")  # magic, version, reserved, resolution, first bucket
+RECORD = struct.Struct("<IH2x7fd")  # bucket, count, temp min/max/sum, pressure first/last, humidity, wind max, rain total
+MAGIC = b"DRXO"
+VERSION = 1
+TIERS = (300, 3600, 86400)
+MAX_GAP_BUCKETS = 3  # How far back a lookup steps over empty buckets before giving up
+NAN = float("nan")
+
+
+def _num(value):
+    """First number in a wx_data style value ('74 degrees', '30.01'), or None."""
+    if value is None:
+        return None
+    try:
+        return float(str(value).split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def _known(value):
+    return value is not None and not math.isnan(value)
+
+
+class Tier:
+    """One resolution of the store: fixed-width bucket records in a single file."""
+
+    def __init__(self, path, resolution, readonly=False):
+        self.path = path
+        self.resolution = resolution
+        self.readonly = readonly
+        self.fd = None
+        self.base = None
+        self._open()
+
+    def _open(self):
+        if not os.path.exists(self.path):
+            if self.readonly:
+                return
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            os.close(fd)
+        self.fd = os.open(self.path, os.O_RDONLY if self.readonly else os.O_RDWR)
+        self._read_header()
+
+    def _read_header(self):
+        header = os.pread(self.fd, HEADER.size, 0)
+        if len(header) == HEADER.size:
+            magic, version, _, resolution, base = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or resolution != self.resolution:
+                raise ValueError(f"{self.path} is not a {self.resolution}s observation file")
+            self.base = base
+
+    def _ready(self):
+        """True once the file has a header; a reader picks up a file the writer created later."""
+        if self.base is None:
+            if self.fd is None:
+                self._open()
+            if self.fd is not None:
+                self._read_header()
+        return self.base is not None
+
+    def _offset(self, bucket):
+        return HEADER.size + (bucket - self.base) * RECORD.size
+
+    def read(self, bucket):
+        """The record for a bucket as a tuple, or None if nothing was stored in it."""
+        if not self._ready() or bucket < self.base:
+            return None
+        raw = os.pread(self.fd, RECORD.size, self._offset(bucket))
+        if len(raw) < RECORD.size:
+            return None
+        record = RECORD.unpack(raw)
+        return record if record[0] == bucket and record[1] else None
+
+    def read_range(self, first, last):
+        """Stored records for buckets first..last inclusive, with one read."""
+        if not self._ready() or last < self.base:
+            return []
+        first = max(first, self.base)
+        raw = os.pread(self.fd, (last - first + 1) * RECORD.size, self._offset(first))
+        records = []
+        for index in range(len(raw) // RECORD.size):
+            record = RECORD.unpack_from(raw, index * RECORD.size)
+            if record[0] == first + index and record[1]:
+                records.append(record)
+        return records
+
+    def find(self, bucket):
+        """The record for a bucket, or the nearest earlier one within MAX_GAP_BUCKETS."""
+        for back in range(MAX_GAP_BUCKETS + 1):
+            record = self.read(bucket - back)
+            if record:
+                return record
+        return None
+
+    def last(self):
+        """The newest stored record, or None."""
+        if not self._ready():
+            return None
+        size = os.fstat(self.fd).st_size
+        count = (size - HEADER.size) // RECORD.size
+        return self.find(self.base + count - 1) if count > 0 else None
+
+    def merge(self, bucket, temperature, humidity, pressure, wind, rain_total):
+        if self.base is None:
+            self.base = bucket
+            os.pwrite(self.fd, HEADER.pack(MAGIC, VERSION, 0, self.resolution, bucket), 0)
+        if bucket < self.base:
+            return
+        old = self.read(bucket)
+        if old is None:
+            old = (bucket, 0, NAN, NAN, 0.0, NAN, NAN, NAN, NAN, rain_total)
+        _, count, t_min, t_max, t_sum, p_first, p_last, hum, wind_max, _ = old
+        if temperature is not None:
+            t_min = temperature if not _known(t_min) else min(t_min, temperature)
+            t_max = temperature if not _known(t_max) else max(t_max, temperature)
+            t_sum += temperature
+        if pressure is not None:
+            p_first = pressure if not _known(p_first) else p_first
+            p_last = pressure
+        if humidity is not None:
+            hum = humidity
+        if wind is not None:
+            wind_max = wind if not _known(wind_max) else max(wind_max, wind)
+        record = RECORD.pack(bucket, min(count + 1, 0xFFFF), t_min, t_max, t_sum, p_first, p_last,
+                             hum, wind_max, rain_total)
+        os.pwrite(self.fd, record, self._offset(bucket))
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ObservationStore:
+    """
+    Observation history for drx_wx to append to and drx_main to query.
+    Open it with readonly=True from any process that only reads.
+    """
+
+    def __init__(self, directory, readonly=False):
+        self.directory = directory
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+        self.tiers = {res: Tier(os.path.join(directory, f"obs-{res}.bin"), res, readonly) for res in TIERS}
+        self.fine = self.tiers[TIERS[0]]
+        last = self.fine.last()
+        self.rain_total = last[9] if last else 0.0
+        self.last_time = last[0] * self.fine.resolution if last else None
+
+    def append(self, ts, temperature=None, humidity=None, pressure=None, wind_speed=None,
+               wind_gust=None, precip_rate=None):
+        """
+        Record one observation taken at epoch `ts`. Values may be numbers or
+        wx_data strings ('61 degrees'); unknown values are skipped. precip_rate
+        is in inches per hour and is added to the rainfall total for the time
+        since the previous observation, up to an hour.
+        """
+        temperature, humidity, pressure = _num(temperature), _num(humidity), _num(pressure)
+        winds = [w for w in (_num(wind_speed), _num(wind_gust)) if w is not None]
+        wind = max(winds) if winds else None
+        rate = _num(precip_rate)
+        if rate and self.last_time is not None and ts > self.last_time:
+            self.rain_total += rate * min(ts - self.last_time, 3600) / 3600
+        self.last_time = ts
+        for res, tier in self.tiers.items():
+            tier.merge(int(ts // res), temperature, humidity, pressure, wind, self.rain_total)
+
+    def _window(self, hours, now=None):
+        now = time.time() if now is None else now
+        return int(now // self.fine.resolution), int((now - hours * 3600) // self.fine.resolution)
+
+    def latest(self):
+        """The newest 5-minute bucket as a dict, or None."""
+        record = self.fine.last()
+        if not record:
+            return None
+        return {
+            "time": record[0] * self.fine.resolution,
+            "temperature_low": round(record[2], 1) if _known(record[2]) else None,
+            "temperature_high": round(record[3], 1) if _known(record[3]) else None,
+            "pressure": round(record[6], 2) if _known(record[6]) else None,
+            "humidity": round(record[7]) if _known(record[7]) else None,
+            "wind_max": round(record[8]) if _known(record[8]) else None,
+            "rain_total": round(record[9], 2),
+        }
+
+    def pressure_tendency(self, hours=3, now=None, steady_within=0.02):
+        """(change in inHg, 'rising' / 'falling' / 'steady') over the window, or None without both ends."""
+        end_bucket, start_bucket = self._window(hours, now)
+        end, start = self.fine.find(end_bucket), self.fine.find(start_bucket)
+        if not end or not start or end[0] == start[0] or not _known(end[6]) or not _known(start[6]):
+            return None
+        change = round(round(end[6], 2) - round(start[6], 2), 2)
+        if abs(change) < steady_within:
+            return change, "steady"
+        return change, "rising" if change > 0 else "falling"
+
+    def temperature_range(self, hours=24, now=None):
+        """(min, max) temperature over the window from the hourly or daily rollups, or None."""
+        now = time.time() if now is None else now
+        res = 3600 if hours <= 72 else 86400
+        records = self.tiers[res].read_range(int((now - hours * 3600) // res), int(now // res))
+        lows = [r[2] for r in records if _known(r[2])]
+        highs = [r[3] for r in records if _known(r[3])]
+        if not lows:
+            return None
+        return round(min(lows), 1), round(max(highs), 1)
+
+    def rain_total_since(self, hours=24, now=None):
+        """Inches of rain over the window, or None if the store does not reach back that far."""
+        end_bucket, start_bucket = self._window(hours, now)
+        end, start = self.fine.find(end_bucket), self.fine.find(start_bucket)
+        if not end:
+            return None
+        if not start:
+            if self.fine.base is None or start_bucket >= self.fine.base:
+                return None
+            return round(end[9], 2)  # Window starts before the store: everything recorded counts
+        return round(end[9] - start[9], 2)
+
+    def close(self):
+        for tier in self.tiers.values():
+            tier.close()
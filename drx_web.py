@@ -5,8 +5,14 @@ import configparser
 import requests
 import subprocess
 import re
-from flask import Flask, render_template_string, redirect, url_for, request, session, send_from_directory, jsonify, flash
+import threading
+import queue
+import zlib
+from flask import Flask, Response, make_response, redirect, url_for, request, session, send_from_directory, jsonify, flash
 from drx_main import VERSION
+from drx_logtail import LogTail, head_lines
+from drx_history import HistoryStore, EVENT_KINDS
+from drx_alert_archive import AlertArchive
 
 DRX_START_TIME = time.time()
 
@@ -23,7 +29,6 @@ DTMF_LOG_FILE = os.path.join(script_dir, "logs", "dtmf.log")
 WX_CONFIG_PATH = os.path.join(script_dir, 'wx', 'wx_config.ini')
 
 STATE_FILE = os.path.join(script_dir, 'drx_state.json')  # NOTE: No longer used - kept for debug endpoint only
-WEBCMD_FILE = '/tmp/drx_webcmd.json'
 SOUND_DIRECTORY = config['Sound']['directory']
 SOUND_FILE_EXTENSION = config['Sound']['extension']
 LOG_FILE = '/home/drx/DRX/logs/drx.log'
@@ -41,6 +46,8 @@ TOT_STATE = {
 
 # --- State API Configuration ---
 DRX_MAIN_API_URL = "http://127.0.0.1:5000/api/state"
+DRX_MAIN_TRACES_URL = "http://127.0.0.1:5000/api/traces"
+DRX_MAIN_COMMAND_URL = "http://127.0.0.1:5000/api/command"
 HTTP_TIMEOUT = 2.0  # Timeout for HTTP requests to drx_main.py
 
 app = Flask(__name__)
@@ -77,6 +84,13 @@ DASHBOARD_TEMPLATE = '''
     border-radius: 5px;
     padding: 0.2em 0.7em;
 }
+.weather-degraded {
+    color: #fff !important;
+    background: #f57c00;
+    font-weight: bold;
+    border-radius: 5px;
+    padding: 0.2em 0.7em;
+}
 .weather-warn, .weather-notinstalled {
     color: #fff !important;
     background: #888;
@@ -703,7 +717,6 @@ select[name="track_dropdown"] {
 }
 </style>
 <script>
-let updateStatus;
 document.addEventListener("DOMContentLoaded", function() {
     // Play Local Modal elements
     const playLocalModal = document.getElementById('play-local-modal');
@@ -767,13 +780,8 @@ if (dropdownForm) {
             if (data.local_play && data.filename) {
                 // Open modal with the filename
                 openPlayLocalModal(data.filename);
-            } else {
-                // Normal DRX play - update status
-                updateStatus();
-                updateSerialSection();
-                updateLogsSection();
-                updateStateSection();
             }
+            // Normal DRX play - the push channel delivers the new status
         });
     });
 }
@@ -794,141 +802,115 @@ if (inputForm) {
             if (data.local_play && data.filename) {
                 // Open modal with the filename
                 openPlayLocalModal(data.filename);
-            } else {
-                // Normal DRX play - update status
-                updateStatus();
-                updateSerialSection();
-                updateLogsSection();
-                updateStateSection();
             }
+            // Normal DRX play - the push channel delivers the new status
         });
     });
 }
 
-    function updateMessageTimer() {
-        fetch("/api/message_timer", {credentials: 'same-origin'})
-        .then(response => response.json())
-        .then(data => {
-            const el = document.getElementById('message-timer');
-            if (!el) return;
-            if (data.seconds_left > 0) {
-                const mins = Math.floor(data.seconds_left / 60);
-                const secs = data.seconds_left % 60;
-                if (mins > 0) {
-                    el.textContent = `${mins}m ${secs.toString().padStart(2, '0')}s`;
-                } else {
-                    el.textContent = `${secs}s`;
-                }
-                el.classList.add("running");
-                el.classList.remove("ready");
+    function renderMessageTimer(data) {
+        const el = document.getElementById('message-timer');
+        if (!el) return;
+        if (data.seconds_left > 0) {
+            const mins = Math.floor(data.seconds_left / 60);
+            const secs = data.seconds_left % 60;
+            if (mins > 0) {
+                el.textContent = `${mins}m ${secs.toString().padStart(2, '0')}s`;
             } else {
-                el.textContent = "Ready";
-                el.classList.add("ready");
-                el.classList.remove("running");
+                el.textContent = `${secs}s`;
             }
-        });
+            el.classList.add("running");
+            el.classList.remove("ready");
+        } else {
+            el.textContent = "Ready";
+            el.classList.add("ready");
+            el.classList.remove("running");
+        }
     }
-    setInterval(updateMessageTimer, 1000);
-    updateMessageTimer();
-
-    // Poll status every second
-updateStatus = function() {
-    fetch("{{ url_for('status_api') }}", {credentials: 'same-origin'})
-    .then(response => response.json())
-    .then(data => {
-        document.querySelectorAll('.status-currently-playing').forEach(function(el) {
-            el.textContent = data.currently_playing || "None";
-        });
-        document.querySelectorAll('.status-last-played').forEach(function(el) {
-            el.textContent = data.last_played || "None";
-        });
-        if (document.getElementById('playback-status')) {
-            let statusLabel = data.playback_status || "Idle";
-            if (statusLabel === "Restarting") {
-                statusLabel = "Pending Restart";
-            }
-            document.getElementById('playback-status').textContent = statusLabel;
+
+function renderStatus(data) {
+    document.querySelectorAll('.status-currently-playing').forEach(function(el) {
+        el.textContent = data.currently_playing || "None";
+    });
+    document.querySelectorAll('.status-last-played').forEach(function(el) {
+        el.textContent = data.last_played || "None";
+    });
+    if (document.getElementById('playback-status')) {
+        let statusLabel = data.playback_status || "Idle";
+        if (statusLabel === "Restarting") {
+            statusLabel = "Pending Restart";
         }
+        document.getElementById('playback-status').textContent = statusLabel;
+    }
+    
+    // COS LED with TOT flashing support
+    const cosLed = document.getElementById('cos-led');
+    if (cosLed) {
+        // Remove all previous classes
+        cosLed.className = 'led-indicator';
         
-        // COS LED with TOT flashing support
-        const cosLed = document.getElementById('cos-led');
-        if (cosLed) {
-            // Remove all previous classes
-            cosLed.className = 'led-indicator';
-            
-            if (data.tot_active) {
-                // TOT is active - flash red regardless of COS state
-                cosLed.classList.add('led-cos-flashing');
-                cosLed.title = 'TOT Active - Time Out Timer Running';
-            } else if (data.cos_state) {
-                // Normal COS active
-                cosLed.classList.add('led-cos-active');
-                cosLed.title = 'COS Active';
-            } else {
-                // COS inactive
-                cosLed.classList.add('led-inactive');
-                cosLed.title = 'COS Inactive';
-            }
+        if (data.tot_active) {
+            // TOT is active - flash red regardless of COS state
+            cosLed.classList.add('led-cos-flashing');
+            cosLed.title = 'TOT Active - Time Out Timer Running';
+        } else if (data.cos_state) {
+            // Normal COS active
+            cosLed.classList.add('led-cos-active');
+            cosLed.title = 'COS Active';
+        } else {
+            // COS inactive
+            cosLed.classList.add('led-inactive');
+            cosLed.title = 'COS Inactive';
         }
-        
-        // Remote Device LED (unchanged)
-        const rdbLed = document.getElementById('remote-device-led');
-        if (rdbLed) {
-            if (data.remote_device_active) {
-                rdbLed.className = 'led-indicator led-remote-active';
-                rdbLed.title = 'Remote Device Active';
-            } else {
-                rdbLed.className = 'led-indicator led-inactive';
-                rdbLed.title = 'Remote Device Inactive';
-            }
+    }
+    
+    // Remote Device LED (unchanged)
+    const rdbLed = document.getElementById('remote-device-led');
+    if (rdbLed) {
+        if (data.remote_device_active) {
+            rdbLed.className = 'led-indicator led-remote-active';
+            rdbLed.title = 'Remote Device Active';
+        } else {
+            rdbLed.className = 'led-indicator led-inactive';
+            rdbLed.title = 'Remote Device Inactive';
         }
-    });
-};
-
-    function updateSerialSection() {
-        fetch("{{ url_for('api_serial_commands') }}", {credentials: 'same-origin'})
-        .then(response => response.text())
-        .then(html => {
-            document.getElementById('serial-section').innerHTML = html;
-        });
     }
+}
 
-    function updateLogsSection() {
-        fetch("{{ url_for('api_log_entries') }}", {credentials: 'same-origin'})
-        .then(response => response.text())
-        .then(html => {
-            document.getElementById('logs-section').innerHTML = html;
-        });
-    }
+function renderCosMinutes(data) {
+    const el = document.getElementById('cos-today-minutes');
+    if (el) el.textContent = data.cos_today_minutes;
+}
 
-    function updateStateSection() {
-        fetch("{{ url_for('api_state_blocks') }}", {credentials: 'same-origin'})
-        .then(response => response.text())
-        .then(html => {
-            document.getElementById('state-section').innerHTML = html;
+    // One push channel replaces the per-section pollers. Dict topics carry only
+    // the fields that changed, so they are merged into what we already have.
+    const pushed = {status: {}, message_timer: {}, cos_minutes: {}, uptime: {}};
+    const renderers = {
+        status: function(data) { renderStatus(data); renderWeatherBadge(data); },
+        message_timer: renderMessageTimer,
+        cos_minutes: renderCosMinutes,
+        uptime: renderUptime,
+    };
+    const sections = {
+        serial: 'serial-section',
+        logs: 'logs-section',
+        state_blocks: 'state-section',
+        dtmf: 'dtmf-log-section',
+        traces: 'traces-section',
+    };
+    const dashEvents = new EventSource("{{ url_for('api_events') }}");
+    Object.keys(renderers).forEach(function(topic) {
+        dashEvents.addEventListener(topic, function(event) {
+            Object.assign(pushed[topic], JSON.parse(event.data));
+            renderers[topic](pushed[topic]);
+        });
+    });
+    Object.keys(sections).forEach(function(topic) {
+        dashEvents.addEventListener(topic, function(event) {
+            const el = document.getElementById(sections[topic]);
+            if (el) el.innerHTML = JSON.parse(event.data);
         });
-    }
-
-function updateCosMinutes() {
-    fetch("/api/cos_minutes", {credentials: 'same-origin'})
-    .then(response => response.json())
-    .then(data => {
-        const el = document.getElementById('cos-today-minutes');
-        if (el) el.textContent = data.cos_today_minutes;
     });
-}
-
-    setInterval(updateCosMinutes, 1000);
-    updateCosMinutes();
-    setInterval(updateStatus, 100);
-    setInterval(updateSerialSection, 1000);
-    setInterval(updateLogsSection, 1000);
-    setInterval(updateStateSection, 1000);
-
-    updateStatus();
-    updateSerialSection();
-    updateLogsSection();
-    updateStateSection();
 
     // Help Modal
     var helpBtn = document.getElementById('help-btn');
@@ -942,23 +924,17 @@ function updateCosMinutes() {
         };
     }
 });
-function updateUptime() {
-    fetch("{{ url_for('api_drx_uptime') }}", {credentials: 'same-origin'})
-    .then(response => response.json())
-    .then(data => {
-        var up = document.getElementById('drx-uptime');
-        if(up) {
-            up.textContent = data.drx_uptime;
-            if(data.not_running) {
-                up.classList.add('flash-red');
-            } else {
-                up.classList.remove('flash-red');
-            }
+function renderUptime(data) {
+    var up = document.getElementById('drx-uptime');
+    if(up) {
+        up.textContent = data.drx_uptime;
+        if(data.not_running) {
+            up.classList.add('flash-red');
+        } else {
+            up.classList.remove('flash-red');
         }
-    });
+    }
 }
-setInterval(updateUptime, 1000);
-window.addEventListener('DOMContentLoaded', updateUptime);
 </script>
 <script>
 document.addEventListener('DOMContentLoaded', function() {
@@ -1094,7 +1070,7 @@ document.addEventListener('DOMContentLoaded', function() {
             <div class="subcard-label">Weather System:</div>
             <div class="subcard-value">
                 <span id="ctone-timer" style="display:none; font-size:0.7em; color:#ff2222; margin-right:0.5em;"></span>
-                <span id="weather-badge" class="{{ weather_class }}">{{ weather_status }}</span>
+                <span id="weather-badge" class="{{ weather_class }}" title="{{ weather_detail }}">{{ weather_status }}</span>
             </div>
         </div>
     </div>
@@ -1257,10 +1233,6 @@ document.addEventListener("DOMContentLoaded", function() {
                 if (data.local_url) {
                     window.location = data.local_url;
                 }
-                if (typeof updateStatus === "function") updateStatus();
-                if (typeof updateSerialSection === "function") updateSerialSection();
-                if (typeof updateLogsSection === "function") updateLogsSection();
-                if (typeof updateStateSection === "function") updateStateSection();
             });
         });
     }
@@ -1282,10 +1254,6 @@ document.addEventListener("DOMContentLoaded", function() {
                 if (data.local_url) {
                     window.location = data.local_url;
                 }
-                if (typeof updateStatus === "function") updateStatus();
-                if (typeof updateSerialSection === "function") updateSerialSection();
-                if (typeof updateLogsSection === "function") updateLogsSection();
-                if (typeof updateStateSection === "function") updateStateSection();
             });
         });
     }
@@ -1390,6 +1358,12 @@ document.addEventListener("DOMContentLoaded", function() {
     </div>
     <a href="{{ url_for('download_dtmf_log') }}">Download Full DTMF Log</a>
     </div>
+    <div class="card-section">
+    <h2>Slowest Recent Commands</h2>
+    <div class="logs" id="traces-section">
+        Loading...
+    </div>
+    </div>
     <!-- === State section now comes after log section === -->
     <div class="card-section" id="state-section">
         {{ state_blocks_html|safe }}
@@ -1408,15 +1382,6 @@ document.addEventListener("DOMContentLoaded", function() {
         </div>
     </div>
 <script>
-function updateDtmfLog() {
-    fetch("{{ url_for('api_dtmf_log') }}")
-    .then(response => response.text())
-    .then(html => {
-        document.getElementById('dtmf-log-section').innerHTML = html;
-    });
-}
-setInterval(updateDtmfLog, 2000);
-window.addEventListener('DOMContentLoaded', updateDtmfLog);
 document.addEventListener("DOMContentLoaded", function() {
     function syncPlayMethod(event) {
         var method = document.getElementById('play_method_selector').value;
@@ -2199,46 +2164,37 @@ function validateRanges() {
     </div>
 </div>
 <script>
-function refreshWeatherBadge() {
-    fetch("/api/status", {credentials: 'same-origin'})
-    .then(response => {
-        if (!response.ok) throw new Error("API error");
-        return response.json();
-    })
-    .then(state => {
-        let badge = document.getElementById('weather-badge');
-        let timer = document.getElementById('ctone-timer');
-        if (!badge || !timer) return;
-
-        // Update badge status/class/text/color if needed
-        if (state.weather_status !== undefined) {
-            badge.textContent = state.weather_status;
-        }
-        if (state.weather_class !== undefined) {
-            badge.className = state.weather_class;
-        }
-        if (state.weather_color !== undefined) {
-            badge.style.color = state.weather_color;
-        }
+function renderWeatherBadge(state) {
+    let badge = document.getElementById('weather-badge');
+    let timer = document.getElementById('ctone-timer');
+    if (!badge || !timer) return;
+
+    // Update badge status/class/text/color if needed
+    if (state.weather_status !== undefined) {
+        badge.textContent = state.weather_status;
+    }
+    if (state.weather_class !== undefined) {
+        badge.className = state.weather_class;
+    }
+    if (state.weather_color !== undefined) {
+        badge.style.color = state.weather_color;
+    }
+    if (state.weather_detail !== undefined) {
+        badge.title = state.weather_detail;
+    }
 
-        // Timer logic
-        if (state.ctone_time_remaining != null && state.ctone_time_remaining > 0) {
-            let secs = state.ctone_time_remaining;
-            let min = Math.floor(secs / 60);
-            let s = secs % 60;
-            timer.textContent = `${min}:${s.toString().padStart(2, "0")}`;
-            timer.style.display = "inline";
-        } else {
-            timer.style.display = "none";
-            timer.textContent = "";
-        }
-    })
-    .catch(err => {
-        console.error("Weather badge refresh error:", err);
-    });
+    // Timer logic
+    if (state.ctone_time_remaining != null && state.ctone_time_remaining > 0) {
+        let secs = state.ctone_time_remaining;
+        let min = Math.floor(secs / 60);
+        let s = secs % 60;
+        timer.textContent = `${min}:${s.toString().padStart(2, "0")}`;
+        timer.style.display = "inline";
+    } else {
+        timer.style.display = "none";
+        timer.textContent = "";
+    }
 }
-setInterval(refreshWeatherBadge, 1000);
-document.addEventListener('DOMContentLoaded', refreshWeatherBadge);
 </script>
 <!-- Place this at the end of your DASHBOARD_TEMPLATE, before </body> -->
 <div id="url-modal" style="display:none; position:fixed; z-index:9999; left:0; top:0; width:100vw; height:100vh; background:rgba(0,0,0,0.25); align-items:center; justify-content:center;">
@@ -2354,6 +2310,93 @@ h1 { color: #3949ab; font-weight: 700; margin-bottom: 1.2em; text-align: center;
 </html>
 '''
 
+LOG_ENTRIES_TEMPLATE = '''
+        {% for entry in web_log %}
+            <div>{{ entry }}</div>
+        {% endfor %}
+    '''
+
+SERIAL_COMMANDS_TEMPLATE = '''
+        {% for line in formatted %}
+            <div>{{ line }}</div>
+        {% endfor %}
+    '''
+
+DTMF_LOG_TEMPLATE = '''
+        {% for entry in dtmf_log %}
+            <div>{{ entry }}</div>
+        {% endfor %}
+    '''
+
+TRACES_TEMPLATE = '''
+        {% for t in slowest %}
+            <div><b>{{ t.ts }}: {{ t.cmd }}</b> ({{ t.src }}) {{ '%.1f'|format(t.total_ms) }} ms
+            &mdash; {% for s in t.stages %}{{ s.stage }} {{ '%.1f'|format(s.ms) }}{% if not loop.last %}, {% endif %}{% endfor %}</div>
+        {% else %}
+            <div>No command traces yet.</div>
+        {% endfor %}
+    '''
+
+# --- Template Registry ---
+# render_template_string parses and compiles its source on every call, so every
+# template is compiled once here and rendered from the registry instead.
+TEMPLATES = {
+    "dashboard": DASHBOARD_TEMPLATE,
+    "login": LOGIN_TEMPLATE,
+    "state_blocks": STATE_BLOCKS_TEMPLATE,
+    "log_entries": LOG_ENTRIES_TEMPLATE,
+    "serial_commands": SERIAL_COMMANDS_TEMPLATE,
+    "dtmf_log": DTMF_LOG_TEMPLATE,
+    "traces": TRACES_TEMPLATE,
+}
+compiled_templates = {name: app.jinja_env.from_string(source) for name, source in TEMPLATES.items()}
+
+# Last rendering of each fragment and the key it was rendered for
+fragment_cache = {}
+fragment_cache_lock = threading.Lock()
+
+def render_registered(name, **context):
+    """Render a precompiled template with the same context Flask gives render_template_string."""
+    app.update_template_context(context)
+    return compiled_templates[name].render(context)
+
+def render_fragment(name, key, build_context):
+    """
+    Render a fragment, reusing the last rendering while its key is unchanged (key None: always render).
+    build_context is only called on a miss, so unchanged fragments skip their file reads too.
+    """
+    if key is not None:
+        with fragment_cache_lock:
+            cached = fragment_cache.get(name)
+        if cached and cached[0] == key:
+            return cached[1]
+    html = render_registered(name, **build_context())
+    if key is not None:
+        with fragment_cache_lock:
+            fragment_cache[name] = (key, html)
+    return html
+
+def fragment_response(name, key, render):
+    """Serve a fragment with an ETag built from its key; a browser that already has it gets a 304."""
+    if key is None:
+        return render()
+    etag = f"{name}-{key}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+def file_signature(path):
+    """Cheap change key for a log file: size and mtime, or None if it cannot be read."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
 def get_all_sound_files():
     try:
         ext = SOUND_FILE_EXTENSION.lower()
@@ -2383,67 +2426,97 @@ def require_login(f):
 
 import sys  # Add this if not already there
 
-# Add these variables at the top near your other imports
-_state_cache = {}
-_state_cache_time = 0
-_state_cache_ttl = 0.1  # Cache valid for 100 ms
+# --- State Mirror ---
+# A single background subscription keeps a local copy of drx_main's state by
+# long-polling /api/state with a version cursor. Every handler reads that copy,
+# so web traffic never turns into extra requests against the playback process.
+STATE_POLL_WAIT = 1.0  # Longest a poll waits for a change; also how often updated_at refreshes
+state_mirror = {}
+state_mirror_version = None
+state_mirror_synced_at = 0
+state_mirror_lock = threading.Lock()
+state_mirror_ready = threading.Event()
+state_mirror_thread = None
+
+def state_subscription_loop():
+    global state_mirror, state_mirror_version, state_mirror_synced_at
+    http = requests.Session()
+    while True:
+        try:
+            if state_mirror_version is None:
+                response = http.get(DRX_MAIN_API_URL, timeout=HTTP_TIMEOUT)
+                response.raise_for_status()
+                state = response.json()
+                version = state.get("state_version", 0)
+            else:
+                response = http.get(DRX_MAIN_API_URL,
+                                    params={"since": state_mirror_version, "wait": STATE_POLL_WAIT},
+                                    timeout=STATE_POLL_WAIT + HTTP_TIMEOUT)
+                response.raise_for_status()
+                body = response.json()
+                if body["changes"].get("drx_start_time") != state_mirror.get("drx_start_time"):
+                    # drx_main restarted; our cursor means nothing to it any more
+                    state_mirror_version = None
+                    continue
+                version = body["state_version"]
+                state = dict(state_mirror)
+                state.update(body["changes"])
+            with state_mirror_lock:
+                state_mirror = state
+                state_mirror_version = version
+                state_mirror_synced_at = time.time()
+            state_mirror_ready.set()
+        except Exception:
+            # drx_main.py might not be running; keep serving the last copy and resync when it is back
+            state_mirror_version = None
+            state_mirror_ready.set()
+            time.sleep(1.0)
 
 def read_state():
     """
-    Fetch current state from drx_main.py via HTTP API instead of reading from file.
-    Falls back to cached state if HTTP request fails.
+    Return the local mirror of drx_main.py's state.
+    Starts the subscription on first use and briefly waits for its first sync.
+    """
+    global state_mirror_thread
+    with state_mirror_lock:
+        if state_mirror_thread is None:
+            state_mirror_thread = threading.Thread(target=state_subscription_loop, daemon=True)
+            state_mirror_thread.start()
+    state_mirror_ready.wait(HTTP_TIMEOUT)
+    return state_mirror
+
+def write_webcmd(cmd_dict):
+    """
+    Send a command to drx_main.py and return its acknowledgement.
+    drx_main runs the command before answering, so there is nothing to wait for afterwards.
     """
-    global _state_cache, _state_cache_time
-    
-    # Return cached state if it's recent enough
-    if time.time() - _state_cache_time < _state_cache_ttl and _state_cache:
-        return _state_cache
-    
     try:
-        # Fetch state from drx_main.py HTTP API
-        response = requests.get(DRX_MAIN_API_URL, timeout=HTTP_TIMEOUT)
-        if response.status_code == 200:
-            state = response.json()
-            # Update cache
-            _state_cache = state
-            _state_cache_time = time.time()
-            return state
-        else:
-            # HTTP error - return cached state if available
-            return _state_cache if _state_cache else {}
-    except requests.exceptions.RequestException:
+        response = requests.post(DRX_MAIN_COMMAND_URL, json=cmd_dict, timeout=HTTP_TIMEOUT)
+        return response.json()
+    except requests.exceptions.RequestException as e:
         # Connection failed - drx_main.py might not be running
-        # Return cached state if available, otherwise empty dict
-        return _state_cache if _state_cache else {}
-    except Exception:
-        # Other error - return cached state if available
-        return _state_cache if _state_cache else {}
+        return {"ok": False, "type": cmd_dict.get("type"), "error": f"drx_main unreachable: {e}"}
+    except ValueError:
+        return {"ok": False, "type": cmd_dict.get("type"), "error": "invalid response from drx_main"}
 
-def write_webcmd(cmd_dict):
-    with open(WEBCMD_FILE, 'w') as f:
-        json.dump(cmd_dict, f)
+import re
 
-def wait_cmd_processed(timeout=3.0):
-    for _ in range(int(timeout * 10)):
-        if not os.path.exists(WEBCMD_FILE):
-            return
-        time.sleep(0.1)
+# Reads only what was appended since the last call instead of the whole log
+web_log_tail = LogTail(LOG_FILE)
 
-import re
+def strip_log_millis(line):
+    # More precise regex that only targets timestamps (e.g., 2023-07-11 13:45:23.456)
+    # This will look for dates/times and only remove milliseconds from them
+    return re.sub(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\.\d{1,6}', r'\1', line.rstrip())
 
 def load_recent_web_log(n=10):
     try:
         if not os.path.exists(LOG_FILE):
             return ["Log file not found."]
-        with open(LOG_FILE, 'r') as f:
-            lines = f.readlines()
-            lines = [line.rstrip() for line in lines if line.strip()]
+        lines = web_log_tail.recent(n)
         if not lines:
             return ["Log file is empty."]
-        
-        # More precise regex that only targets timestamps (e.g., 2023-07-11 13:45:23.456)
-        # This will look for dates/times and only remove milliseconds from them
-        return [re.sub(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\.\d{1,6}', r'\1', line) for line in lines[-n:]]
+        return [strip_log_millis(line) for line in lines]
     except Exception as e:
         return [f"Error loading log: {e}"]
 
@@ -2459,7 +2532,7 @@ def login():
             return redirect(url_for('dashboard'))
         else:
             error = "Invalid username or password."
-    return render_template_string(LOGIN_TEMPLATE, error=error)
+    return render_registered("login", error=error)
 
 @app.route("/logout", methods=["POST"])
 def logout():
@@ -2476,7 +2549,7 @@ def dashboard():
     
     state = read_state()
     wx_alert_active = state.get("wx_alert_active", False)
-    state_blocks_html = render_template_string(STATE_BLOCKS_TEMPLATE, state=state)
+    state_blocks_html = render_state_blocks()
     wx_config = read_wx_config()
     same_alerts_polling_time = wx_config.get('SAME Alerts', 'polling_time', fallback='300')
     same_alerts_zip_code = wx_config.get('SAME Alerts', 'zip_code', fallback='06492')
@@ -2490,9 +2563,11 @@ def dashboard():
     nws_url_fallback = wx_config.get('weather', 'nws_url_fallback', fallback='')
 
     # --- Weather System Status ---
-    weather_status, weather_class, weather_color = get_weather_system_status(wx_alert_active)
+    wx_fetch_status = state.get("wx_fetch_status") or load_wx_fetch_status()
+    weather_status, weather_class, weather_color = get_weather_system_status(wx_alert_active, wx_fetch_status)
+    weather_detail = describe_wx_fetch_status(wx_fetch_status)
     
-    return render_template_string(DASHBOARD_TEMPLATE,
+    return render_registered("dashboard",
         currently_playing=state.get("currently_playing"),
         last_played=state.get("last_played"),
         playback_status=state.get("playback_status"),
@@ -2511,6 +2586,7 @@ def dashboard():
         weather_status=weather_status,
         weather_class=weather_class,
         weather_color=weather_color,
+        weather_detail=weather_detail,
         version=state.get("version", "Unknown"),
         web_version="2.01.00",
         same_alerts_polling_time=same_alerts_polling_time,
@@ -2557,7 +2633,6 @@ def get_drx_uptime():
 @require_login
 def stop_playback():
     write_webcmd({"type": "stop"})
-    wait_cmd_processed()
     return redirect(url_for('dashboard'))
 
 @app.route("/playtrack", methods=['POST'])
@@ -2578,10 +2653,9 @@ def play_track():
             return jsonify({"success": True, "local_play": True, "filename": track})
         return redirect(url_for('play_local', filename=track))
     else:
-        write_webcmd({"type": "play", "input": track})
-        wait_cmd_processed()
+        result = write_webcmd({"type": "play", "input": track})
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return jsonify({"success": True})
+            return jsonify({"success": result.get("ok", False), "id": result.get("id"), "error": result.get("error")})
         return redirect(url_for('dashboard'))
 
 @app.route('/localplay/<filename>')
@@ -2609,7 +2683,6 @@ def restart_script_web():
 @require_login
 def reboot_system_web():
     write_webcmd({"type": "reboot"})
-    wait_cmd_processed()
     return redirect(url_for('dashboard'))
 
 @app.route("/reloadconfig", methods=['POST'])
@@ -2617,7 +2690,6 @@ def reboot_system_web():
 def reload_config_web():
     # Send command to DRX script
     write_webcmd({"type": "reload_config"})
-    wait_cmd_processed()
     
     # Also reload config in the web app
     global config
@@ -2636,22 +2708,27 @@ def edit_config():
     if content:
         save_config_file(content)
         write_webcmd({"type": "reload_config"})
-        wait_cmd_processed()
     return redirect(url_for('dashboard'))
 
+def render_log_entries():
+    return render_fragment("log_entries", file_signature(LOG_FILE),
+                           lambda: {"web_log": load_recent_web_log(50)[::-1]})
+
 @app.route("/api/log_entries")
 @require_login
 def api_log_entries():
-    entries = load_recent_web_log(50)[::-1]
-    return render_template_string('''
-        {% for entry in web_log %}
-            <div>{{ entry }}</div>
-        {% endfor %}
-    ''', web_log=entries)
+    return fragment_response("log_entries", file_signature(LOG_FILE), render_log_entries)
 
-@app.route("/api/serial_commands")
-@require_login
-def api_serial_commands():
+def state_fragment_key(state):
+    """
+    Fragment key for drx_main's state: its start time and state_version, since
+    the version counts from 0 again when drx_main restarts. None without a version.
+    """
+    if state.get("state_version") is None:
+        return None
+    return f"{state.get('drx_start_time')}-{state['state_version']}"
+
+def render_serial_commands():
     state = read_state()
     serial_history = state.get("serial_history", [])
     def fmt(entry):
@@ -2659,35 +2736,50 @@ def api_serial_commands():
         cmd = entry.get("cmd", "")
         src = entry.get("src", "Serial")
         return f"{ts}: {cmd} ({src})"
-    formatted = [fmt(entry) for entry in serial_history[:5]]
-    return render_template_string('''
-        {% for line in formatted %}
-            <div>{{ line }}</div>
-        {% endfor %}
-    ''', formatted=formatted)
+    return render_fragment("serial_commands", state_fragment_key(state),
+                           lambda: {"formatted": [fmt(entry) for entry in serial_history[:5]]})
 
-@app.route("/api/state_blocks")
+@app.route("/api/serial_commands")
 @require_login
-def api_state_blocks():
+def api_serial_commands():
+    return fragment_response("serial_commands", state_fragment_key(read_state()), render_serial_commands)
+
+STATE_BLOCK_FIELDS = ("rotation_bases_lines", "random_bases_lines", "sudo_bases_lines", "alt_bases_lines")
+
+def state_blocks_key(state):
+    """
+    The base lines carry live Remaining= countdowns that are not versioned in
+    drx_main, so the key is their checksum; it only moves while a countdown runs.
+    """
+    lines = "\n".join(line for field in STATE_BLOCK_FIELDS for line in state.get(field, []))
+    return f"{state.get('drx_start_time')}-{zlib.crc32(lines.encode('utf-8')):08x}"
+
+def render_state_blocks():
     state = read_state()
-    return render_template_string(STATE_BLOCKS_TEMPLATE, state=state)
+    return render_fragment("state_blocks", state_blocks_key(state), lambda: {"state": state})
 
-@app.route("/api/drx_uptime")
+@app.route("/api/state_blocks")
 @require_login
-def api_drx_uptime():
+def api_state_blocks():
+    return fragment_response("state_blocks", state_blocks_key(read_state()), render_state_blocks)
+
+def build_uptime_data():
     state = read_state()
     updated_at = state.get('updated_at')
     not_running = False
     if not updated_at or time.time() - float(updated_at) > 2.5:
         not_running = True
-    return jsonify({
+    return {
         'drx_uptime': get_drx_uptime(),
         'not_running': not_running,
-    })
+    }
 
-@app.route("/api/message_timer")
+@app.route("/api/drx_uptime")
 @require_login
-def api_message_timer():
+def api_drx_uptime():
+    return jsonify(build_uptime_data())
+
+def build_message_timer_data():
     state = read_state()
     last_played = state.get("message_timer_last_played", 0)
     timer_value = state.get("message_timer_value", 0)
@@ -2696,7 +2788,12 @@ def api_message_timer():
         seconds_left = int(max(0, timer_value * 60 - (now - last_played)))
     else:
         seconds_left = 0
-    return jsonify({"seconds_left": seconds_left})
+    return {"seconds_left": seconds_left}
+
+@app.route("/api/message_timer")
+@require_login
+def api_message_timer():
+    return jsonify(build_message_timer_data())
 
 @app.route("/editconfig_structured", methods=['POST'])
 @require_login
@@ -2797,14 +2894,11 @@ def edit_config_structured():
     
     # Use the simpler approach for telling DRX to reload
     write_webcmd({"type": "reload_config"})
-    wait_cmd_processed()
     
     flash('Configuration updated successfully!')
     return redirect(url_for('dashboard'))
 
-@app.route("/api/status")
-@require_login
-def status_api():
+def build_status_data():
     # Update TOT state (check for timeout)
     update_tot_state()
     
@@ -2817,17 +2911,16 @@ def status_api():
         connection_lost = True
         handle_top_command_on_disconnect()
     
-    # Check recent serial commands for TOT/TOP
+    # Check serial commands that arrived since the last look for TOT/TOP
     if not connection_lost:
-        serial_history = state.get("serial_history", [])
-        for entry in serial_history[-10:]:
-            cmd = entry.get("cmd", "").upper().strip()
-            if process_serial_command_for_tot(cmd):
-                break
+        scan_journal_for_tot(state)
 
     # --- Weather System Unified Status (ALERT overrides all) ---
     wx_alert_active = state.get("wx_alert_active", False)
-    weather_status, weather_class, weather_color = get_weather_system_status(wx_alert_active)
+    # drx_wx pushes its fetch report to drx_main; the file is for when drx_main is not getting pushes
+    wx_fetch_status = state.get("wx_fetch_status") or load_wx_fetch_status()
+    weather_status, weather_class, weather_color = get_weather_system_status(wx_alert_active, wx_fetch_status)
+    weather_detail = describe_wx_fetch_status(wx_fetch_status)
     
     # --- C-Tone Countdown Logic (from in-memory state) ---
     ctone_override_expire = state.get("ctone_override_expire")
@@ -2856,10 +2949,17 @@ def status_api():
         "weather_status": weather_status,
         "weather_class": weather_class,
         "weather_color": weather_color,
+        "weather_detail": weather_detail,
+        "wx_fetch_status": wx_fetch_status,
         # --- C-Tone countdown field ---
         "ctone_time_remaining": ctone_time_remaining,
     }
-    return jsonify(data)
+    return data
+
+@app.route("/api/status")
+@require_login
+def status_api():
+    return jsonify(build_status_data())
 
 # Add this new function to simulate TOP command processing on disconnect
 def handle_top_command_on_disconnect():
@@ -2888,19 +2988,15 @@ def debug_ping():
 @require_login
 def debug_webcmd_test():
     try:
-        # Create test command
+        # Send a test command and time the round trip
         test_cmd = {"type": "test_command", "timestamp": time.time()}
-        write_webcmd(test_cmd)
-        
-        # Wait a bit
-        time.sleep(0.5)
-        
-        # Check if file still exists
-        file_exists = os.path.exists(WEBCMD_FILE)
+        start = time.time()
+        result = write_webcmd(test_cmd)
         
         return jsonify({
             "test_sent": True,
-            "file_still_exists": file_exists,
+            "result": result,
+            "round_trip_ms": round((time.time() - start) * 1000, 1),
             "current_time": time.strftime("%Y-%m-%d %H:%M:%S")
         })
     except Exception as e:
@@ -2932,35 +3028,221 @@ def debug_config_values():
 def reset_minutes():
     # Send a reset command to DRX
     write_webcmd({"type": "reset_minutes"})
-    wait_cmd_processed()
     return redirect(url_for('dashboard'))
 
-@app.route("/api/cos_minutes")
-@require_login
-def api_cos_minutes():
+def build_cos_minutes_data():
     state = read_state()
-    return jsonify({
+    return {
         "cos_today_minutes": state.get("cos_today_minutes", 0),
         "cos_today_date": state.get("cos_today_date", "")
-    })
+    }
+
+@app.route("/api/cos_minutes")
+@require_login
+def api_cos_minutes():
+    return jsonify(build_cos_minutes_data())
+
+def load_dtmf_log_lines(n=100):
+    try:
+        # Newest entries are at the top, so only the head of the file is read
+        return [line.rstrip() for line in head_lines(DTMF_LOG_FILE, n)[0]]
+    except Exception as e:
+        return [f"Error loading DTMF log: {e}"]
+
+def render_dtmf_log():
+    if not os.path.exists(DTMF_LOG_FILE):
+        return "<div>No DTMF log entries found.</div>"
+    return render_fragment("dtmf_log", file_signature(DTMF_LOG_FILE),
+                           lambda: {"dtmf_log": load_dtmf_log_lines()})
 
 @app.route("/api/dtmf_log")
 def api_dtmf_log():
-    n = 100  # Number of lines
+    return fragment_response("dtmf_log", file_signature(DTMF_LOG_FILE), render_dtmf_log)
+
+def page_limit(default=50):
+    return max(1, min(request.args.get("limit", default, type=int), 500))
+
+def offset_arg(name):
+    """A byte-offset cursor from the query string, or None if it is not given; ValueError if it is not one."""
+    value = request.args.get(name)
+    if value is None or value == "":
+        return None
+    if not value.isdigit():
+        raise ValueError(f"{name} must be a byte offset from a previous page's next")
+    return int(value)
+
+@app.route("/api/log_entries/page")
+@require_login
+def api_log_entries_page():
+    """
+    Older log lines for scrolling back, newest first.
+    Pass the returned `next` as ?before= to get the page before it; null means the top of the log.
+    """
+    try:
+        before = offset_arg("before")
+    except ValueError as e:
+        return jsonify({"lines": [], "next": None, "error": str(e)}), 400
     try:
-        if not os.path.exists(DTMF_LOG_FILE):
-            return "<div>No DTMF log entries found.</div>"
-        with open(DTMF_LOG_FILE, "r") as f:
-            lines = [line.rstrip() for line in f.readlines() if line.strip()]
-        lines = lines[:n]
+        lines, cursor = web_log_tail.page(before, page_limit())
+    except OSError as e:
+        return jsonify({"lines": [], "next": None, "error": str(e)})
+    return jsonify({"lines": [strip_log_millis(line) for line in reversed(lines)], "next": cursor})
+
+@app.route("/api/dtmf_log/page")
+@require_login
+def api_dtmf_log_page():
+    """
+    Older DTMF log lines for scrolling back, newest first.
+    Pass the returned `next` as ?after= to get the following page; null means the end of the log.
+    """
+    try:
+        after = offset_arg("after")
+    except ValueError as e:
+        return jsonify({"lines": [], "next": None, "error": str(e)}), 400
+    try:
+        lines, cursor = head_lines(DTMF_LOG_FILE, page_limit(100), after)
+    except OSError as e:
+        return jsonify({"lines": [], "next": None, "error": str(e)})
+    return jsonify({"lines": [line.rstrip() for line in lines], "next": cursor})
+
+def render_traces():
+    try:
+        response = requests.get(DRX_MAIN_TRACES_URL, params={"limit": 10}, timeout=HTTP_TIMEOUT)
+        slowest = response.json().get("slowest", []) if response.status_code == 200 else []
+    except Exception:
+        slowest = []
+    return render_fragment("traces", None, lambda: {"slowest": slowest})
+
+@app.route("/api/traces")
+@require_login
+def api_traces():
+    return render_traces()
+
+# --- Event History ---
+# Plays, CT overrides, WX events, web commands and DTMF digits from the current
+# and rotated logs, indexed in SQLite. A background thread indexes whatever
+# was written every HISTORY_BACKGROUND_INTERVAL, so nothing depends on someone
+# querying before a log is rotated, and each query catches up on the last few
+# seconds first. Either costs one stat() per log when idle. drx_main moves
+# last month's DTMF log to DTMF_LOG_ARCHIVE_DIR, so that is indexed as well.
+HISTORY_DB = os.path.join(script_dir, "logs", "history.db")
+DTMF_LOG_ARCHIVE_DIR = script_dir  # Where drx_main's DTMF_LOG_ARCHIVE_FMT puts dtmf-YYYY-MM.log
+HISTORY_INGEST_INTERVAL = 1.0
+HISTORY_BACKGROUND_INTERVAL = 60
+history_store = None
+history_ingested_at = 0
+history_lock = threading.Lock()
+history_thread = None
+
+def ingest_history():
+    global history_store, history_ingested_at
+    with history_lock:
+        if history_store is None:
+            history_store = HistoryStore(HISTORY_DB, os.path.dirname(DTMF_LOG_FILE),
+                                         archive_dirs=[DTMF_LOG_ARCHIVE_DIR])
+        history_store.ingest()
+        history_ingested_at = time.time()
+    return history_store
+
+def history_ingest_loop():
+    while True:
+        try:
+            ingest_history()
+        except Exception as e:
+            app.logger.warning(f"History ingest failed: {e}")
+        time.sleep(HISTORY_BACKGROUND_INTERVAL)
+
+def start_history_ingest():
+    global history_thread
+    with history_lock:
+        if history_thread is None:
+            history_thread = threading.Thread(target=history_ingest_loop, daemon=True)
+            history_thread.start()
+
+def get_history_store():
+    start_history_ingest()
+    if history_store is None or time.time() - history_ingested_at >= HISTORY_INGEST_INTERVAL:
+        return ingest_history()
+    return history_store
+
+@app.route("/api/history")
+@require_login
+def api_history():
+    """
+    Search indexed log history, newest first.
+    Filters: from, to (timestamps or prefixes such as 2025-07-26), type (comma list of
+    play, ct_override, wx_alert, wx_report, command, dtmf, other), track, port, digits
+    and q (full-text words, trailing * for a prefix). Pass the returned `next` as ?cursor=.
+    """
+    kinds = [k for k in request.args.get("type", "").split(",") if k]
+    unknown = [k for k in kinds if k not in EVENT_KINDS]
+    if unknown:
+        return jsonify({"error": f"unknown type: {', '.join(unknown)}", "types": list(EVENT_KINDS)}), 400
+    start = time.time()
+    try:
+        events, cursor = get_history_store().query(
+            start=request.args.get("from"),
+            end=request.args.get("to"),
+            kinds=kinds,
+            track=request.args.get("track"),
+            port=request.args.get("port", type=int),
+            digits=request.args.get("digits"),
+            text=request.args.get("q"),
+            cursor=request.args.get("cursor"),
+            limit=page_limit(),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        lines = [f"Error loading DTMF log: {e}"]
-    return render_template_string('''
-        {% for entry in dtmf_log %}
-            <div>{{ entry }}</div>
-        {% endfor %}
-    ''', dtmf_log=lines)
+        return jsonify({"error": str(e)}), 500
+    return jsonify({
+        "events": events,
+        "next": cursor,
+        "elapsed_ms": round((time.time() - start) * 1000, 2),
+    })
+
+# --- Alert Archive ---
+# Every weather alert drx_main has seen, with when it was first seen, announced
+# and expired. drx_main writes logs/alerts.db; this side only reads it.
+ALERT_ARCHIVE_DB = os.path.join(script_dir, "logs", "alerts.db")
+alert_archive = None
 
+def get_alert_archive():
+    global alert_archive
+    if alert_archive is None and os.path.exists(ALERT_ARCHIVE_DB):
+        alert_archive = AlertArchive(ALERT_ARCHIVE_DB, readonly=True)
+    return alert_archive
+
+@app.route("/api/alerts/history")
+@require_login
+def api_alert_history():
+    """
+    Archived weather alerts active at any time between from and to (timestamps or
+    prefixes such as 2025-07-22), newest first. Filters: code (SAME code), zone
+    and announced (1 or 0). Pass the returned `next` as ?cursor=.
+    """
+    announced = request.args.get("announced")
+    start = time.time()
+    try:
+        archive = get_alert_archive()
+        if archive is None:
+            return jsonify({"alerts": [], "next": None, "elapsed_ms": 0})
+        alerts, cursor = archive.query(
+            start=request.args.get("from"),
+            end=request.args.get("to"),
+            code=request.args.get("code"),
+            zone=request.args.get("zone"),
+            announced=None if announced in (None, "") else announced.lower() in ("1", "true", "yes"),
+            cursor=request.args.get("cursor"),
+            limit=page_limit(),
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({
+        "alerts": alerts,
+        "next": cursor,
+        "elapsed_ms": round((time.time() - start) * 1000, 2),
+    })
 
 @app.route("/download_dtmf_log")
 @require_login
@@ -2974,7 +3256,36 @@ def download_dtmf_log():
         as_attachment=True
     )
 
-def get_weather_system_status(wx_alert_active=False):
+def load_wx_fetch_status():
+    """wx/wx_fetch_status.json as written by drx_wx after each weather fetch, or None."""
+    path = os.path.join(os.path.dirname(__file__), "wx", "wx_fetch_status.json")
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def describe_wx_fetch_status(fetch_status):
+    """One line per weather source for the badge tooltip, e.g. 'nws: open, retry in 12 min (timed out)'."""
+    if not fetch_status:
+        return ""
+    now = time.time()
+    lines = []
+    for name, source in sorted(fetch_status.get("sources", {}).items()):
+        if source.get("state") == "closed" and not source.get("failures"):
+            line = f"{name}: ok"
+        else:
+            line = f"{name}: {source.get('state')}, {source.get('failures')} failed"
+            if source.get("state") == "open" and source.get("next_attempt"):
+                line += f", retry in {max(0, int((source['next_attempt'] - now) // 60))} min"
+            if source.get("last_error"):
+                line += f" ({source['last_error'][:80]})"
+        if source.get("value_age") is not None and source.get("value_age") > 60:
+            line += f", data {int(source['value_age'] // 60)} min old"
+        lines.append(line)
+    return "\n".join(lines)
+
+def get_weather_system_status(wx_alert_active=False, fetch_status=None):
     wx_dir = os.path.join(os.path.dirname(__file__), "wx")
     drx_wx = os.path.join(wx_dir, "drx_wx.py")
     wx_data = os.path.join(wx_dir, "wx_data")
@@ -2982,6 +3293,19 @@ def get_weather_system_status(wx_alert_active=False):
         return ("Alert", "weather-alert", "#ff2222")
     if not os.path.exists(drx_wx):
         return ("Not Installed", "weather-warn", "#888")
+    if fetch_status is None:
+        fetch_status = load_wx_fetch_status()
+    if fetch_status:
+        # drx_wx reports every fetch outcome; it has stopped if that report is overdue
+        if time.time() - fetch_status.get("updated", 0) > max(7200, 3 * fetch_status.get("polling_time", 0)):
+            return ("Inactive", "weather-inactive", "#d32f2f")
+        sources = list(fetch_status.get("sources", {}).values())
+        if sources and all(s.get("value_age") is None for s in sources):
+            return ("No Data", "weather-inactive", "#d32f2f")
+        if any(s.get("failures") for s in sources):
+            return ("Degraded", "weather-degraded", "#f57c00")
+        return ("Active", "weather-normal", "#388e3c")
+    # Older drx_wx without a fetch status file: go by how recently wx_data was written
     if not os.path.exists(wx_data):
         return ("Inactive", "weather-inactive", "#d32f2f")
     mtime = os.path.getmtime(wx_data)
@@ -3089,7 +3413,6 @@ def save_base_configurator_to_ini(rows):
         config.write(f)
     # Reload
     write_webcmd({"type": "reload_config"})
-    wait_cmd_processed()
 
 def update_tot_state():
     """Check if TOT should be reset due to timeout"""
@@ -3103,6 +3426,21 @@ def update_tot_state():
 
 import re
 
+tot_journal_seq = None
+
+def scan_journal_for_tot(state):
+    """Feed journal entries newer than the last scan, oldest first, to the TOT tracker."""
+    global tot_journal_seq
+    seq = state.get("journal_seq")
+    if seq is None or seq == tot_journal_seq:
+        return
+    # On the first look, or after drx_main restarted, the whole recent history is new
+    last = tot_journal_seq if tot_journal_seq is not None and seq > tot_journal_seq else 0
+    fresh = [e for e in state.get("serial_history", []) if e.get("seq", 0) > last]
+    for entry in reversed(fresh):
+        process_serial_command_for_tot(entry.get("cmd", ""))
+    tot_journal_seq = seq
+
 def process_serial_command_for_tot(command):
     """Process serial commands to track TOT/TOP state"""
     global TOT_STATE
@@ -3150,6 +3488,113 @@ def api_save_base_configurator():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+# --- Dashboard Push (Server-Sent Events) ---
+# One publisher thread builds every dashboard topic on its own cadence and fans
+# the changes out to all connected browsers, so load no longer grows per viewer.
+PUSH_TICK = 0.1
+PUSH_HEARTBEAT = 15
+PUSH_QUEUE_SIZE = 100
+PUSH_TOPICS = (
+    # (topic, interval in seconds, builder)
+    ("status", 0.1, build_status_data),
+    ("message_timer", 1.0, build_message_timer_data),
+    ("cos_minutes", 1.0, build_cos_minutes_data),
+    ("uptime", 1.0, build_uptime_data),
+    ("serial", 1.0, render_serial_commands),
+    ("logs", 1.0, render_log_entries),
+    ("state_blocks", 1.0, render_state_blocks),
+    ("dtmf", 2.0, render_dtmf_log),
+    ("traces", 5.0, render_traces),
+)
+
+push_lock = threading.Lock()
+push_ready = threading.Condition(push_lock)
+push_subscribers = []
+push_snapshot = {}
+push_thread = None
+
+def push_changes(old, new):
+    """Return what a browser holding `old` needs to reach `new`, or None if nothing changed."""
+    if isinstance(new, dict) and isinstance(old, dict):
+        changed = {k: v for k, v in new.items() if old.get(k) != v or k not in old}
+        return changed or None
+    return None if new == old else new
+
+def format_push_event(topic, payload):
+    return f"event: {topic}\ndata: {json.dumps(payload)}\n\n"
+
+def dashboard_publisher_loop():
+    next_due = {topic: 0 for topic, _, _ in PUSH_TOPICS}
+    while True:
+        with push_ready:
+            while not push_subscribers:
+                push_ready.wait()
+        now = time.time()
+        for topic, interval, builder in PUSH_TOPICS:
+            if now < next_due[topic]:
+                continue
+            next_due[topic] = now + interval
+            try:
+                with app.app_context():
+                    value = builder()
+            except Exception as e:
+                app.logger.warning(f"Dashboard push: {topic} failed: {e}")
+                continue
+            with push_lock:
+                changes = push_changes(push_snapshot.get(topic), value)
+                if changes is None:
+                    continue
+                push_snapshot[topic] = value
+                message = format_push_event(topic, changes)
+                for sub in list(push_subscribers):
+                    try:
+                        sub["queue"].put_nowait(message)
+                    except queue.Full:
+                        # Browser is not keeping up; end its stream so it reconnects and resyncs
+                        sub["dropped"] = True
+                        push_subscribers.remove(sub)
+        time.sleep(PUSH_TICK)
+
+def subscribe_push():
+    """Register a browser; it starts with the full current value of every topic."""
+    global push_thread
+    sub = {"queue": queue.Queue(maxsize=PUSH_QUEUE_SIZE), "dropped": False}
+    with push_ready:
+        for topic, value in push_snapshot.items():
+            sub["queue"].put_nowait(format_push_event(topic, value))
+        push_subscribers.append(sub)
+        if push_thread is None:
+            push_thread = threading.Thread(target=dashboard_publisher_loop, daemon=True)
+            push_thread.start()
+        push_ready.notify()
+    return sub
+
+def unsubscribe_push(sub):
+    with push_lock:
+        if sub in push_subscribers:
+            push_subscribers.remove(sub)
+
+@app.route("/api/events")
+@require_login
+def api_events():
+    sub = subscribe_push()
+    def stream():
+        last_sent = time.time()
+        try:
+            while not sub["dropped"]:
+                try:
+                    message = sub["queue"].get(timeout=1.0)
+                except queue.Empty:
+                    if time.time() - last_sent < PUSH_HEARTBEAT:
+                        continue
+                    message = ": keepalive\n\n"
+                yield message
+                last_sent = time.time()
+        finally:
+            unsubscribe_push(sub)
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route("/debug/state_source")
 @require_login
 def debug_state_source():
@@ -3186,18 +3631,19 @@ def debug_state_source():
             })
         
         return jsonify({
-            "state_source": "HTTP API from drx_main.py",
+            "state_source": "Long-poll mirror of drx_main.py HTTP API",
             "api_url": DRX_MAIN_API_URL,
             "api_status": api_status,
             "old_state_file": file_status,
-            "cache_info": {
-                "cache_ttl": _state_cache_ttl,
-                "cache_size": len(str(_state_cache)) if _state_cache else 0,
-                "cache_age": time.time() - _state_cache_time
+            "mirror_info": {
+                "state_version": state_mirror_version,
+                "mirror_size": len(str(state_mirror)) if state_mirror else 0,
+                "mirror_age": time.time() - state_mirror_synced_at
             }
         })
     except Exception as e:
         return jsonify({"error": str(e)})
 
 if __name__ == "__main__":
+    start_history_ingest()
     app.run(host="0.0.0.0", port=WEB_PORT, debug=False, use_reloader=False)
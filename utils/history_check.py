@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+DRX history rotation check
+
+Builds a throwaway DRX tree, writes drx.log and dtmf.log the way drx_main
+does, indexes them, then writes more entries and rotates both logs before
+indexing again: drx.log to logs/drx.log-YYYY-MM-DD as logrotate does, and
+dtmf.log to dtmf-YYYY-MM.log in the DRX directory, as drx_main's
+archive_dtmf_log_if_new_month does. Every entry written, before or after
+rotation, must come back from HistoryStore.query, including the same
+line written twice in one second, before and across an ingest.
+
+    python3 utils/history_check.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from drx_history import HistoryStore
+
+
+def prepend(path, lines):
+    """Newest-first write, as drx_main's prepend_dtmf_log does."""
+    prev = ""
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            prev = f.read()
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + ("\n" if prev else "") + prev)
+
+
+def append(path, lines):
+    with open(path, "a") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def main():
+    drx_dir = tempfile.mkdtemp(prefix="drx_history_check_")
+    log_dir = os.path.join(drx_dir, "logs")
+    os.makedirs(log_dir)
+    drx_log = os.path.join(log_dir, "drx.log")
+    dtmf_log = os.path.join(log_dir, "dtmf.log")
+    failed = False
+    try:
+        store = HistoryStore(os.path.join(log_dir, "history.db"), log_dir, archive_dirs=[drx_dir])
+
+        append(drx_log, ["2025-06-30 23:50:00: Play: 1001"])
+        prepend(dtmf_log, ["2025-06-30 23:50:05 Port 1: 1001"])
+        store.ingest()
+
+        # The same line again in the same second, on both sides of an ingest
+        append(drx_log, ["2025-06-30 23:50:00: Play: 1001"])
+        prepend(dtmf_log, ["2025-06-30 23:50:05 Port 1: 1001"])
+        store.ingest()
+        prepend(dtmf_log, ["2025-06-30 23:50:05 Port 1: 1001", "2025-06-30 23:50:05 Port 1: 1001"])
+        store.ingest()
+
+        # Written after the last ingest, then rotated away before the next one
+        append(drx_log, ["2025-06-30 23:58:00: Play: 1002"])
+        prepend(dtmf_log, ["2025-06-30 23:58:05 Port 1: 1002"])
+        prepend(dtmf_log, ["2025-06-30 23:59:30 Port 2: 1003"])
+        os.rename(drx_log, drx_log + "-2025-06-30")
+        os.rename(dtmf_log, os.path.join(drx_dir, "dtmf-2025-06.log"))
+
+        append(drx_log, ["2025-07-01 00:00:10: Play: 1004"])
+        prepend(dtmf_log, ["2025-07-01 00:00:15 Port 1: 1004"])
+        store.ingest()
+
+        expected = {
+            "play": ["1001", "1001", "1002", "1004"],
+            "dtmf": ["1001", "1001", "1001", "1001", "1002", "1003", "1004"],
+        }
+        for kind, values in expected.items():
+            events, _ = store.query(kinds=[kind], limit=100)
+            got = sorted(e["track"] if kind == "play" else e["digits"] for e in events)
+            ok = got == values
+            failed |= not ok
+            print(f"{kind:<6} expected {values} got {got}  {'ok' if ok else 'MISSING'}")
+
+        events, _ = store.query(start="2025-06-30 23:55", end="2025-06-30", kinds=["dtmf"])
+        ok = [e["digits"] for e in events] == ["1003", "1002"]
+        failed |= not ok
+        print(f"range  newest first across the archive  {'ok' if ok else 'WRONG: ' + str(events)}")
+    finally:
+        shutil.rmtree(drx_dir, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+DRX obhistory parse benchmark
+
+Compares the old way drx_wx read an NWS obhistory page (the whole page into a
+BeautifulSoup tree, then the header row and first data row out of it) with
+the streaming ObhistoryTableParser, which stops once the first data row has
+been read. Each page is parsed both ways; the header and data cells must come
+out identical, and the time per parse is reported for each.
+
+Pages are saved copies of forecast.weather.gov/data/obhistory/XXXX.html, e.g.
+
+    curl -o kmmk.html https://forecast.weather.gov/data/obhistory/KMMK.html
+    python3 utils/obhistory_bench.py kmmk.html kbdl.html
+
+With no pages given, a synthetic page laid out like obhistory (three header
+rows, 72 hourly observations) is generated and used instead.
+
+The streaming parser is fed in 8 KB chunks, as it is from the HTTP response.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import importlib.util
+
+from bs4 import BeautifulSoup
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_SIZE = 8192
+
+
+def load_drx_wx():
+    spec = importlib.util.spec_from_file_location("drx_wx", os.path.join(REPO_DIR, "wx", "drx_wx.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def soup_first_row(html):
+    """The full-tree parse drx_wx used before streaming, returning (header_cells, data_cells)."""
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table")
+    if not table:
+        return None, None
+    rows = table.find_all("tr")
+    if not rows:
+        return None, None
+    header_cells = [cell.get_text(strip=True) for cell in rows[0].find_all(["th", "td"])]
+    for row in rows[1:]:
+        data_cells = [cell.get_text(strip=True) for cell in row.find_all("td")]
+        if data_cells and len(data_cells) >= 4:
+            return header_cells, data_cells
+    return header_cells, None
+
+
+def synthetic_page(rows=72, seed=1):
+    """An obhistory-shaped page: page furniture, the three-row header, then `rows` observations."""
+    rng = random.Random(seed)
+    out = [
+        '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN">',
+        "<html><head><title>National Weather Service: Observed Weather for past 3 Days: Meriden, Meriden Markham Municipal Airport</title>",
+        '<meta http-equiv="Content-Type" content="text/html; charset=utf-8">',
+        '<style type="text/css">td { font-size: 10pt; } th { font-size: 10pt; }</style></head>',
+        '<body bgcolor="#FFFFFF"><center>',
+        "<h2>Meriden, Meriden Markham Municipal Airport</h2>",
+        '<p>Enter Your "City, ST" or zip code <form action="/zipcity.php" method="get"><input name="inputstring"></form></p>',
+        '<!-- Obs table -->',
+        '<table cellspacing="3" cellpadding="2" border="0" width="670">',
+        '<tr align="center" bgcolor="#b0c4de"><th rowspan="3" width="32">Date</th><th rowspan="3" width="40">Time<br>(edt)</th>'
+        '<th rowspan="3" width="80">Wind<br>(mph)</th><th rowspan="3" width="40">Vis.<br>(mi.)</th>'
+        '<th rowspan="3" width="65">Weather</th><th rowspan="3" width="65">Sky Cond.</th><th colspan="4">Temperature (&ordm;F)</th>'
+        '<th rowspan="3" width="65">Relative<br>Humidity</th><th rowspan="3" width="48">Wind<br>Chill<br>(&deg;F)</th>'
+        '<th rowspan="3" width="48">Heat<br>Index<br>(&deg;F)</th><th colspan="2">Pressure</th><th colspan="3">Precipitation (in.)</th></tr>',
+        '<tr align="center" bgcolor="#b0c4de"><th rowspan="2" width="32">Air</th><th rowspan="2" width="32">Dwpt</th>'
+        '<th colspan="2">6 hour</th><th rowspan="2" width="48">altimeter<br>(in)</th><th rowspan="2" width="48">sea level<br>(mb)</th>'
+        '<th rowspan="2" width="24">1 hr</th><th rowspan="2" width="24">3 hr</th><th rowspan="2" width="24">6 hr</th></tr>',
+        '<tr align="center" bgcolor="#b0c4de"><th width="32">Max.</th><th width="32">Min.</th></tr>',
+    ]
+    winds = ["Calm", "N 5", "NW 8", "W 10 G 21", "SW 6", "S 12", "SE 3", "Vrbl 3"]
+    weather = ["Fair", "A Few Clouds", "Partly Cloudy", "Mostly Cloudy", "Overcast", "Light Rain", "Rain Fog/Mist"]
+    sky = ["CLR", "FEW050", "SCT080", "BKN060 OVC250", "OVC012", "FEW008 BKN015 OVC035"]
+    for index in range(rows):
+        hour = 23 - index % 24
+        temp = rng.randint(55, 85)
+        out.append(
+            f'<tr align="center" valign="top" bgcolor="{"#eeeeee" if index % 2 else "#f5f5f5"}">'
+            f"<td>{26 - index // 24}</td><td>{hour:02d}:53</td><td>{rng.choice(winds)}</td><td>{rng.choice(['10.00', '7.00', '2.50'])}</td>"
+            f'<td align="left">{rng.choice(weather)}</td><td>{rng.choice(sky)}</td><td>{temp}</td><td>{temp - rng.randint(2, 20)}</td>'
+            f"<td>{temp + 3 if hour % 6 == 1 else ''}</td><td>{temp - 9 if hour % 6 == 1 else ''}</td><td>{rng.randint(30, 100)}%</td>"
+            f"<td>NA</td><td>{'NA' if temp < 80 else temp + 2}</td><td>{rng.uniform(29.7, 30.3):.2f}</td><td>{rng.uniform(1006, 1027):.1f}</td>"
+            f"<td>{'0.02' if index % 7 == 0 else ''}</td><td></td><td></td></tr>"
+        )
+    out += [
+        "</table>",
+        '<table width="670"><tr><td><a href="https://www.weather.gov/">National Weather Service</a>'
+        ' &nbsp; <a href="https://www.weather.gov/disclaimer">Disclaimer</a></td></tr></table>',
+        "</center></body></html>",
+    ]
+    return "\n".join(out)
+
+
+def chunks(text, size=CHUNK_SIZE):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming obhistory parser against a full BeautifulSoup parse.")
+    parser.add_argument("pages", nargs="*", help="saved obhistory HTML pages (default: a synthetic page)")
+    parser.add_argument("--repeat", type=int, default=50, help="parses per page; the best time is reported")
+    args = parser.parse_args()
+
+    drx_wx = load_drx_wx()
+    pages = []
+    for path in args.pages:
+        with open(path, "rb") as f:
+            pages.append((os.path.basename(path), f.read().decode("utf-8", errors="replace")))
+    if not pages:
+        pages.append(("synthetic (72 rows)", synthetic_page()))
+
+    failed = False
+    print(f"{'page':<24} {'bytes':>8} {'soup ms':>9} {'stream ms':>10} {'speedup':>8}  match")
+    for name, html in pages:
+        soup_time, expected = best_of(lambda: soup_first_row(html), args.repeat)
+        stream_time, got = best_of(lambda: drx_wx.parse_obhistory_first_row(chunks(html)), args.repeat)
+        match = expected == got
+        failed |= not match
+        print(f"{name:<24} {len(html):>8} {soup_time * 1000:>9.3f} {stream_time * 1000:>10.3f} "
+              f"{soup_time / stream_time:>7.1f}x  {'yes' if match else 'NO'}")
+        if not match:
+            print(f"    soup:   {expected}\n    stream: {got}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+DRX serial replay benchmark
+
+Replays recorded command traffic (logs/drx.log, logs/dtmf.log or a plain file
+of raw serial lines) through the real drx_main command path:
+
+    pty serial port -> serial_read_loop -> command_queue -> process_command -> play_sound
+
+GPIO is replaced by an in-memory fake (COS is driven from the dtmf.log
+timeline) and aplay/sox/alsactl/arecord are replaced by a null audio sink, so
+the benchmark runs on any Linux box with the drx_main Python dependencies
+installed.
+
+Reported per command:
+    ingest        bytes written to the pty -> line queued by serial_read_loop
+    queue         queued -> picked up by command_processor_loop
+    parse         picked up -> parse_serial_command returned
+    resolve       parsed -> play_sound called with a resolved file
+    first_sample  play_sound called -> aplay started (null sink)
+    end_to_end    bytes written -> aplay started
+plus throughput and CPU time per command.
+
+Example:
+    python3 utils/replay_bench.py --drx-log logs/drx.log --dtmf-log logs/dtmf.log
+    python3 utils/replay_bench.py --lines my_session.txt --speed 10 --json
+"""
+
+import os
+import sys
+import io
+import re
+import json
+import time
+import types
+import argparse
+import threading
+import tempfile
+import subprocess
+from collections import deque
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ["ingest", "queue", "parse", "resolve", "first_sample", "end_to_end", "service"]
+NULL_SINK_COMMANDS = {"aplay", "sox", "alsactl", "arecord"}
+PLAY_MODE_SUFFIX = {
+    "normal": "",
+    "interruptible": "I",
+    "pause": "P",
+    "repeat": "R",
+    "wait_for_cos": "W",
+}
+
+# ---- FAKE GPIO ----
+
+class FakeGPIO(types.ModuleType):
+    """Minimal stand-in for the lgpio calls made by drx_main."""
+
+    SET_PULL_UP = 32
+
+    def __init__(self):
+        super().__init__("lgpio")
+        self.levels = {}
+        self.lock = threading.Lock()
+
+    def gpiochip_open(self, chip):
+        return 1
+
+    def gpiochip_close(self, handle):
+        pass
+
+    def gpio_claim_output(self, handle, pin, level=0):
+        with self.lock:
+            self.levels.setdefault(pin, level)
+
+    def gpio_claim_input(self, handle, pin, flags=0):
+        with self.lock:
+            self.levels.setdefault(pin, 1 if flags & self.SET_PULL_UP else 0)
+
+    def gpio_read(self, handle, pin):
+        with self.lock:
+            return self.levels.get(pin, 0)
+
+    def gpio_write(self, handle, pin, level):
+        with self.lock:
+            self.levels[pin] = int(level)
+
+# ---- NULL AUDIO SINK ----
+
+class NullProcess:
+    """Popen look-alike that 'plays' for a fixed time and produces no output."""
+
+    def __init__(self, args, play_time, stdin=None, stdout=None, stderr=None):
+        self.args = args
+        self.pid = 0
+        self.returncode = None
+        self.stdin = io.BytesIO() if stdin == subprocess.PIPE else None
+        self.stdout = io.BytesIO(b"") if stdout == subprocess.PIPE else None
+        self.stderr = io.BytesIO(b"") if stderr == subprocess.PIPE else None
+        self._deadline = time.monotonic() + play_time
+
+    def poll(self):
+        if self.returncode is None and time.monotonic() >= self._deadline:
+            self.returncode = 0
+        return self.returncode
+
+    def wait(self, timeout=None):
+        remaining = self._deadline - time.monotonic()
+        if self.returncode is None and remaining > 0:
+            if timeout is not None and remaining > timeout:
+                time.sleep(timeout)
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(remaining)
+        return self.poll()
+
+    def terminate(self):
+        if self.returncode is None:
+            self.returncode = -15
+
+    def kill(self):
+        if self.returncode is None:
+            self.returncode = -9
+
+    def communicate(self, input=None, timeout=None):
+        self.wait(timeout)
+        return (b"" if self.stdout else None, b"" if self.stderr else None)
+
+def build_null_subprocess(recorder, play_time):
+    """Return a module-like object that drx_main can use in place of subprocess."""
+    shim = types.ModuleType("subprocess")
+    shim.__dict__.update({k: v for k, v in vars(subprocess).items() if not k.startswith("__")})
+
+    def is_null(args):
+        argv = args if isinstance(args, (list, tuple)) else str(args).split()
+        return bool(argv) and os.path.basename(str(argv[0])) in NULL_SINK_COMMANDS
+
+    def popen(args, *a, **kw):
+        if not is_null(args):
+            return subprocess.Popen(args, *a, **kw)
+        if os.path.basename(str(args[0])) == "aplay":
+            recorder.mark("first_sample")
+            duration = play_time
+        else:
+            duration = 0
+        return NullProcess(args, duration, stdin=kw.get("stdin"), stdout=kw.get("stdout"), stderr=kw.get("stderr"))
+
+    def run(args, *a, **kw):
+        if not is_null(args):
+            return subprocess.run(args, *a, **kw)
+        return subprocess.CompletedProcess(args, 0, b"", b"")
+
+    shim.Popen = popen
+    shim.run = run
+    return shim
+
+# ---- STAGE RECORDER ----
+
+class StageRecorder:
+    """
+    Follows each written serial line through the pipeline. Commands are
+    processed one at a time by command_processor_loop, so a FIFO of pending
+    records is enough to correlate queue puts and process_command calls.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.written = deque()
+        self.queued = deque()
+        self.records = []
+        self.current = None
+        self.depth = 0
+
+    def wrote(self, line):
+        rec = {"cmd": line, "written": time.perf_counter()}
+        with self.lock:
+            self.written.append(rec)
+            self.records.append(rec)
+        return rec
+
+    def put(self, item):
+        if isinstance(item, tuple):
+            item = item[0]
+        with self.lock:
+            if self.written and self.written[0]["cmd"] == str(item).strip():
+                rec = self.written.popleft()
+                rec["queued"] = time.perf_counter()
+                self.queued.append(rec)
+
+    def begin(self, command):
+        with self.lock:
+            if self.queued and self.queued[0]["cmd"] == str(command).strip():
+                rec = self.queued.popleft()
+            else:
+                rec = {"cmd": str(command).strip(), "untracked": True}
+                self.records.append(rec)
+            rec["dispatch"] = time.perf_counter()
+            rec["cpu_start"] = time.thread_time()
+            self.current = rec
+
+    def end(self):
+        rec = self.current
+        if rec is not None:
+            rec["done"] = time.perf_counter()
+            rec["cpu"] = time.thread_time() - rec.pop("cpu_start")
+        self.current = None
+
+    def mark(self, stage):
+        rec = self.current
+        if rec is not None and stage not in rec:
+            rec[stage] = time.perf_counter()
+            if stage == "first_sample" and "resolved" not in rec:
+                rec["resolved"] = rec[stage]
+
+    def outstanding(self):
+        with self.lock:
+            return len(self.written) + len(self.queued) + (1 if self.current else 0)
+
+class RecordingQueue:
+    """Wraps drx_main.command_queue so every put is timestamped."""
+
+    def __init__(self, inner, recorder):
+        self._inner = inner
+        self._recorder = recorder
+
+    def put(self, item, *args, **kwargs):
+        self._recorder.put(item)
+        return self._inner.put(item, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+# ---- WORKLOAD ----
+
+LOG_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?):?\s+(.*)$")
+PLAY_RE = re.compile(r"^Play: (\d{4})\S*.*?(?: from \w+ Base (\d{4}))? \[(\w+)\] - ")
+OVERRIDE_RE = re.compile(r"^CT Override (\d{4})\S* -> (\d{4})")
+DTMF_RE = re.compile(r"^Port (\d): ([0-9A-D\*#]+)")
+
+def parse_timestamp(value):
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+def load_drx_log(path):
+    """Rebuild the serial commands that produced the entries in drx.log."""
+    events = []
+    overrides = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            m = LOG_LINE_RE.match(line.strip())
+            if not m:
+                continue
+            ts = parse_timestamp(m.group(1))
+            entry = m.group(2)
+            if ts is None:
+                continue
+            mo = OVERRIDE_RE.match(entry)
+            if mo:
+                overrides[mo.group(2)] = mo.group(1)
+                continue
+            mp = PLAY_RE.match(entry)
+            if mp:
+                code = overrides.pop(mp.group(1), None) or mp.group(2) or mp.group(1)
+                suffix = PLAY_MODE_SUFFIX.get(mp.group(3), "")
+                events.append((ts, "line", f"P{code}{suffix}"))
+            elif entry.startswith("WX Report:"):
+                events.append((ts, "line", "W1"))
+            elif entry.startswith("Temperature Report:"):
+                events.append((ts, "line", "W2"))
+            elif entry.startswith("Activity Report:"):
+                events.append((ts, "line", "A1"))
+    return events
+
+def load_dtmf_log(path, cos_hold):
+    """Turn dtmf.log entries into COS key-up, DTMF serial lines and COS drop."""
+    events = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            m = LOG_LINE_RE.match(line.strip())
+            if not m:
+                continue
+            ts = parse_timestamp(m.group(1))
+            md = DTMF_RE.match(m.group(2))
+            if ts is None or not md:
+                continue
+            port, digits = md.group(1), md.group(2)
+            events.append((ts, "cos", True))
+            for i, digit in enumerate(digits):
+                events.append((ts + 0.1 * (i + 1), "line", f"{port}D{digit}"))
+            events.append((ts + 0.1 * (len(digits) + 1) + cos_hold, "cos", False))
+    return events
+
+def load_lines(path):
+    """Plain file, one raw serial line per row; '# cos on' / '# cos off' toggle COS."""
+    events = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for i, line in enumerate(f):
+            text = line.strip()
+            if not text:
+                continue
+            if text.lower() in ("# cos on", "# cos off"):
+                events.append((float(i), "cos", text.lower().endswith("on")))
+            elif not text.startswith("#"):
+                events.append((float(i), "line", text))
+    return events
+
+# ---- HARNESS ----
+
+def import_drx_main(gpio):
+    sys.modules["lgpio"] = gpio
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    import drx_main
+    return drx_main
+
+def prepare(drx, recorder, args, workdir):
+    # Keep log writes away from the live install
+    drx.LOG_WEB_FILE = os.path.join(workdir, "drx.log")
+    drx.DEBUG_LOG_PATH = os.path.join(workdir, "debug.log")
+    drx.log_file_path = os.path.join(workdir, "drx_error.log")
+    drx.ACTIVITY_FILE = os.path.join(workdir, "activity.log")
+    drx.DTMF_LOG_FILE = os.path.join(workdir, "dtmf.log")
+    drx.SUDO_DECK_FILE = os.path.join(workdir, "sudo_decks.json")
+    drx.PLAY_COUNTS_FILE = os.path.join(workdir, "play_counts.json")
+    if args.sounds:
+        drx.SOUND_DIRECTORY = args.sounds
+    elif not os.path.isdir(drx.SOUND_DIRECTORY):
+        drx.SOUND_DIRECTORY = os.path.join(REPO_DIR, "sounds")
+    if not os.path.isdir(drx.EXTRA_SOUND_DIR):
+        drx.EXTRA_SOUND_DIR = os.path.join(drx.SOUND_DIRECTORY, "extra")
+    if args.no_debug_log:
+        if not drx.config.has_section("Debug"):
+            drx.config.add_section("Debug")
+        drx.config.set("Debug", "enable_debug_logging", "false")
+
+    drx.subprocess = build_null_subprocess(recorder, args.play_time)
+    drx.command_queue = RecordingQueue(drx.command_queue, recorder)
+
+    process_command = drx.process_command
+    parse_serial_command = drx.parse_serial_command
+    play_sound = drx.play_sound
+
+    def traced_process_command(command, *a, **kw):
+        outer = recorder.depth == 0
+        if outer:
+            recorder.begin(command)
+        recorder.depth += 1
+        try:
+            return process_command(command, *a, **kw)
+        finally:
+            recorder.depth -= 1
+            if outer:
+                recorder.end()
+
+    def traced_parse_serial_command(command):
+        try:
+            return parse_serial_command(command)
+        finally:
+            recorder.mark("parsed")
+
+    def traced_play_sound(*a, **kw):
+        recorder.mark("resolved")
+        return play_sound(*a, **kw)
+
+    drx.process_command = traced_process_command
+    drx.parse_serial_command = traced_parse_serial_command
+    drx.play_sound = traced_play_sound
+
+    drx.gpio_setup()
+    drx.status_manager = drx.PlaybackStatusManager(drx.write_state)
+    drx.status_manager.register_status_callback(drx.sync_legacy_status_variables)
+
+def set_cos(drx, gpio, active):
+    active_level = int(drx.config.getboolean("GPIO", "cos_activate_level", fallback=False))
+    gpio.gpio_write(drx.h, drx.COS_PIN, active_level if active else int(not active_level))
+
+def replay(drx, gpio, recorder, master_fd, events, args):
+    events.sort(key=lambda e: e[0])
+    if args.limit:
+        lines_seen = 0
+        trimmed = []
+        for ev in events:
+            if ev[1] == "line":
+                lines_seen += 1
+                if lines_seen > args.limit:
+                    break
+            trimmed.append(ev)
+        events = trimmed
+
+    prev_ts = events[0][0] if events else 0
+    for ts, kind, payload in events:
+        if args.speed > 0:
+            time.sleep(min((ts - prev_ts) / args.speed, args.max_gap))
+        prev_ts = ts
+        if kind == "cos":
+            set_cos(drx, gpio, payload)
+        else:
+            recorder.wrote(payload)
+            os.write(master_fd, (payload + "\r\n").encode("ascii", errors="ignore"))
+            if args.speed <= 0:
+                # Closed loop: wait for the command to finish before sending the next
+                wait_idle(recorder, args.timeout)
+    set_cos(drx, gpio, False)
+
+def wait_idle(recorder, timeout):
+    deadline = time.monotonic() + timeout
+    while recorder.outstanding() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return recorder.outstanding() == 0
+
+def stage_times(rec):
+    dispatch = rec.get("dispatch")
+    parsed = rec.get("parsed")
+    resolved = rec.get("resolved")
+    first = rec.get("first_sample")
+    return {
+        "ingest": rec["queued"] - rec["written"] if "queued" in rec and "written" in rec else None,
+        "queue": dispatch - rec["queued"] if dispatch and "queued" in rec else None,
+        "parse": parsed - dispatch if parsed and dispatch else None,
+        "resolve": resolved - (parsed or dispatch) if resolved and dispatch else None,
+        "first_sample": first - resolved if first and resolved else None,
+        "end_to_end": first - rec["written"] if first and "written" in rec else None,
+        "service": rec["done"] - dispatch if "done" in rec and dispatch else None,
+    }
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+def summarize(recorder, wall, cpu):
+    done = [r for r in recorder.records if "done" in r]
+    per_stage = {}
+    for stage in STAGES:
+        vals = [t for t in (stage_times(r)[stage] for r in done) if t is not None]
+        per_stage[stage] = {
+            "count": len(vals),
+            "mean_ms": sum(vals) / len(vals) * 1000 if vals else None,
+            "p50_ms": percentile(vals, 50) * 1000 if vals else None,
+            "p95_ms": percentile(vals, 95) * 1000 if vals else None,
+            "max_ms": max(vals) * 1000 if vals else None,
+        }
+    worker_cpu = [r["cpu"] for r in done if "cpu" in r]
+    return {
+        "commands_written": sum(1 for r in recorder.records if "written" in r),
+        "commands_completed": len(done),
+        "wall_s": wall,
+        "throughput_cmd_s": len(done) / wall if wall > 0 else None,
+        "cpu_per_command_ms": sum(worker_cpu) / len(worker_cpu) * 1000 if worker_cpu else None,
+        "process_cpu_per_command_ms": cpu / len(done) * 1000 if done else None,
+        "stages": per_stage,
+        "slowest": sorted(
+            ({"cmd": r["cmd"], "service_ms": stage_times(r)["service"] * 1000} for r in done),
+            key=lambda x: x["service_ms"], reverse=True
+        )[:5],
+    }
+
+def print_report(report):
+    def fmt(v):
+        return f"{v:9.2f}" if v is not None else "      n/a"
+    print(f"Commands written:    {report['commands_written']}")
+    print(f"Commands completed:  {report['commands_completed']}")
+    print(f"Wall time:           {report['wall_s']:.2f} s")
+    print(f"Throughput:          {fmt(report['throughput_cmd_s']).strip()} cmd/s")
+    print(f"CPU per command:     {fmt(report['cpu_per_command_ms']).strip()} ms (worker thread)")
+    print(f"                     {fmt(report['process_cpu_per_command_ms']).strip()} ms (whole process)")
+    print()
+    print(f"{'stage':<14}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}   (ms)")
+    for stage in STAGES:
+        s = report["stages"][stage]
+        print(f"{stage:<14}{s['count']:>7} {fmt(s['mean_ms'])} {fmt(s['p50_ms'])} {fmt(s['p95_ms'])} {fmt(s['max_ms'])}")
+    if report["slowest"]:
+        print()
+        print("Slowest commands:")
+        for s in report["slowest"]:
+            print(f"  {s['cmd']:<20}{s['service_ms']:9.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded DRX serial traffic and measure command latency.")
+    parser.add_argument("--drx-log", help="drx.log to rebuild commands from")
+    parser.add_argument("--dtmf-log", help="dtmf.log to rebuild the COS/DTMF timeline from")
+    parser.add_argument("--lines", help="plain file of raw serial lines")
+    parser.add_argument("--sounds", help="sound directory (default: config, else ./sounds)")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="replay speed factor against log timestamps; 0 = send each command when the previous one finishes")
+    parser.add_argument("--max-gap", type=float, default=2.0, help="longest pause between replayed events, seconds")
+    parser.add_argument("--play-time", type=float, default=0.0, help="seconds the null sink takes to 'play' each file")
+    parser.add_argument("--cos-hold", type=float, default=0.5, help="seconds COS stays up after a DTMF burst")
+    parser.add_argument("--limit", type=int, default=0, help="replay at most this many serial lines")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for outstanding commands")
+    parser.add_argument("--no-debug-log", action="store_true", help="disable debug.log writes during the run")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if not (args.drx_log or args.dtmf_log or args.lines):
+        args.drx_log = os.path.join(REPO_DIR, "logs", "drx.log")
+        args.dtmf_log = os.path.join(REPO_DIR, "logs", "dtmf.log")
+
+    gpio = FakeGPIO()
+    recorder = StageRecorder()
+    drx = import_drx_main(gpio)
+
+    workdir = tempfile.mkdtemp(prefix="drx_bench_")
+    master_fd, slave_fd = os.openpty()
+    drx.SERIAL_PORT = os.ttyname(slave_fd)
+    prepare(drx, recorder, args, workdir)
+    set_cos(drx, gpio, False)
+
+    events = []
+    if args.drx_log and os.path.exists(args.drx_log):
+        events += load_drx_log(args.drx_log)
+    if args.dtmf_log and os.path.exists(args.dtmf_log):
+        events += load_dtmf_log(args.dtmf_log, args.cos_hold)
+    if args.lines:
+        events += load_lines(args.lines)
+    if not any(kind == "line" for _, kind, _ in events):
+        print("No commands found to replay.", file=sys.stderr)
+        sys.exit(1)
+
+    threading.Thread(target=drx.serial_read_loop, daemon=True).start()
+    threading.Thread(target=drx.process_serial_commands, daemon=True).start()
+    threading.Thread(target=drx.command_processor_loop, daemon=True).start()
+
+    # serial_read_loop opens the port on its first pass; give it a moment
+    time.sleep(0.5)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    replay(drx, gpio, recorder, master_fd, events, args)
+    if not wait_idle(recorder, args.timeout):
+        print(f"Warning: {recorder.outstanding()} command(s) still outstanding after {args.timeout}s", file=sys.stderr)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    report = summarize(recorder, wall, cpu)
+    report["workdir"] = workdir
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+        print(f"\nLogs from this run: {workdir}")
+
+if __name__ == "__main__":
+    main()
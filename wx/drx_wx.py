@@ -9,15 +9,21 @@ import configparser
 from datetime import datetime
 import threading
 import requests
-from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 
 # ---- CONFIGURATION ----
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(SCRIPT_DIR, "wx_config.ini")
 SAME_CSV = os.path.join(SCRIPT_DIR, "same.csv")
+ZONE_CACHE_FILE = os.path.join(SCRIPT_DIR, "zone_cache.json")
+ALERT_STORE_FILE = os.path.join(SCRIPT_DIR, "wx_alerts.json")
+FETCH_CACHE_FILE = os.path.join(SCRIPT_DIR, "wx_fetch_cache.json")
+FETCH_STATUS_FILE = os.path.join(SCRIPT_DIR, "wx_fetch_status.json")
+
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))  # drx_observations lives next to drx_main
+from drx_observations import ObservationStore
 
 def load_config():
     config = configparser.ConfigParser()
@@ -31,13 +37,21 @@ def load_config():
     nws_url_fallback = wx_cfg.get('nws_url_fallback', '')
     wx_directory = wx_cfg.get("directory", "/home/drx/DRX/wx/")
     use_nws_only = wx_cfg.get('use_nws_only', 'false').lower() == 'true'
+    fetch_timeout = float(wx_cfg.get('fetch_timeout', '10'))
+    breaker_threshold = int(wx_cfg.get('breaker_threshold', '3'))
+    backoff_max = int(wx_cfg.get('backoff_max', '60')) * 60
+    stale_max = int(wx_cfg.get('stale_max', '360')) * 60
+    push_url = wx_cfg.get('push_url', 'http://127.0.0.1:5000/api/wx').strip()
 
     same_cfg = config['SAME Alerts']
     same_zip = same_cfg.get('zip_code', '').strip()
     same_polling_time = int(same_cfg.get('polling_time', '300'))
     same_user_agent = same_cfg.get('user_agent', 'WX-SAME-Script')
+    same_api_url = same_cfg.get('api_url', 'https://api.weather.gov').rstrip('/')
+    same_geocode_url = same_cfg.get('geocode_url', 'https://api.zippopotam.us/us').rstrip('/')
 
     return {
+        "push_url": push_url,
         "wx": {
             "directory": wx_directory,
             "polling_time": wx_polling_time,
@@ -46,24 +60,26 @@ def load_config():
             "nws_url": nws_url,
             "nws_url_fallback": nws_url_fallback,
             "use_nws_only": use_nws_only,
+            "fetch_timeout": fetch_timeout,
+            "breaker_threshold": breaker_threshold,
+            "backoff_max": backoff_max,
+            "stale_max": stale_max,
         },
         "same": {
             "zip_code": same_zip,
             "polling_time": same_polling_time,
-            "user_agent": same_user_agent
+            "user_agent": same_user_agent,
+            "api_url": same_api_url,
+            "geocode_url": same_geocode_url
         }
     }
 
 # ---- WEATHER LOGIC ----
 
-def get_json(url):
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        return resp.json()
-    except Exception as e:
-        print(f"[weather] Error fetching JSON: {e}", file=sys.stderr)
-        return {}
+def fetch_json(url, timeout=15):
+    resp = requests.get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
 
 def get_nested(data, keys, default=None):
     for key in keys:
@@ -106,7 +122,115 @@ def read_pressure_from_file(filepath):
                     return None
     return None
 
-def fetch_nws_obhistory_all_fields(obhistory_url, fallback_url):
+class _FirstRowFound(Exception):
+    pass
+
+class ObhistoryTableParser(HTMLParser):
+    """
+    Reads the first <table> of an obhistory page as it streams in and stops
+    once the header row and the first data row (four or more <td> cells) are
+    known. Cell text is each text node stripped and joined, as
+    BeautifulSoup's get_text(strip=True) gives it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.header = None
+        self.data_row = None
+        self.found_table = False
+        self.table_depth = 0
+        self.row = None   # [(tag, text)] for the row being read
+        self.cell = None  # (tag, [text nodes]) for the cell being read
+        self.text = []    # Pieces of the current text node
+
+    def _flush_text(self):
+        if self.cell is not None and self.text:
+            node = "".join(self.text).strip()
+            if node:
+                self.cell[1].append(node)
+        self.text = []
+
+    def _end_cell(self):
+        self._flush_text()
+        if self.cell is not None and self.row is not None:
+            self.row.append((self.cell[0], "".join(self.cell[1])))
+        self.cell = None
+
+    def _end_row(self):
+        self._end_cell()
+        row, self.row = self.row, None
+        if row is None:
+            return
+        if self.header is None:
+            self.header = [text for _, text in row]
+            return
+        cells = [text for tag, text in row if tag == "td"]
+        if len(cells) >= 4:
+            self.data_row = cells
+            raise _FirstRowFound()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self.found_table and self.table_depth == 0:
+                return
+            self.found_table = True
+            self.table_depth += 1
+        if self.table_depth == 0:
+            return
+        self._flush_text()
+        if tag == "tr":
+            self._end_row()
+            self.row = []
+        elif tag in ("td", "th") and self.row is not None:
+            self._end_cell()
+            self.cell = (tag, [])
+
+    def handle_endtag(self, tag):
+        if self.table_depth == 0:
+            return
+        self._flush_text()
+        if tag in ("td", "th"):
+            self._end_cell()
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "table":
+            self.table_depth -= 1
+            if self.table_depth == 0:
+                self._end_row()
+                raise _FirstRowFound()  # Only the first table is read
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+def parse_obhistory_first_row(chunks):
+    """
+    Feed text chunks of an obhistory page through ObhistoryTableParser and
+    return (header_cells, data_cells); either is None if the page ran out
+    first. Chunks after the first data row are never read.
+    """
+    parser = ObhistoryTableParser()
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+        parser._end_row()
+    except _FirstRowFound:
+        pass
+    return parser.header, parser.data_row
+
+def fetch_obhistory_first_row(url, timeout=15):
+    with requests.get(url, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        if not resp.encoding:
+            resp.encoding = "utf-8"
+        return parse_obhistory_first_row(resp.iter_content(chunk_size=8192, decode_unicode=True))
+
+def fetch_nws_obhistory_all_fields(obhistory_url, fallback_url, timeout=15):
+    """The latest NWS observation as wx_data fields; raises if the page cannot be fetched or read."""
     result = {
         "observations": "Unknown",
         "temperature": "Unknown",
@@ -120,85 +244,233 @@ def fetch_nws_obhistory_all_fields(obhistory_url, fallback_url):
         "precipRate": "Unknown"
     }
 
+    header_cells, data_row = fetch_obhistory_first_row(obhistory_url, timeout)
+    if header_cells is None:
+        raise Exception("Could not find table in NWS obhistory page.")
+    if not data_row:
+        raise Exception("No data rows found in obhistory table.")
+    while len(data_row) < len(header_cells):
+        data_row.append("Unknown")
+
+    row_map = {header: val for header, val in zip(header_cells, data_row)}
+
+    wind_val = row_map.get("Wind (mph)", "Unknown")
+    winddir = "Unknown"
+    wind_speed = "Unknown"
+    if wind_val != "Unknown":
+        wind_match = re.match(r"([A-Za-z]+)?\s*(\d+)?", wind_val.replace('\n', ' ').strip())
+        if wind_match:
+            winddir = wind_match.group(1) if wind_match.group(1) else "Unknown"
+            wind_speed = wind_match.group(2) if wind_match.group(2) else "Unknown"
+        else:
+            winddir = wind_val
+            wind_speed = wind_val
+
+    humidity = row_map.get("Pressure", "Unknown")
+    if "%" not in humidity:
+        for cell in data_row:
+            if "%" in cell:
+                humidity = cell
+                break
+
+    if humidity != "Unknown":
+        humidity = humidity.replace("%", "").strip() + " percent"
+
+    pressure = "Unknown"
     try:
-        resp = requests.get(obhistory_url, timeout=15)
-        resp.raise_for_status()
-        html = resp.text
-        soup = BeautifulSoup(html, "html.parser")
-        table = soup.find("table")
-        if not table:
-            raise Exception("Could not find table in NWS obhistory page.")
-        rows = table.find_all("tr")
-        if len(rows) < 2:
-            raise Exception("Not enough rows in obhistory table.")
-
-        header_cells = [cell.get_text(strip=True) for cell in rows[0].find_all(["th", "td"])]
-        data_row = None
-        for row in rows[1:]:
-            data_cells = [cell.get_text(strip=True) for cell in row.find_all("td")]
-            if data_cells and len(data_cells) >= 4:
-                while len(data_cells) < len(header_cells):
-                    data_cells.append("Unknown")
-                data_row = data_cells
+        precip_idx = header_cells.index("Precipitation (in)")
+        for cell in data_row[precip_idx+1:]:
+            if re.match(r'^(2[8-9]|3[0-2])\.\d{2}$', cell.strip()):
+                pressure = cell.strip()
+                break
+    except Exception:
+        for cell in data_row:
+            if re.match(r'^(2[8-9]|3[0-2])\.\d{2}$', cell.strip()):
+                pressure = cell.strip()
                 break
-        if not data_row:
-            raise Exception("No data rows found in obhistory table.")
-
-        row_map = {header: val for header, val in zip(header_cells, data_row)}
-
-        wind_val = row_map.get("Wind (mph)", "Unknown")
-        winddir = "Unknown"
-        wind_speed = "Unknown"
-        if wind_val != "Unknown":
-            wind_match = re.match(r"([A-Za-z]+)?\s*(\d+)?", wind_val.replace('\n', ' ').strip())
-            if wind_match:
-                winddir = wind_match.group(1) if wind_match.group(1) else "Unknown"
-                wind_speed = wind_match.group(2) if wind_match.group(2) else "Unknown"
+
+    result.update({
+        "observations": row_map.get("Weather", "Unknown"),
+        "temperature": row_map.get("Temperature (ºF)", "Unknown"),
+        "humidity": humidity,
+        "winddir": winddir,
+        "wind_speed": wind_speed,
+        "pressure": pressure,
+        "visibility": row_map.get("Vis. (mi.)", "Unknown"),
+        "precipRate": row_map.get("Precipitation (in)", "Unknown"),
+    })
+
+    return result
+
+# ---- WEATHER SOURCES ----
+
+class WeatherSource:
+    """
+    One upstream the weather worker reads, behind a circuit breaker.
+
+    Each attempt is bounded by the fetch's own timeout. After `threshold`
+    failures in a row the breaker opens and the source is left alone for
+    `backoff` seconds, doubling with each further failure up to
+    `backoff_max`; the next attempt after that is a half-open probe, and one
+    success closes the breaker again. Until then get() serves the last good
+    value, for up to `max_age` seconds.
+    """
+
+    def __init__(self, name, fetch, valid, threshold=3, backoff=300, backoff_max=3600,
+                 max_age=21600, cached=None):
+        self.name = name
+        self.fetch = fetch
+        self.valid = valid
+        self.threshold = threshold
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.max_age = max_age
+        self.failures = 0
+        self.next_attempt = 0
+        self.last_ok = None
+        self.last_error = None
+        self.last_error_time = None
+        self.latency = None
+        self.value = cached.get("value") if cached else None
+        self.value_time = cached.get("time") if cached else None
+
+    def state(self, now=None):
+        if self.failures < self.threshold:
+            return "closed"
+        now = time.time() if now is None else now
+        return "half-open" if now >= self.next_attempt else "open"
+
+    def get(self):
+        """(value, fetched_at): fresh if the fetch worked, else the last good value, else (None, None)."""
+        now = time.time()
+        if self.state(now) != "open":
+            start = time.monotonic()
+            try:
+                value = self.fetch()
+                if not self.valid(value):
+                    raise ValueError("response had no usable observation")
+            except Exception as e:
+                self.latency = time.monotonic() - start
+                self.failures += 1
+                self.last_error = str(e) or type(e).__name__
+                self.last_error_time = now
+                if self.failures >= self.threshold:
+                    doublings = min(self.failures - self.threshold, 16)
+                    self.next_attempt = now + min(self.backoff * 2 ** doublings, self.backoff_max)
+                print(f"[weather] {self.name} fetch failed ({self.failures} in a row, breaker "
+                      f"{self.state(now)}): {self.last_error}", file=sys.stderr)
             else:
-                winddir = wind_val
-                wind_speed = wind_val
+                self.latency = time.monotonic() - start
+                self.failures = 0
+                self.next_attempt = 0
+                self.value, self.value_time = value, now
+                self.last_ok = now
+                return value, now
+        if self.value is not None and self.value_time and now - self.value_time <= self.max_age:
+            return self.value, self.value_time
+        return None, None
+
+    def status(self, now=None):
+        now = time.time() if now is None else now
+        usable = self.value is not None and self.value_time and now - self.value_time <= self.max_age
+        return {
+            "state": self.state(now),
+            "failures": self.failures,
+            "last_ok": self.last_ok,
+            "last_error": self.last_error,
+            "last_error_time": self.last_error_time,
+            "next_attempt": self.next_attempt if self.failures >= self.threshold else None,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "value_age": round(now - self.value_time) if usable else None,
+        }
+
+def nws_result_valid(result):
+    return any(result.get(key, "Unknown") != "Unknown" for key in ("observations", "temperature", "pressure", "humidity"))
+
+def wx_json_valid(data):
+    return isinstance(data, dict) and bool(data.get("observations"))
+
+def write_json_atomic(path, data):
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.chmod(tmp, 0o666)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[weather] Could not write {path}: {e}", file=sys.stderr)
+
+def load_fetch_cache(path=FETCH_CACHE_FILE):
+    """Last good value per source from a previous run: {name: {"value": ..., "time": epoch}}."""
+    try:
+        with open(path, "r") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_fetch_cache(sources, path=FETCH_CACHE_FILE):
+    write_json_atomic(path, {
+        name: {"value": source.value, "time": source.value_time}
+        for name, source in sources.items() if source.value is not None
+    })
+
+def write_fetch_status(sources, polling_time, path=FETCH_STATUS_FILE):
+    """wx_fetch_status.json: how each source's last fetch went, for the web weather badge. Returns what was written."""
+    now = time.time()
+    status = {
+        "updated": now,
+        "polling_time": polling_time,
+        "sources": {name: source.status(now) for name, source in sources.items()},
+    }
+    write_json_atomic(path, status)
+    return status
+
+# ---- PUSH TO DRX_MAIN ----
 
-        humidity = row_map.get("Pressure", "Unknown")
-        if "%" not in humidity:
-            for cell in data_row:
-                if "%" in cell:
-                    humidity = cell
-                    break
+def file_signature(path):
+    """[inode, size, mtime_ns] of a file, as drx_main compares them, or None."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
 
-        if humidity != "Unknown":
-            humidity = humidity.replace("%", "").strip() + " percent"
+class DrxPublisher:
+    """
+    Pushes each weather update to drx_main's local API (POST /api/wx) right
+    after the file it came from is written, so drx_main can act on it at
+    once instead of polling the file. The push carries the file's signature,
+    which lets drx_main skip reading the file it already has. A failed push
+    costs nothing more than drx_main finding the change on its own, later.
+    """
 
-        pressure = "Unknown"
+    def __init__(self, url, timeout=2):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.failing = False
+
+    def publish(self, kind, payload, path=None):
+        if not self.url:
+            return False
+        body = dict(payload, kind=kind, file=file_signature(path) if path else None)
         try:
-            precip_idx = header_cells.index("Precipitation (in)")
-            for cell in data_row[precip_idx+1:]:
-                if re.match(r'^(2[8-9]|3[0-2])\.\d{2}$', cell.strip()):
-                    pressure = cell.strip()
-                    break
-        except Exception:
-            for cell in data_row:
-                if re.match(r'^(2[8-9]|3[0-2])\.\d{2}$', cell.strip()):
-                    pressure = cell.strip()
-                    break
-
-        result.update({
-            "observations": row_map.get("Weather", "Unknown"),
-            "temperature": row_map.get("Temperature (ºF)", "Unknown"),
-            "humidity": humidity,
-            "winddir": winddir,
-            "wind_speed": wind_speed,
-            "pressure": pressure,
-            "visibility": row_map.get("Vis. (mi.)", "Unknown"),
-            "precipRate": row_map.get("Precipitation (in)", "Unknown"),
-        })
-
-        return result
-    except Exception as e:
-        print(f"[weather] Error fetching NWS obhistory (table): {e}", file=sys.stderr)
-        print("[weather] Falling back to MapClick parser...", file=sys.stderr)
-        return result
+            with self.lock:
+                resp = self.session.post(self.url, json=body, timeout=self.timeout)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            if not self.failing:
+                print(f"[drx_wx] Could not push {kind} to drx_main, it will read the files instead: {e}", file=sys.stderr)
+            self.failing = True
+            return False
+        if self.failing:
+            print("[drx_wx] Pushing updates to drx_main again.")
+        self.failing = False
+        return True
 
-def weather_worker(wx_cfg):
+def weather_worker(wx_cfg, publisher=None):
     directory = wx_cfg["directory"]
     nws_url = wx_cfg["nws_url"]
     nws_url_fallback = wx_cfg.get("nws_url_fallback", "")
@@ -211,6 +483,26 @@ def weather_worker(wx_cfg):
     timestamp_file = os.path.join(directory, "wx_data_previous_time")
 
     os.makedirs(directory, exist_ok=True)
+    history = ObservationStore(os.path.join(directory, "history"))
+
+    timeout = wx_cfg.get("fetch_timeout", 10)
+    breaker = {
+        "threshold": wx_cfg.get("breaker_threshold", 3),
+        "backoff": min(polling_time, wx_cfg.get("backoff_max", 3600)),
+        "backoff_max": wx_cfg.get("backoff_max", 3600),
+        "max_age": wx_cfg.get("stale_max", 21600),
+    }
+    cache = load_fetch_cache()
+    sources = {
+        "nws": WeatherSource("nws", lambda: fetch_nws_obhistory_all_fields(nws_url, nws_url_fallback, timeout),
+                             nws_result_valid, cached=cache.get("nws"), **breaker),
+    }
+    if not use_nws_only:
+        sources["wx_data"] = WeatherSource("wx_data", lambda: fetch_json(wx_data_url, timeout),
+                                           wx_json_valid, cached=cache.get("wx_data"), **breaker)
+        sources["wx_day"] = WeatherSource("wx_day", lambda: fetch_json(wx_day_url, timeout),
+                                          wx_json_valid, cached=cache.get("wx_day"), **breaker)
+    fetch_pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="wx-fetch")
 
     while True:
         current_time = time.time()
@@ -232,8 +524,13 @@ def weather_worker(wx_cfg):
                 except Exception as e:
                     print(f"[weather] Backup error: {e}", file=sys.stderr)
 
+        # All sources at once, so one slow upstream costs at most its own timeout
+        fetched = dict(zip(sources, fetch_pool.map(lambda source: source.get(), sources.values())))
+        fetched_times = [fetched_at for _, fetched_at in fetched.values() if fetched_at]
+        fresh = any(fetched_at and fetched_at >= current_time for _, fetched_at in fetched.values())
+        obhistory_result = fetched["nws"][0] or {}
+
         if use_nws_only:
-            obhistory_result = fetch_nws_obhistory_all_fields(nws_url, nws_url_fallback)
             previous_pressure = read_pressure_from_file(backup_file)
             new_pressure = obhistory_result.get("pressure")
             baro_status = "unknown"
@@ -259,9 +556,8 @@ def weather_worker(wx_cfg):
                 output_data[key] = val
             output_data["pressure_status"] = baro_status
         else:
-            obhistory_result = fetch_nws_obhistory_all_fields(nws_url, nws_url_fallback)
-            wx_data_json = get_json(wx_data_url)
-            wx_day_json = get_json(wx_day_url)
+            wx_data_json = fetched["wx_data"][0] or {}
+            wx_day_json = fetched["wx_day"][0] or {}
             observations = wx_day_json.get("observations", [])
             last_obs = observations[-1] if observations else {}
 
@@ -306,6 +602,31 @@ def weather_worker(wx_cfg):
                 "precipRate": f"{precip_rate:.2f}" if precip_rate is not None else obhistory_result.get("precipRate", "Unknown")
             }
 
+        # Age marker: when the oldest value in this report was fetched, and which sources were served from cache
+        output_data["data_time"] = int(min(fetched_times)) if fetched_times else "Unknown"
+        output_data["stale_sources"] = ",".join(
+            name for name, (_, fetched_at) in fetched.items() if not fetched_at or fetched_at < current_time
+        ) or "none"
+
+        # Cached values were recorded when they were fetched
+        if fresh:
+            try:
+                history.append(
+                    time.time(),
+                    temperature=output_data.get("temperature"),
+                    humidity=output_data.get("humidity"),
+                    pressure=output_data.get("pressure"),
+                    wind_speed=output_data.get("wind_speed"),
+                    wind_gust=output_data.get("wind_gust"),
+                    precip_rate=output_data.get("precipRate"),
+                )
+                # Prefer the 3-hour tendency from the history over the 2-hourly wx_data_previous comparison
+                tendency = history.pressure_tendency(3)
+                if tendency:
+                    output_data["pressure_status"] = tendency[1]
+            except (OSError, ValueError) as e:
+                print(f"[weather] Observation history error: {e}", file=sys.stderr)
+
         try:
             with open(output_file, "w") as f:
                 for key, val in output_data.items():
@@ -315,6 +636,16 @@ def weather_worker(wx_cfg):
         except Exception as e:
             print(f"[weather] Error writing weather data: {e}", file=sys.stderr)
 
+        if fresh:
+            save_fetch_cache(sources)
+        fetch_status = write_fetch_status(sources, polling_time)
+        if publisher:
+            publisher.publish("observation", {
+                "lines": [f"{key}: {val}\n" for key, val in output_data.items()],
+                "fetch_status": fetch_status,
+                "polling_time": polling_time,
+            }, output_file)
+
         time.sleep(polling_time)
 
 # ---- SAME ALERTS LOGIC ----
@@ -346,32 +677,129 @@ def parse_nws_date(date_string):
     except (ValueError, TypeError):
         return date_string
 
-def get_nws_zone_from_zip(zip_code, user_agent):
+def get_nws_zone_from_zip(zip_code, user_agent, session=None,
+                          api_url="https://api.weather.gov", geocode_url="https://api.zippopotam.us/us"):
+    session = session or requests
     headers = {'User-Agent': user_agent}
-    geocode_url = f"https://api.zippopotam.us/us/{zip_code}"
     try:
-        with urlopen(Request(geocode_url, headers=headers), timeout=10) as response:
-            geocode_data = json.load(response)
-            lat = geocode_data['places'][0]['latitude']
-            lon = geocode_data['places'][0]['longitude']
-    except (HTTPError, URLError, KeyError, IndexError) as e:
+        response = session.get(f"{geocode_url}/{zip_code}", headers=headers, timeout=10)
+        response.raise_for_status()
+        geocode_data = response.json()
+        lat = geocode_data['places'][0]['latitude']
+        lon = geocode_data['places'][0]['longitude']
+    except (requests.RequestException, ValueError, KeyError, IndexError) as e:
         return None, f"Could not get location data for ZIP {zip_code}. Reason: {e}"
 
-    points_url = f"https://api.weather.gov/points/{lat},{lon}"
     try:
-        with urlopen(Request(points_url, headers=headers), timeout=10) as response:
-            points_data = json.load(response)
-            forecast_zone_url = points_data.get('properties', {}).get('forecastZone')
-            if forecast_zone_url:
-                zone_id = forecast_zone_url.split('/')[-1]
-                return zone_id, None
-            else:
-                return None, "Could not determine NWS forecast zone from API response."
-    except (HTTPError, URLError) as e:
+        response = session.get(f"{api_url}/points/{lat},{lon}", headers=headers, timeout=10)
+        response.raise_for_status()
+        points_data = response.json()
+        forecast_zone_url = points_data.get('properties', {}).get('forecastZone')
+        if forecast_zone_url:
+            zone_id = forecast_zone_url.split('/')[-1]
+            return zone_id, None
+        else:
+            return None, "Could not determine NWS forecast zone from API response."
+    except (requests.RequestException, ValueError) as e:
         return None, f"Could not contact NWS API for zone info. Reason: {e}"
-    except KeyError:
+    except (KeyError, AttributeError):
         return None, "NWS API response for zone info was in an unexpected format."
 
+class AlertFetcher:
+    """
+    Fetches active alerts for several NWS zones at once.
+
+    All zones are queried in parallel over one keep-alive session. Each zone
+    remembers the ETag / Last-Modified of its last response and sends them
+    back, so an unchanged feed costs a 304 and the cached alerts are reused.
+    ZIP codes are resolved to zones once and kept in zone_cache.json.
+    """
+
+    def __init__(self, user_agent, api_url="https://api.weather.gov",
+                 geocode_url="https://api.zippopotam.us/us", cache_file=ZONE_CACHE_FILE, max_workers=8):
+        self.user_agent = user_agent
+        self.api_url = api_url.rstrip('/')
+        self.geocode_url = geocode_url.rstrip('/')
+        self.cache_file = cache_file
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({'User-Agent': user_agent, 'Accept': 'application/geo+json'})
+        self.feeds = {}  # zone -> {"etag", "last_modified", "features"}
+        self.zone_cache = self.load_zone_cache()
+        self.stats = {"requests": 0, "not_modified": 0, "errors": 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, stat):
+        with self.stats_lock:
+            self.stats[stat] += 1
+
+    def load_zone_cache(self):
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_zone_cache(self):
+        tmp = self.cache_file + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.zone_cache, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"Warning: Could not write zone cache: {e}")
+
+    def resolve_zone(self, zip_code):
+        """Return (zone, error) for a ZIP code, from the cache when it has been resolved before."""
+        if zip_code in self.zone_cache:
+            return self.zone_cache[zip_code], None
+        zone, error_msg = get_nws_zone_from_zip(zip_code, self.user_agent, self.session,
+                                                self.api_url, self.geocode_url)
+        if zone:
+            self.zone_cache[zip_code] = zone
+            self.save_zone_cache()
+        return zone, error_msg
+
+    def fetch_zone(self, zone):
+        """Return the zone's active alert features, reusing the cached ones on a 304."""
+        feed = self.feeds.get(zone, {})
+        headers = {}
+        if feed.get("etag"):
+            headers["If-None-Match"] = feed["etag"]
+        if feed.get("last_modified"):
+            headers["If-Modified-Since"] = feed["last_modified"]
+        self.count("requests")
+        response = self.session.get(f"{self.api_url}/alerts/active", params={"zone": zone},
+                                    headers=headers, timeout=10)
+        if response.status_code == 304 and "features" in feed:
+            self.count("not_modified")
+            return feed["features"]
+        response.raise_for_status()
+        features = response.json().get('features', [])
+        self.feeds[zone] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "features": features,
+        }
+        return features
+
+    def fetch_all(self, zones):
+        """Fetch every zone concurrently; returns {zone: (features, error)} in the order given."""
+        def fetch(zone):
+            try:
+                return self.fetch_zone(zone), None
+            except (requests.RequestException, ValueError) as e:
+                self.count("errors")
+                return None, e
+        zones = list(dict.fromkeys(zones))
+        if not zones:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(zones))) as pool:
+            return dict(zip(zones, pool.map(fetch, zones)))
+
 def extract_same_code(properties):
     event_code = properties.get('eventCode')
     all_codes = []
@@ -417,6 +845,81 @@ def get_description_from_code(code, eas_descriptions, properties):
             description = properties.get('event', 'No description available.')
         return description
 
+def get_alert_zones(properties):
+    ugc = properties.get('geocode', {}).get('UGC')
+    if ugc:
+        return list(ugc)
+    return [z.split('/')[-1] for z in properties.get('affectedZones', []) if z]
+
+def build_alert_record(alert_id, properties, eas_code, description):
+    """The structured form of one alert, as written to wx_alerts.json."""
+    nws_headline = properties.get('parameters', {}).get('NWSheadline', [''])
+    if isinstance(nws_headline, list):
+        nws_headline = nws_headline[0] if nws_headline else ''
+    return {
+        "id": properties.get('id') or alert_id,
+        "event": properties.get('event', ''),
+        "code": eas_code.split(',')[0].strip(),
+        "codes": [c.strip() for c in eas_code.split(',') if c.strip() and c.strip() != 'N/A'],
+        "description": description,
+        "headline": properties.get('headline', ''),
+        "nws_headline": nws_headline,
+        "status": properties.get('status', ''),
+        "severity": properties.get('severity', ''),
+        "message_type": properties.get('messageType', ''),
+        "onset": parse_nws_date(properties.get('onset')),
+        "effective": parse_nws_date(properties.get('effective')),
+        "ends": parse_nws_date(properties.get('ends')),
+        "expires": parse_nws_date(properties.get('expires')),
+        "areas": properties.get('areaDesc', ''),
+        "zones": get_alert_zones(properties),
+        "references": [ref.get('identifier') for ref in properties.get('references', []) if ref.get('identifier')],
+    }
+
+class AlertStore:
+    """
+    wx_alerts.json: the active alerts in structured form, for drx_main.
+
+    The file is replaced atomically, so a reader never sees a partial write.
+    Its generation counter only moves when the set of alerts or any of their
+    fields changes, so a reader can skip parsing when the generation is the
+    same as last time.
+    """
+
+    def __init__(self, path=ALERT_STORE_FILE):
+        self.path = path
+        self.generation = 0
+        self.alerts = None
+        try:
+            with open(path, "r") as f:
+                stored = json.load(f)
+            self.generation = int(stored.get("generation", 0))
+            self.alerts = stored.get("alerts", [])
+        except (OSError, ValueError):
+            pass
+
+    def write(self, alerts, zones):
+        """Store the current alerts; returns True if they changed and a new generation was written."""
+        if alerts == self.alerts:
+            return False
+        self.generation += 1
+        self.alerts = alerts
+        stored = {
+            "generation": self.generation,
+            "updated": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "zones": zones,
+            "alerts": alerts,
+        }
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(stored, f, indent=2)
+            os.chmod(tmp, 0o666)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write {self.path}: {e}")
+        return True
+
 def handle_no_alerts():
     alerts_file = os.path.join(SCRIPT_DIR, 'wx_alerts')
     previous_file = os.path.join(SCRIPT_DIR, 'wx_alerts_previous')
@@ -458,19 +961,23 @@ def get_eas_only_option():
 EAS_ONLY = get_eas_only_option()
 SAME_CODES = load_same_codes() if EAS_ONLY else set()
 
-def same_worker(same_cfg):
+def same_worker(same_cfg, publisher=None):
     zip_code_field = same_cfg["zip_code"]
     polling_time = same_cfg["polling_time"]
     user_agent = same_cfg["user_agent"]
     eas_descriptions = load_eas_descriptions()
+    fetcher = AlertFetcher(user_agent, same_cfg.get("api_url", "https://api.weather.gov"),
+                           same_cfg.get("geocode_url", "https://api.zippopotam.us/us"))
+    store = AlertStore()
     zone_or_zips = [z.strip() for z in zip_code_field.split(",") if z.strip()]
     while True:
         deduped_alerts = {}
-        all_output_lines = []
+        alert_records = {}
         zones_display_labels = []
+        zones = []
         for zone_or_zip in zone_or_zips:
             if zone_or_zip.isdigit() and len(zone_or_zip) == 5:
-                zone, error_msg = get_nws_zone_from_zip(zone_or_zip, user_agent)
+                zone, error_msg = fetcher.resolve_zone(zone_or_zip)
                 display_label = f"ZIP {zone_or_zip}"
                 if error_msg:
                     print(f"[SAME] Error: {error_msg}")
@@ -482,44 +989,45 @@ def same_worker(same_cfg):
                 print(f"[SAME] Invalid zone or ZIP code: {zone_or_zip}. Skipping SAME monitoring.")
                 continue
             zones_display_labels.append(display_label)
-            alerts_url = f"https://api.weather.gov/alerts/active?zone={zone}"
-            headers = {'User-Agent': user_agent}
-            try:
-                with urlopen(Request(alerts_url, headers=headers), timeout=10) as response:
-                    alerts_data = json.load(response)
-                active_alerts = alerts_data.get('features', [])
-                current_time = time.strftime('%Y-%m-%d %H:%M:%S')
-                if not active_alerts:
-                    print(f"[{current_time}] No active alerts for {display_label}.")
+            zones.append((zone, display_label))
+        results = fetcher.fetch_all([zone for zone, _ in zones])
+        for zone, display_label in zones:
+            active_alerts, error = results[zone]
+            if error is not None:
+                print(f"An error occurred while checking for alerts: {error}")
+                continue
+            current_time = time.strftime('%Y-%m-%d %H:%M:%S')
+            if not active_alerts:
+                print(f"[{current_time}] No active alerts for {display_label}.")
+                continue
+            for alert in active_alerts:
+                alert_id = alert.get('id') or alert.get('properties', {}).get('id')
+                if not alert_id:
                     continue
-                for alert in active_alerts:
-                    alert_id = alert.get('id') or alert.get('properties', {}).get('id')
-                    if not alert_id:
-                        continue
-                    properties = alert.get('properties', {})
-                    eas_code = extract_same_code(properties)
-                    event = properties.get('event', 'N/A')
-                    first_eas_code = eas_code.split(',')[0].strip() if eas_code else ''
-                    if EAS_ONLY and (not first_eas_code or first_eas_code not in SAME_CODES):
-                        continue
-                    if eas_code == 'SVS' and event == 'Severe Thunderstorm Warning':
-                        continue
-                    description = get_description_from_code(eas_code, eas_descriptions, properties)
-                    same = eas_code
-                    headline = properties.get('headline', 'N/A')
-                    status = properties.get('status', 'N/A')
-                    severity = properties.get('severity', 'N/A')
-                    message_type = properties.get('messageType', 'N/A')
-                    nws_headline = properties.get('parameters', {}).get('NWSheadline', ['N/A'])
-                    if isinstance(nws_headline, list):
-                        nws_headline = nws_headline[0]
-                    onset = parse_nws_date(properties.get('onset'))
-                    effective = parse_nws_date(properties.get('effective'))
-                    ends = parse_nws_date(properties.get('ends'))
-                    expires = parse_nws_date(properties.get('expires'))
-                    location = properties.get('areaDesc', 'N/A')
-                    nws_description = properties.get('description', 'N/A')
-                    alert_text = f"""
+                properties = alert.get('properties', {})
+                eas_code = extract_same_code(properties)
+                event = properties.get('event', 'N/A')
+                first_eas_code = eas_code.split(',')[0].strip() if eas_code else ''
+                if EAS_ONLY and (not first_eas_code or first_eas_code not in SAME_CODES):
+                    continue
+                if eas_code == 'SVS' and event == 'Severe Thunderstorm Warning':
+                    continue
+                description = get_description_from_code(eas_code, eas_descriptions, properties)
+                same = eas_code
+                headline = properties.get('headline', 'N/A')
+                status = properties.get('status', 'N/A')
+                severity = properties.get('severity', 'N/A')
+                message_type = properties.get('messageType', 'N/A')
+                nws_headline = properties.get('parameters', {}).get('NWSheadline', ['N/A'])
+                if isinstance(nws_headline, list):
+                    nws_headline = nws_headline[0]
+                onset = parse_nws_date(properties.get('onset'))
+                effective = parse_nws_date(properties.get('effective'))
+                ends = parse_nws_date(properties.get('ends'))
+                expires = parse_nws_date(properties.get('expires'))
+                location = properties.get('areaDesc', 'N/A')
+                nws_description = properties.get('description', 'N/A')
+                alert_text = f"""
   Event:          {event}
   SAME:           {same}
   EAS Code:       {same}
@@ -535,27 +1043,28 @@ def same_worker(same_cfg):
   Location:       {location}
   Description:    {description}
 """
-                    shown_fields = {
-                        'event', 'same', 'eas code', 'headline', 'nwsheadline', 'status', 'severity',
-                        'messagetype', 'onset', 'effective', 'ends', 'expires', 'location', 'description'
-                    }
-                    mapped_fields = {'areaDesc', 'Event', 'Headline', 'NWSheadline', 'Status', 'Severity',
-                                     'MessageType', 'Onset', 'Effective', 'Ends', 'Expires', 'Location', 'Description'}
-                    extra_lines = []
-                    for key, value in properties.items():
-                        key_label = key
-                        if key == "areaDesc":
-                            key_label = "Location"
-                        if key_label.lower() in shown_fields or key in mapped_fields:
-                            continue
-                        if isinstance(value, list):
-                            value = "; ".join(str(v) for v in value)
-                        extra_lines.append(f"  {key_label}:       {value}")
-                    if extra_lines:
-                        alert_text += "\n" + "\n".join(extra_lines)
-                    deduped_alerts[alert_id] = alert_text
-            except (HTTPError, URLError) as e:
-                print(f"An error occurred while checking for alerts: {e}")
+                shown_fields = {
+                    'event', 'same', 'eas code', 'headline', 'nwsheadline', 'status', 'severity',
+                    'messagetype', 'onset', 'effective', 'ends', 'expires', 'location', 'description'
+                }
+                mapped_fields = {'areaDesc', 'Event', 'Headline', 'NWSheadline', 'Status', 'Severity',
+                                 'MessageType', 'Onset', 'Effective', 'Ends', 'Expires', 'Location', 'Description'}
+                extra_lines = []
+                for key, value in properties.items():
+                    key_label = key
+                    if key == "areaDesc":
+                        key_label = "Location"
+                    if key_label.lower() in shown_fields or key in mapped_fields:
+                        continue
+                    if isinstance(value, list):
+                        value = "; ".join(str(v) for v in value)
+                    extra_lines.append(f"  {key_label}:       {value}")
+                if extra_lines:
+                    alert_text += "\n" + "\n".join(extra_lines)
+                deduped_alerts[alert_id] = alert_text
+                alert_records[alert_id] = build_alert_record(alert_id, properties, eas_code, description)
+        if store.write(list(alert_records.values()), zones_display_labels):
+            print(f"[SAME] Alert store generation {store.generation}: {len(alert_records)} alert(s).")
         alerts_file = os.path.join(SCRIPT_DIR, 'wx_alerts')
         if deduped_alerts:
             current_time = time.strftime('%Y-%m-%d %H:%M:%S')
@@ -573,6 +1082,14 @@ def same_worker(same_cfg):
                 print(f"Warning: Could not write to wx_alerts file: {e}")
         else:
             handle_no_alerts()
+        if publisher:
+            # Every cycle, changed or not, so drx_main can tell pushes are still coming
+            publisher.publish("alerts", {
+                "generation": store.generation,
+                "zones": zones_display_labels,
+                "alerts": store.alerts or [],
+                "polling_time": polling_time,
+            }, store.path)
         time.sleep(polling_time)
 
 # ---- WX ALERT MONITOR WITH DEDUPLICATION BY NWS ID ----
@@ -643,9 +1160,10 @@ def main():
     cfg = load_config()
     wx_cfg = cfg["wx"]
     same_cfg = cfg["same"]
+    publisher = DrxPublisher(cfg["push_url"])
     print("[drx_wx] Starting weather and SAME polling threads.")
-    wx_thread = threading.Thread(target=weather_worker, args=(wx_cfg,), daemon=True)
-    same_thread = threading.Thread(target=same_worker, args=(same_cfg,), daemon=True)
+    wx_thread = threading.Thread(target=weather_worker, args=(wx_cfg, publisher), daemon=True)
+    same_thread = threading.Thread(target=same_worker, args=(same_cfg, publisher), daemon=True)
     wx_thread.start()
     same_thread.start()
 